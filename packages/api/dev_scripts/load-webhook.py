@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Load generator for the LoRaMINT webhook - simulates many nodes posting
+uplinks to /webhook and reports latency percentiles, error rate and
+sustained throughput.
+
+Every virtual device has its own sensors (datatypes byte/int/long/float/
+string), time method (server or custom timestamps), wire mode (padded,
+compact or batch frames) and an occasional log message. Payloads are
+encoded with the ESP32 library's MintValue/MintBatch (packages/esp32) and
+sent as base64 frm_payload, exactly as TTN forwards a real uplink, so the
+backend decodes and stores them like production traffic.
+
+Requests are scheduled open-loop at the target rate over a pool of
+keep-alive HTTP/1.1 connections. Latency is measured from the time a
+request was due, not from when a connection became free, so a backend that
+falls behind shows up in the percentiles instead of silently lowering the
+offered load.
+
+Usage (dev server running, TTN_APP_KEY as in .env):
+
+    python3 dev_scripts/load-webhook.py --devices 500 --interval 60
+    python3 dev_scripts/load-webhook.py --devices 2000 --rate 200 --duration 120
+
+Python 3.8+, standard library only. Every run stores real rows - point it at
+a development database.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import ssl
+import sys
+import time
+from urllib.parse import urlsplit
+
+ESP32 = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "esp32")
+sys.path.insert(0, ESP32)
+
+from loramint import LoRaMINT, MintValue  # noqa: E402
+from loramint.mintbatch import MintBatch  # noqa: E402
+
+BASE_URL = "http://localhost:8090/api/v1"
+MAX_PAYLOAD = 222                 # batch frame limit (EU868, DR4-DR7)
+LOG_MESSAGES = ("Device booted", "Sensor read failed", "Battery low",
+                "Rejoined network", "Watchdog reset")
+
+# name, unit, measurand, datatype, value generator (from a Random)
+SENSORS = (
+    ("BME280", "*C", "Temperatur", "float", lambda r: round(r.gauss(21, 3), 2)),
+    ("BME280", "%", "Luftfeuchte", "int", lambda r: r.randrange(20, 90)),
+    ("BME280", "hPa", "Druck", "float", lambda r: round(r.gauss(1013, 8), 1)),
+    ("SCD30", "ppm", "CO2", "long", lambda r: r.randrange(400, 2500)),
+    ("VEML7700", "lx", "Licht", "long", lambda r: r.randrange(0, 60000)),
+    ("Akku", "%", "Ladung", "byte", lambda r: r.randrange(0, 101)),
+    ("Gateway", "enum", "Status", "string",
+     lambda r: r.choice(("active", "idle", "charging", "error"))),
+)
+
+# ====================================================================== #
+# Virtual devices
+# ====================================================================== #
+
+
+class VirtualDevice:
+    """One simulated node; next_uplink() returns its next raw payload."""
+
+    MODES = ("padded", "compact", "batch")
+
+    def __init__(self, index, rng, log_rate):
+        self.dev_eui = "A1B2C3D4{:08X}".format(index)
+        self.location = "Raum {}".format(100 + index % 400)
+        self.sensors = rng.sample(SENSORS, rng.randrange(1, 4))
+        self.mode = rng.choice(self.MODES)
+        self.custom_time = rng.random() < 0.3
+        self.log_rate = log_rate
+        self._rng = rng
+
+    def next_uplink(self):
+        rng = self._rng
+        if rng.random() < self.log_rate:
+            message = rng.choice(LOG_MESSAGES)
+            return bytes([LoRaMINT.LOG_MARKER]) + message.encode("ascii")
+
+        stamp = int(time.time()) if self.custom_time else None
+        values = [MintValue(generate(rng), unit, self.location, measurand,
+                            sensor, datatype=datatype, time=stamp)
+                  for sensor, unit, measurand, datatype, generate in self.sensors]
+        if self.mode == "batch":
+            return MintBatch.pack(values, MAX_PAYLOAD)[0].to_bytes()
+        # like a node sending its values one by one: pick one per uplink
+        return rng.choice(values).to_bytes(compact=self.mode == "compact")
+
+    def body(self):
+        return json.dumps({
+            "end_device_ids": {"dev_eui": self.dev_eui},
+            "uplink_message": {
+                "frm_payload": base64.b64encode(self.next_uplink()).decode(),
+            },
+        }).encode()
+
+
+# ====================================================================== #
+# HTTP
+# ====================================================================== #
+
+
+class Connection:
+    """A keep-alive HTTP/1.1 connection that POSTs JSON bodies."""
+
+    def __init__(self, url, api_key, timeout):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self.path = parts.path or "/"
+        self.headers = ("Host: {}\r\nContent-Type: application/json\r\n"
+                        "X-Downlink-Apikey: {}\r\nConnection: keep-alive\r\n"
+                        ).format(parts.netloc, api_key)
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+
+    async def post(self, body):
+        """Send one request; return (status, response body)."""
+        try:
+            return await asyncio.wait_for(self._post(body), self.timeout)
+        except BaseException:
+            self.close()    # the connection state is unknown now
+            raise
+
+    async def _post(self, body):
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(
+                self.host, self.port, ssl=self.ssl)
+        head = "POST {} HTTP/1.1\r\n{}Content-Length: {}\r\n\r\n".format(
+            self.path, self.headers, len(body))
+        self._writer.write(head.encode() + body)
+
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed by server")
+        status = int(status_line.split()[1])
+        length, chunked, close = 0, False, False
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name, value = name.strip().lower(), value.strip().lower()
+            if name == "content-length":
+                length = int(value)
+            elif name == "transfer-encoding" and "chunked" in value:
+                chunked = True
+            elif name == "connection" and value == "close":
+                close = True
+
+        if chunked:
+            data = bytearray()
+            while True:
+                size = int((await self._reader.readline()).split(b";")[0], 16)
+                data += await self._reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                del data[-2:]
+            data = bytes(data[:-2])
+        else:
+            data = await self._reader.readexactly(length)
+        if close:
+            self.close()
+        return status, data
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+# ====================================================================== #
+# Load run
+# ====================================================================== #
+
+
+class Results:
+    def __init__(self):
+        self.latencies = []       # seconds, successful and failed requests
+        self.statuses = {}        # status code or exception name -> count
+        self.errors = 0
+        self.samples = {}         # first response body per failure kind
+
+    def add(self, latency, status, body=b""):
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status != 200:
+            self.errors += 1
+            self.samples.setdefault(status, body[:200].decode("utf-8", "replace"))
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return float("nan")
+    return ordered[min(len(ordered) - 1, max(0, int(len(ordered) * fraction + 0.5) - 1))]
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    devices = [VirtualDevice(i, random.Random(rng.random()), args.log_rate)
+               for i in range(args.devices)]
+    rate = args.rate or args.devices / args.interval
+    url = args.url.rstrip("/") + "/webhook"
+
+    pool = asyncio.LifoQueue()
+    for _ in range(args.connections):
+        pool.put_nowait(Connection(url, args.api_key, args.timeout))
+
+    warmup = Results()
+    measured = Results()
+
+    async def request(device, due, started):
+        body = device.body()
+        connection = await pool.get()
+        try:
+            status, data = await connection.post(body)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError,
+                ValueError, IndexError) as e:
+            status, data = type(e).__name__, str(e).encode()
+        finally:
+            pool.put_nowait(connection)
+        latency = time.perf_counter() - due
+        (measured if due - started >= args.warmup else warmup).add(
+            latency, status, data)
+
+    print("{} devices, {:.1f} uplinks/s for {} s (+{} s warm-up), {} connections -> {}".format(
+        args.devices, rate, args.duration, args.warmup, args.connections, url),
+        file=sys.stderr)
+
+    started = time.perf_counter()
+    end = started + args.warmup + args.duration
+    tasks = set()
+    sent = 0
+    order = list(range(len(devices)))
+    while True:
+        due = started + sent / rate
+        if due >= end:
+            break
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # round-robin in a shuffled order, like nodes with equal intervals
+        if sent % len(order) == 0:
+            rng.shuffle(order)
+        task = asyncio.ensure_future(
+            request(devices[order[sent % len(order)]], due, started))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        sent += 1
+        if args.progress and sent % max(1, int(rate * args.progress)) == 0:
+            done = len(measured.latencies) + len(warmup.latencies)
+            print("  {:>6.1f} s  sent {}  done {}  in flight {}".format(
+                time.perf_counter() - started, sent, done, len(tasks)),
+                file=sys.stderr)
+    if tasks:
+        await asyncio.wait(tasks)
+    elapsed = time.perf_counter() - started - args.warmup
+
+    for _ in range(args.connections):
+        (await pool.get()).close()
+    return measured, elapsed
+
+
+def report(results, elapsed, as_json):
+    ordered = sorted(results.latencies)
+    count = len(ordered)
+    summary = {
+        "requests": count,
+        "errors": results.errors,
+        "error_rate": results.errors / count if count else 0.0,
+        "throughput": (count - results.errors) / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": percentile(ordered, 0.50) * 1000,
+            "p95": percentile(ordered, 0.95) * 1000,
+            "p99": percentile(ordered, 0.99) * 1000,
+            "max": ordered[-1] * 1000 if ordered else float("nan"),
+        },
+        "statuses": {str(k): v for k, v in results.statuses.items()},
+    }
+    if as_json:
+        print(json.dumps(summary, indent=2))
+        return summary
+
+    latency = summary["latency_ms"]
+    print()
+    print("requests     {}".format(count))
+    print("errors       {} ({:.2%})".format(results.errors, summary["error_rate"]))
+    print("throughput   {:.1f} stored uplinks/s".format(summary["throughput"]))
+    print("latency      p50 {p50:.1f} ms   p95 {p95:.1f} ms   p99 {p99:.1f} ms   max {max:.1f} ms".format(**latency))
+    print("statuses     {}".format(", ".join(
+        "{}: {}".format(k, v) for k, v in sorted(summary["statuses"].items()))))
+    for status, sample in results.samples.items():
+        print("  {} e.g. {}".format(status, sample))
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default=os.environ.get("LOAD_BASE_URL", BASE_URL),
+                        help="API base URL (default %(default)s)")
+    parser.add_argument("--api-key", default=os.environ.get("TTN_APP_KEY", "your-ttn-api-key"))
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--interval", type=float, default=60.0,
+                        help="seconds between uplinks of one device")
+    parser.add_argument("--rate", type=float,
+                        help="total uplinks/s (overrides --interval)")
+    parser.add_argument("--duration", type=float, default=60.0,
+                        help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0,
+                        help="seconds sent before measuring starts")
+    parser.add_argument("--connections", type=int, default=32,
+                        help="keep-alive connections in the pool")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--log-rate", type=float, default=0.05,
+                        help="fraction of uplinks that are log messages")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--progress", type=float, default=10.0,
+                        help="print progress every N seconds (0 = off)")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    results, elapsed = asyncio.run(run(args))
+    summary = report(results, elapsed, args.json)
+    sys.exit(1 if summary["requests"] == 0 else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,8 +16,11 @@ import {
   parsePagination,
   createPagination,
   PaginationResponseSchema,
+  decodeUplink,
+  isFragment,
+  parseFragment,
 } from "./lib";
-import { measurements, logEntries } from "./services";
+import { measurements, logEntries, deviceMetadata, uplinkFragments } from "./services";
 import {
   TtnPayloadSchema,
   MeasurementSchema,
@@ -28,6 +31,13 @@ import {
   MeasurementMetadataQuerySchema,
   MeasurementMetadataSchema,
 } from "./types";
+import type {
+  MutationResult,
+  TtnDecodedPayload,
+  ValidatedLogEntry,
+  ValidatedMeasurement,
+  ValidatedMetadata,
+} from "./types";
 
 const app = new Hono();
 
@@ -47,6 +57,7 @@ app.onError((err, c) => {
 const WebhookResponseSchema = z.object({
   ok: z.boolean(),
   id: z.string().uuid().optional(),
+  ids: z.array(z.string().uuid()).optional(),
   error: z.string().optional(),
 });
 
@@ -60,6 +71,80 @@ const LogEntryListResponseSchema = z.object({
   pagination: PaginationResponseSchema,
 });
 
+//====================================
+// INGEST
+//====================================
+
+type ValidatedPayload =
+  | { messagetyp: "Metadaten"; data: ValidatedMetadata }
+  | { messagetyp: "Messwert"; data: ValidatedMeasurement }
+  | { messagetyp: "LogEintrag"; data: ValidatedLogEntry };
+
+/**
+ * Validates every payload decoded from one uplink before anything is stored,
+ * so a bad record rejects the whole uplink instead of leaving the records in
+ * front of it stored (TTN would retry and store those twice). Values that
+ * refer to metadata are resolved against the registrations earlier in the
+ * same uplink, then against the stored ones.
+ */
+const validatePayloads = async (
+  decoded: TtnDecodedPayload[],
+  deviceEui: string,
+): Promise<MutationResult<ValidatedPayload[]>> => {
+  const validated: ValidatedPayload[] = [];
+  const pending = new Map<number, ValidatedMetadata>();
+  for (const payload of decoded) {
+    if (payload.messagetyp === "Metadaten") {
+      const result = deviceMetadata.validate(payload, deviceEui);
+      if (!result.ok) return result;
+      pending.set(result.data.metadataId, result.data);
+      validated.push({ messagetyp: "Metadaten", data: result.data });
+      continue;
+    }
+
+    const resolved = await deviceMetadata.resolve(payload, deviceEui, pending);
+    if (!resolved.ok) return resolved;
+
+    if (payload.messagetyp === "Messwert") {
+      const result = measurements.validate(resolved.data, deviceEui);
+      if (!result.ok) return result;
+      validated.push({ messagetyp: "Messwert", data: result.data });
+    } else if (payload.messagetyp === "LogEintrag") {
+      const result = logEntries.validate(resolved.data, deviceEui);
+      if (!result.ok) return result;
+      validated.push({ messagetyp: "LogEintrag", data: result.data });
+    } else {
+      return { ok: false, error: `Unknown message type: ${payload.messagetyp}` };
+    }
+  }
+  return { ok: true, data: validated };
+};
+
+/**
+ * Stores one validated payload via the service matching its message type.
+ * Metadata registrations are stored without an id of their own.
+ */
+const storePayload = async (payload: ValidatedPayload): Promise<MutationResult<{ id?: string }>> => {
+  if (payload.messagetyp === "Metadaten") {
+    const { metadataId, deviceEui } = payload.data;
+    const result = await deviceMetadata.store(payload.data);
+    if (!result.ok) return result;
+    console.log(`Metadata ${metadataId} registered for ${deviceEui}`);
+    return { ok: true, data: {} };
+  }
+
+  if (payload.messagetyp === "Messwert") {
+    const { measurand, value, deviceEui } = payload.data;
+    const result = await measurements.store(payload.data);
+    if (result.ok) console.log(`Measurement stored: ${measurand}=${value} from ${deviceEui}`);
+    return result;
+  }
+
+  const result = await logEntries.store(payload.data);
+  if (result.ok) console.log(`Log entry stored from ${payload.data.deviceEui}: ${payload.data.message}`);
+  return result;
+};
+
 //====================================
 // ROUTES
 //====================================
@@ -74,7 +159,12 @@ app.post(
     tags: ["Webhook"],
     summary: "Receive TTN webhook",
     description:
-      "Receives uplink messages from The Things Network and stores measurements or log entries.",
+      "Receives uplink messages from The Things Network and stores measurements or log entries. " +
+      "The raw frm_payload is decoded by the backend when present (a batch frame stores several " +
+      "measurements, listed in `ids`); otherwise the TTN decoded_payload is used. A fragment of a " +
+      "payload too large for the node's data rate is stored until all fragments have arrived " +
+      "(`ids` stays empty until then), and the reassembled payload is decoded. The readings of a " +
+      "timed batch sent before the node's clock was synced are dated back from `received_at`.",
     responses: {
       200: jsonResponse(WebhookResponseSchema, "Successfully stored"),
       400: jsonResponse(WebhookResponseSchema, "Validation error"),
@@ -90,29 +180,42 @@ app.post(
 
     const body = c.req.valid("json");
     const deviceEui = body.end_device_ids.dev_eui;
-    const payload = body.uplink_message.decoded_payload;
-    const messageType = payload.messagetyp;
-
-    if (messageType === "Messwert") {
-      const result = await measurements.ingest(payload, deviceEui);
-      if (!result.ok) return c.json({ ok: false, error: result.error }, 400);
-      console.log(
-        `Measurement stored: ${payload.measurand}=${payload.value} from ${deviceEui}`,
+    const { frm_payload, decoded_payload, received_at } = body.uplink_message;
+
+    let payloads: TtnDecodedPayload[];
+    if (frm_payload) {
+      let bytes: Uint8Array = Buffer.from(frm_payload, "base64");
+      if (isFragment(bytes)) {
+        const fragment = parseFragment(bytes);
+        if (!fragment.ok) return c.json({ ok: false, error: fragment.error }, 400);
+        const collected = await uplinkFragments.collect(fragment.data, deviceEui);
+        if (!collected.ok) return c.json({ ok: false, error: collected.error }, 400);
+        if (!collected.data) return c.json({ ok: true, ids: [] });
+        bytes = collected.data;
+      }
+      const receivedAt = received_at ? Date.parse(received_at) / 1000 : NaN;
+      const decoded = decodeUplink(bytes, Number.isFinite(receivedAt) ? receivedAt : undefined);
+      if (!decoded.ok) return c.json({ ok: false, error: decoded.error }, 400);
+      payloads = decoded.data;
+    } else if (decoded_payload) {
+      payloads = [decoded_payload];
+    } else {
+      return c.json(
+        { ok: false, error: "uplink_message needs frm_payload or decoded_payload" },
+        400,
       );
-      return c.json({ ok: true, id: result.data.id });
     }
 
-    if (messageType === "LogEintrag") {
-      const result = await logEntries.ingest(payload, deviceEui);
-      if (!result.ok) return c.json({ ok: false, error: result.error }, 400);
-      console.log(`Log entry stored from ${deviceEui}: ${payload.message}`);
-      return c.json({ ok: true, id: result.data.id });
-    }
+    const validated = await validatePayloads(payloads, deviceEui);
+    if (!validated.ok) return c.json({ ok: false, error: validated.error, ids: [] }, 400);
 
-    return c.json(
-      { ok: false, error: `Unknown message type: ${messageType}` },
-      400,
-    );
+    const ids: string[] = [];
+    for (const payload of validated.data) {
+      const result = await storePayload(payload);
+      if (!result.ok) return c.json({ ok: false, error: result.error, ids }, 400);
+      if (result.data.id) ids.push(result.data.id);
+    }
+    return c.json({ ok: true, id: ids[0], ids });
   },
 );
 
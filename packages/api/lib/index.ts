@@ -2,3 +2,5 @@ export { openApiMeta, jsonResponse } from "./openapi";
 export { parsePagination, createPagination, PaginationResponseSchema } from "./pagination";
 export type { PaginationParams, PaginationResponse } from "./pagination";
 export { v } from "./validator";
+export { assembleFragments, decodeUplink, isFragment, parseFragment } from "./uplink";
+export type { UplinkFragment } from "./uplink";
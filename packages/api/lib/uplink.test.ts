@@ -0,0 +1,250 @@
+import { describe, expect, test } from "bun:test";
+import { assembleFragments, decodeUplink, parseFragment } from "./uplink";
+import type { UplinkFragment } from "./uplink";
+
+const SEP = 0x1e;
+
+/** Builds raw frame bytes from byte values and ASCII strings. */
+const frame = (...parts: (number | string | number[])[]) =>
+  new Uint8Array(
+    parts.flatMap((p) =>
+      typeof p === "string" ? [...p].map((ch) => ch.charCodeAt(0)) : Array.isArray(p) ? p : [p],
+    ),
+  );
+
+// MintValue(21.5, "*C", "Raum 101", "Temperatur", "BME280"): float, server time
+const temperatureRecord = [
+  (4 << 2) | 1,
+  ...[0x41, 0xac, 0x00, 0x00],
+  SEP,
+  ...frame("*C", SEP, "Temperatur", SEP, "Raum 101", SEP, "BME280", SEP),
+];
+
+// MintValue(65, "%", "Raum 101", "Feuchte", "BME280", datatype="int", time=1700000000)
+const humidityRecord = [
+  (2 << 2) | 2,
+  0x00,
+  0x41,
+  SEP,
+  ...frame("%", SEP, "Feuchte", SEP, "Raum 101", SEP, "BME280", SEP),
+  ...[0x65, 0x53, 0xf1, 0x00],
+];
+
+const padded = (bytes: Uint8Array) => {
+  const out = new Uint8Array(99);
+  out.set(bytes);
+  return out;
+};
+
+describe("decodeUplink", () => {
+  test("decodes a log frame", () => {
+    const result = decodeUplink(frame(0x05, "ESP32 gestartet"));
+    expect(result).toEqual({ ok: true, data: [{ messagetyp: "LogEintrag", message: "ESP32 gestartet" }] });
+  });
+
+  test("expands a compressed log frame with the shared dictionary", () => {
+    // MintLog.encode(...) on the node
+    expect(decodeUplink(frame(0x0b, 0x80))).toEqual({ ok: true, data: [{ messagetyp: "LogEintrag", message: "ESP32 gestartet" }] });
+    const result = decodeUplink(frame(0x0b, 0x91, 0x20, 0x9e, 0xef, 0xae, 0x65, 0x20, 0xaf, 0x20, 0x7a, 0x75, 0x6d, 0x20, 0x96));
+    expect(result.ok && result.data[0]?.message).toBe("Sensor Fehler: keine Verbindung zum BME280");
+    const stats = decodeUplink(frame(0x0b, 0x82, "3600", 0x83, "58", 0x84, "0", 0x85, "1", 0x86, "0", 0x87, "2", 0xf8, "4", 0x88, "41", 0xf8, "0"));
+    expect(stats.ok && stats.data[0]?.message).toBe("stats up=3600 ok=58 to=0 err=1 busy=0 b=2204 air=41200");
+  });
+
+  test("decodes a padded 99-byte value frame", () => {
+    const result = decodeUplink(padded(frame(0x06, temperatureRecord)));
+    expect(result.ok).toBe(true);
+    if (!result.ok) return;
+    expect(result.data).toEqual([
+      {
+        messagetyp: "Messwert",
+        datatype: "float",
+        unit: "*C",
+        measurand: "Temperatur",
+        location: "Raum 101",
+        sensor: "BME280",
+        value: 21.5,
+        timemethode: "server",
+        timevalue: undefined,
+      },
+    ]);
+  });
+
+  test("decodes an integer value with a custom timestamp", () => {
+    const result = decodeUplink(padded(frame(0x06, humidityRecord)));
+    expect(result.ok && result.data[0]).toMatchObject({
+      datatype: "integer",
+      value: 65,
+      timemethode: "custom",
+      timevalue: 1700000000,
+    });
+  });
+
+  test("decodes a compact (unpadded) value frame like its padded form", () => {
+    const compact = decodeUplink(frame(0x06, temperatureRecord[0]! | 0x80, temperatureRecord.slice(1)));
+    const full = decodeUplink(padded(frame(0x06, temperatureRecord)));
+    expect(compact).toEqual(full);
+  });
+
+  test("rejects trailing bytes after a compact value", () => {
+    const result = decodeUplink(frame(0x06, temperatureRecord[0]! | 0x80, temperatureRecord.slice(1), 0, 0));
+    expect(result.ok).toBe(false);
+  });
+
+  test("decodes signed ints and string values", () => {
+    const negative = decodeUplink(frame(0x06, (2 << 2) | 1, 0xff, 0xfe, SEP, "u", SEP, "m", SEP, "l", SEP, "s", SEP));
+    expect(negative.ok && negative.data[0]?.value).toBe(-2);
+
+    const text = decodeUplink(frame(0x06, (6 << 2) | 1, "active", SEP, "enum", SEP, "status", SEP, "gw", SEP, "int", SEP));
+    expect(text.ok && text.data[0]).toMatchObject({ datatype: "string", value: "active" });
+  });
+
+  test("trims single-precision noise from floats", () => {
+    // 23.4 as an IEEE-754 single
+    const result = decodeUplink(frame(0x06, (4 << 2) | 1, 0x41, 0xbb, 0x33, 0x33, SEP, "u", SEP, "m", SEP, "l", SEP, "s", SEP));
+    expect(result.ok && result.data[0]?.value).toBe(23.4);
+  });
+
+  test("decodes half-precision floats as their shortest decimal", () => {
+    // MintValue(23.4, ..., datatype="half") with metadata id 1: 0x4dda is 23.40625
+    const result = decodeUplink(frame(0x06, 0xc0 | (7 << 2) | 1, 1, 0x4d, 0xda));
+    expect(result.ok && result.data[0]).toMatchObject({ datatype: "float", value: 23.4, metadata_id: 1 });
+
+    const negative = decodeUplink(frame(0x06, 0xc0 | (7 << 2) | 1, 1, 0xae, 0x66));
+    expect(negative.ok && negative.data[0]?.value).toBe(-0.1);
+
+    // 1000.5 needs all five digits; inline metadata as usual
+    const large = decodeUplink(frame(0x06, 0x80 | (7 << 2) | 1, 0x63, 0xd1, SEP, "*", SEP, "T", SEP, "R", SEP, "S", SEP));
+    expect(large.ok && large.data[0]?.value).toBe(1000.5);
+  });
+
+  test("decodes fixed-point values with the step in the datatype", () => {
+    // MintValue(55, ..., resolution=1, limits=(0, 100)) -> fixed8 in steps of 1 (11)
+    const fixed8 = decodeUplink(frame(0x06, 0xc0 | (11 << 2) | 1, 1, 0x37));
+    expect(fixed8.ok && fixed8.data[0]).toMatchObject({ datatype: "float", value: 55 });
+
+    // -0.5 as fixed8 in steps of 0.1 (10): raw -5
+    const negative = decodeUplink(frame(0x06, 0xc0 | (10 << 2) | 1, 1, 0xfb));
+    expect(negative.ok && negative.data[0]?.value).toBe(-0.5);
+
+    // MintValue(21.5, ..., resolution=0.1, limits=(-40, 85)) -> fixed16 in steps of 0.1 (14): raw 215
+    const fixed16 = decodeUplink(frame(0x06, 0xc0 | (14 << 2) | 1, 2, 0x00, 0xd7));
+    expect(fixed16.ok && fixed16.data[0]?.value).toBe(21.5);
+
+    // 3.3 V at 0.001 (12): raw 3300
+    const volts = decodeUplink(frame(0x06, 0xc0 | (12 << 2) | 1, 2, 0x0c, 0xe4));
+    expect(volts.ok && volts.data[0]?.value).toBe(3.3);
+
+    expect(decodeUplink(frame(0x06, 0xc0 | (14 << 2) | 1, 2, 0x00)).ok).toBe(false);
+  });
+
+  test("decodes every record of a batch frame", () => {
+    const result = decodeUplink(frame(0x07, 2, temperatureRecord, humidityRecord));
+    expect(result.ok).toBe(true);
+    if (!result.ok) return;
+    expect(result.data.map((p) => p.measurand)).toEqual(["Temperatur", "Feuchte"]);
+    expect(result.data[1]?.timevalue).toBe(1700000000);
+  });
+
+  test("decodes a metadata registration chained with a value referring to it", () => {
+    const registration = frame(0x08, 3, "*C", SEP, "Temperatur", SEP, "Raum 101", SEP, "BME280", SEP);
+    const result = decodeUplink(frame([...registration], 0x06, 0x80 | 0x40 | (4 << 2) | 1, 3, 0x41, 0xac, 0x00, 0x00));
+    expect(result).toEqual({
+      ok: true,
+      data: [
+        { messagetyp: "Metadaten", metadata_id: 3, unit: "*C", measurand: "Temperatur", location: "Raum 101", sensor: "BME280" },
+        { messagetyp: "Messwert", datatype: "float", metadata_id: 3, value: 21.5, timemethode: "server", timevalue: undefined },
+      ],
+    });
+  });
+
+  test("decodes metadata-ref records in a batch, with strings and timestamps", () => {
+    const result = decodeUplink(
+      frame(0x07, 2, 0x40 | (6 << 2) | 1, 7, "active", SEP, 0x40 | (2 << 2) | 2, 9, 0x00, 0x41, 0x65, 0x53, 0xf1, 0x00),
+    );
+    expect(result.ok).toBe(true);
+    if (!result.ok) return;
+    expect(result.data[0]).toMatchObject({ metadata_id: 7, datatype: "string", value: "active" });
+    expect(result.data[1]).toMatchObject({ metadata_id: 9, value: 65, timevalue: 1700000000 });
+    expect(result.data[1]?.unit).toBeUndefined();
+  });
+
+  test("dates the records of a timed batch from its base time and offsets", () => {
+    // TimedBatch(base=1700000000): offsets 0 and 200 s (varint 0xc8 0x01); the second record keeps its own time
+    const result = decodeUplink(frame(0x0a, 2, 0x01, 0x65, 0x53, 0xf1, 0x00, 0, temperatureRecord, 0xc8, 0x01, humidityRecord));
+    expect(result.ok).toBe(true);
+    if (!result.ok) return;
+    expect(result.data[0]).toMatchObject({ measurand: "Temperatur", value: 21.5, timemethode: "custom", timevalue: 1700000000 });
+    expect(result.data[1]).toMatchObject({ measurand: "Feuchte", timemethode: "custom", timevalue: 1700000000 });
+
+    const offset = decodeUplink(frame(0x0a, 1, 0x01, 0x65, 0x53, 0xf1, 0x00, 0xc8, 0x01, temperatureRecord));
+    expect(offset.ok && offset.data[0]?.timevalue).toBe(1700000200);
+  });
+
+  test("dates an unsynced timed batch back from the receive time", () => {
+    const result = decodeUplink(frame(0x0a, 2, 0x00, 90, temperatureRecord, 30, temperatureRecord), 1700000100);
+    expect(result.ok).toBe(true);
+    if (!result.ok) return;
+    expect(result.data.map((p) => p.timevalue)).toEqual([1700000010, 1700000070]);
+  });
+
+  test("rejects a timed batch with a truncated header or offset", () => {
+    expect(decodeUplink(frame(0x0a, 1)).ok).toBe(false);
+    expect(decodeUplink(frame(0x0a, 1, 0x01, 0x65, 0x53)).ok).toBe(false);
+    expect(decodeUplink(frame(0x0a, 1, 0x00, 0x80)).ok).toBe(false);
+  });
+
+  test("rejects a batch with fewer records than announced", () => {
+    const result = decodeUplink(frame(0x07, 3, temperatureRecord, humidityRecord));
+    expect(result.ok).toBe(false);
+  });
+
+  test("rejects a truncated record", () => {
+    expect(decodeUplink(frame(0x06, (4 << 2) | 1, 0x41, 0xac)).ok).toBe(false);
+    expect(decodeUplink(frame(0x06, temperatureRecord.slice(0, -3))).ok).toBe(false);
+  });
+
+  test("rejects an unknown datatype or marker", () => {
+    expect(decodeUplink(frame(0x06, (0 << 2) | 1, 0, SEP)).ok).toBe(false);
+    expect(decodeUplink(frame(0x42)).ok).toBe(false);
+    expect(decodeUplink(new Uint8Array()).ok).toBe(false);
+  });
+});
+
+describe("fragments", () => {
+  // MintFragment.split(frame(0x06, temperatureRecord), 17, 7): 37 bytes in 3 fragments of up to 13 data bytes
+  const value = frame(0x06, temperatureRecord);
+  const fragments = [0, 1, 2].map((i) => frame(0x09, 7, i, 3, [...value.subarray(i * 13, (i + 1) * 13)]));
+
+  const parsed = (bytes: Uint8Array): UplinkFragment => {
+    const result = parseFragment(bytes);
+    if (!result.ok) throw new Error(result.error);
+    return result.data;
+  };
+
+  test("parses the fragment header", () => {
+    const fragment = parsed(fragments[1]!);
+    expect(fragment).toMatchObject({ message: 7, index: 1, count: 3 });
+    expect([...fragment.data]).toEqual([...value.subarray(13, 26)]);
+  });
+
+  test("reassembles fragments received in any order into the original payload", () => {
+    const payload = assembleFragments([2, 0, 1].map((i) => parsed(fragments[i]!)));
+    expect(payload).not.toBeNull();
+    expect(decodeUplink(payload!)).toEqual(decodeUplink(value));
+  });
+
+  test("does not assemble an incomplete or mixed set", () => {
+    expect(assembleFragments([parsed(fragments[0]!), parsed(fragments[2]!)])).toBeNull();
+    const other = parsed(frame(0x09, 8, 1, 3, 0x00));
+    expect(assembleFragments([parsed(fragments[0]!), other, parsed(fragments[2]!)])).toBeNull();
+  });
+
+  test("rejects malformed fragments and undecoded fragment frames", () => {
+    expect(parseFragment(frame(0x09, 7, 0, 3)).ok).toBe(false);
+    expect(parseFragment(frame(0x09, 7, 3, 3, 0x00)).ok).toBe(false);
+    expect(parseFragment(frame(0x09, 7, 0, 1, 0x00)).ok).toBe(false);
+    expect(parseFragment(value).ok).toBe(false);
+    expect(decodeUplink(fragments[0]!).ok).toBe(false);
+  });
+});
@@ -0,0 +1,397 @@
+import type { MutationResult, TimeMethod, TtnDecodedPayload } from "../types";
+
+//====================================
+// CONSTANTS
+//====================================
+
+/** First byte of every LoRaMINT uplink, selecting the frame type. */
+const LOG_MARKER = 0x05;
+const VALUE_MARKER = 0x06;
+const BATCH_MARKER = 0x07;
+const REGISTRATION_MARKER = 0x08;
+const FRAGMENT_MARKER = 0x09;
+const TIMED_BATCH_MARKER = 0x0a;
+const COMPRESSED_LOG_MARKER = 0x0b;
+
+/** Fragment header: marker, message number, fragment index, fragment count. */
+const FRAGMENT_HEADER_SIZE = 4;
+
+/** Timed batch flags bit 0: a 4-byte base time follows the flags byte. */
+const TIMED_BASE_FLAG = 0x01;
+
+const SEPARATOR = 0x1e;
+
+/** `option1` bit 7: the value frame carries no zero padding (compact mode). */
+const COMPACT_FLAG = 0x80;
+
+/** `option1` bit 6: the record carries a metadata id instead of the four metadata fields. */
+const METADATA_REF_FLAG = 0x40;
+
+/** Wire datatype (`(option1 & 0x3c) >> 2`) -> backend datatype and value size in bytes (0 = separator-terminated string). */
+const WIRE_DATATYPES: Record<number, { datatype: string; size: number }> = {
+  1: { datatype: "integer", size: 1 }, // byte (unsigned)
+  2: { datatype: "integer", size: 2 }, // int (signed 16-bit)
+  3: { datatype: "integer", size: 4 }, // long (signed 32-bit)
+  4: { datatype: "float", size: 4 }, // float (IEEE-754 single)
+  5: { datatype: "float", size: 4 }, // double (sent as a single, like the AVR build)
+  6: { datatype: "string", size: 0 },
+  7: { datatype: "float", size: 2 }, // half (IEEE-754 half precision)
+  8: { datatype: "float", size: 1 }, // fixed8 (signed raw value), steps of 0.001
+  9: { datatype: "float", size: 1 }, // fixed8, 0.01
+  10: { datatype: "float", size: 1 }, // fixed8, 0.1
+  11: { datatype: "float", size: 1 }, // fixed8, 1
+  12: { datatype: "float", size: 2 }, // fixed16 (signed raw value), 0.001
+  13: { datatype: "float", size: 2 }, // fixed16, 0.01
+  14: { datatype: "float", size: 2 }, // fixed16, 0.1
+  15: { datatype: "float", size: 2 }, // fixed16, 1
+};
+
+const HALF = 7;
+const FIXED16 = 12;
+
+/**
+ * Compressed log frames: byte `0x80 + i` stands for `LOG_DICTIONARY[i]`, bytes
+ * below `0x80` for themselves. Must match `MintLog.DICTIONARY` on the node
+ * entry for entry.
+ */
+const LOG_DICTIONARY: readonly string[] = [
+  // whole messages and status lines of the library and its examples
+  "ESP32 gestartet", "Sensor gestartet", "stats up=", " ok=", " to=", " err=",
+  " busy=", " b=", " air=", " join=", " at=", " heap=", "config interval=",
+  " deadband=", " batch=", " dr=adr", " dr=",
+  // words of sensor-node logs
+  "Sensor", "sensor", "ESP32", "LoRaMINT", "LA66", "BME280", "I2C", "UART",
+  "Gateway", "gestartet", "gesendet", "fehlgeschlagen", "Neustart", "Fehler",
+  "error", "Error", "failed", "timeout", "Timeout", "retry", "reset", "start",
+  "ready", "join", "send", "read", "not ", "found", "nicht ", "kein",
+  "Verbindung", "Batterie", "battery", "Spannung", "niedrig", "Messung",
+  "Temperatur", "Feuchte", "Druck", "Raum ", "Wert", "value", "status",
+  "OK", "low", "ung", "the ", "and ", "und ", "der ", "die ", "ist ",
+  "tion", "ing", "ein", "sch", "ich", "ter", "ten", "gen",
+  // frequent letter pairs (German and English)
+  "en", "er", "ch", "te", "in", "st", "ei", "ie", "ge", "an", "un", "de",
+  "nd", "re", "es", "on", "at", "or", "ar", "al", "ed", "ti", "it", "le",
+  "ne", "se", "ra", "ro", "ta", "to", "ou", "he", "is", "ss",
+  // separators and numbers
+  ": ", ", ", " - ", "  ", "=0", "=1", "/0", "00", "10", "20", "0.", ".0",
+  ".5", "-1", "255", " 0", " 1",
+];
+
+/** Time flag (`option1 & 0b11`) -> time method. */
+const TIME_METHODS: Record<number, TimeMethod> = { 0: "none", 1: "server", 2: "custom" };
+
+//====================================
+// HELPERS
+//====================================
+
+type Decoded<T> = MutationResult<{ value: T; end: number }>;
+
+type Metadata = { unit?: string; measurand?: string; location?: string; sensor?: string };
+
+const ascii = (bytes: Uint8Array) => String.fromCharCode(...bytes);
+
+/** Reads a 0x1E-terminated ASCII field starting at `offset`. */
+const readField = (bytes: Uint8Array, offset: number): Decoded<string> => {
+  const end = bytes.indexOf(SEPARATOR, offset);
+  if (end === -1) return { ok: false, error: "unterminated field" };
+  return { ok: true, data: { value: ascii(bytes.subarray(offset, end)), end: end + 1 } };
+};
+
+const readNumber = (view: DataView, offset: number, wireType: number): number => {
+  if (wireType === 1) return view.getUint8(offset);
+  if (wireType === 2) return view.getInt16(offset);
+  if (wireType === 3) return view.getInt32(offset);
+  if (wireType === HALF) return readHalf(view, offset);
+  if (wireType > HALF) return readFixed(view, offset, wireType);
+  // float/double: trim the single-precision noise (23.4 -> 23.4, not 23.399999618530273)
+  return Number(view.getFloat32(offset).toPrecision(7));
+};
+
+/**
+ * Reads a half-precision float as the shortest decimal that is still the same
+ * half (23.4, not 23.40625).
+ */
+const readHalf = (view: DataView, offset: number): number => {
+  const bits = view.getUint16(offset);
+  const exponent = (bits >> 10) & 0x1f;
+  const fraction = bits & 0x3ff;
+  const sign = bits & 0x8000 ? -1 : 1;
+  if (exponent === 0x1f) return fraction ? NaN : sign * Infinity;
+  const ulp = 2 ** (Math.max(exponent, 1) - 25);
+  const value = exponent
+    ? sign * (1024 + fraction) * ulp
+    : sign * fraction * ulp;
+  if (value === 0) return value;
+  for (let digits = 1; digits < 5; digits++) {
+    const candidate = Number(value.toPrecision(digits));
+    if (Math.abs(candidate - value) < ulp / 2) return candidate;
+  }
+  return Number(value.toPrecision(5));
+};
+
+/**
+ * Reads a fixed-point value: a signed raw value (8-bit for wire datatypes
+ * 8-11, 16-bit for 12-15) in steps of `10^e`, `e = (wireType & 3) - 3`.
+ */
+const readFixed = (view: DataView, offset: number, wireType: number): number => {
+  const raw = wireType < FIXED16 ? view.getInt8(offset) : view.getInt16(offset);
+  // dividing by 10^-e keeps 0.1 steps exact (215 / 10 = 21.5, not 21.500000000000004)
+  return raw / 10 ** (3 - (wireType & 3));
+};
+
+/** Reads an unsigned LEB128 varint (at most 4 bytes) - a timed batch's time offset. */
+const readVarint = (bytes: Uint8Array, offset: number): Decoded<number> => {
+  let value = 0;
+  for (let i = 0; i < 4; i++) {
+    if (offset + i >= bytes.length) return { ok: false, error: "truncated time offset" };
+    const byte = bytes[offset + i]!;
+    value += (byte & 0x7f) * 2 ** (7 * i);
+    if ((byte & 0x80) === 0) return { ok: true, data: { value, end: offset + i + 1 } };
+  }
+  return { ok: false, error: "time offset too long" };
+};
+
+//====================================
+// DECODING
+//====================================
+
+/** Expands the codes of a compressed log frame (after its `0x0B` marker). Mirrors `MintLog.decode()`. */
+const decodeCompressedLog = (bytes: Uint8Array): string => {
+  let message = "";
+  for (const byte of bytes.subarray(1)) message += byte < 0x80 ? String.fromCharCode(byte) : LOG_DICTIONARY[byte - 0x80];
+  return message;
+};
+
+/** Reads the four `0x1E`-terminated metadata fields (unit, measurand, location, sensor) at `offset`. */
+const readMetadata = (bytes: Uint8Array, offset: number): Decoded<Metadata> => {
+  const fields: string[] = [];
+  let pos = offset;
+  for (let i = 0; i < 4; i++) {
+    const field = readField(bytes, pos);
+    if (!field.ok) return field;
+    fields.push(field.data.value);
+    pos = field.data.end;
+  }
+  const [unit, measurand, location, sensor] = fields;
+  return { ok: true, data: { value: { unit, measurand, location, sensor }, end: pos } };
+};
+
+/**
+ * Decodes one value record - `option1`, value, `0x1E`, unit, measurand,
+ * location and sensor (each `0x1E`-terminated), then the optional 4-byte
+ * Unix time - starting at `offset`. Mirrors `MintValue.to_record()`.
+ *
+ * With the metadata-ref flag set, the four fields are replaced by a 1-byte
+ * metadata id right after `option1`, and a numeric value is not followed by a
+ * separator; the id is left for the webhook to resolve (`metadata_id`).
+ */
+const decodeRecord = (bytes: Uint8Array, offset: number): Decoded<TtnDecodedPayload> => {
+  const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  if (offset >= bytes.length) return { ok: false, error: "truncated record" };
+
+  const option1 = view.getUint8(offset);
+  const wireType = (option1 & 0x3c) >> 2;
+  const type = WIRE_DATATYPES[wireType];
+  if (!type) return { ok: false, error: `unknown datatype: ${wireType}` };
+  const timemethode = TIME_METHODS[option1 & 0b11];
+  if (!timemethode) return { ok: false, error: "unknown time flag" };
+  const isRef = (option1 & METADATA_REF_FLAG) !== 0;
+  let pos = offset + 1;
+
+  let metadataId: number | undefined;
+  if (isRef) {
+    if (pos >= bytes.length) return { ok: false, error: "truncated metadata id" };
+    metadataId = view.getUint8(pos);
+    pos += 1;
+  }
+
+  // Value: fixed-size number, or a string terminated by the record separator
+  let value: number | string;
+  if (type.size === 0) {
+    const field = readField(bytes, pos);
+    if (!field.ok) return field;
+    value = field.data.value;
+    pos = field.data.end;
+  } else {
+    if (pos + type.size > bytes.length) return { ok: false, error: "truncated value" };
+    value = readNumber(view, pos, wireType);
+    pos += type.size;
+    if (!isRef) {
+      if (pos >= bytes.length || view.getUint8(pos) !== SEPARATOR)
+        return { ok: false, error: "missing separator after value" };
+      pos += 1;
+    }
+  }
+
+  // Metadata, in wire order (unless referenced by id)
+  let metadata: Partial<Metadata> = {};
+  if (!isRef) {
+    const fields = readMetadata(bytes, pos);
+    if (!fields.ok) return fields;
+    metadata = fields.data.value;
+    pos = fields.data.end;
+  }
+
+  let timevalue: number | undefined;
+  if (timemethode === "custom") {
+    if (pos + 4 > bytes.length) return { ok: false, error: "truncated timestamp" };
+    timevalue = view.getUint32(pos);
+    pos += 4;
+  }
+
+  const payload: TtnDecodedPayload = { messagetyp: "Messwert", datatype: type.datatype, ...metadata, value, timemethode, timevalue };
+  if (metadataId !== undefined) payload.metadata_id = metadataId;
+  return { ok: true, data: { value: payload, end: pos } };
+};
+
+/**
+ * Decodes a metadata registration: `0x08`, the 1-byte id, then unit,
+ * measurand, location and sensor (each `0x1E`-terminated). Any bytes after it
+ * form the next frame of the same uplink (typically the value using the id).
+ */
+const decodeRegistration = (bytes: Uint8Array, receivedAt: number): MutationResult<TtnDecodedPayload[]> => {
+  if (bytes.length < 2) return { ok: false, error: "truncated metadata registration" };
+  const fields = readMetadata(bytes, 2);
+  if (!fields.ok) return fields;
+  const registration: TtnDecodedPayload = { messagetyp: "Metadaten", metadata_id: bytes[1]!, ...fields.data.value };
+  if (fields.data.end === bytes.length) return { ok: true, data: [registration] };
+
+  const rest = decodeUplink(bytes.subarray(fields.data.end), receivedAt);
+  if (!rest.ok) return rest;
+  return { ok: true, data: [registration, ...rest.data] };
+};
+
+/** Decodes a batch frame: `0x07`, a count byte, then that many value records. */
+const decodeBatch = (bytes: Uint8Array): MutationResult<TtnDecodedPayload[]> => {
+  if (bytes.length < 2) return { ok: false, error: "truncated batch header" };
+  const count = bytes[1]!;
+  const payloads: TtnDecodedPayload[] = [];
+  let pos = 2;
+  for (let i = 0; i < count; i++) {
+    const record = decodeRecord(bytes, pos);
+    if (!record.ok) return { ok: false, error: `batch record ${i + 1}: ${record.error}` };
+    payloads.push(record.data.value);
+    pos = record.data.end;
+  }
+  return { ok: true, data: payloads };
+};
+
+/**
+ * Decodes a timed batch frame: `0x0A`, a count byte, a flags byte, the
+ * optional 4-byte base time, then per reading a varint time offset (seconds)
+ * and its value record. Mirrors `TimedBatch`.
+ *
+ * A reading without a timestamp of its own is dated `base + offset`, or,
+ * when the node's clock was not synced (no base time), `receivedAt - offset`.
+ */
+const decodeTimedBatch = (bytes: Uint8Array, receivedAt: number): MutationResult<TtnDecodedPayload[]> => {
+  if (bytes.length < 3) return { ok: false, error: "truncated timed batch header" };
+  const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  const count = bytes[1]!;
+  let base: number | undefined;
+  let pos = 3;
+  if ((bytes[2]! & TIMED_BASE_FLAG) !== 0) {
+    if (bytes.length < 7) return { ok: false, error: "truncated timed batch header" };
+    base = view.getUint32(3);
+    pos = 7;
+  }
+  const payloads: TtnDecodedPayload[] = [];
+  for (let i = 0; i < count; i++) {
+    const offset = readVarint(bytes, pos);
+    if (!offset.ok) return { ok: false, error: `batch record ${i + 1}: ${offset.error}` };
+    const record = decodeRecord(bytes, offset.data.end);
+    if (!record.ok) return { ok: false, error: `batch record ${i + 1}: ${record.error}` };
+    const payload = record.data.value;
+    if (payload.timemethode === "server") {
+      payload.timemethode = "custom";
+      payload.timevalue = base !== undefined ? base + offset.data.value : Math.floor(receivedAt) - offset.data.value;
+    }
+    payloads.push(payload);
+    pos = record.data.end;
+  }
+  return { ok: true, data: payloads };
+};
+
+/**
+ * Decodes a raw LoRaMINT uplink (TTN's `frm_payload`) into the
+ * `decoded_payload` shape the webhook ingests. A batch frame yields one
+ * payload per packed value; log (plain or compressed) and single-value frames
+ * yield exactly one.
+ * A metadata registration yields a `Metadaten` payload, followed by the
+ * payloads of any frame chained after it. `receivedAt` (Unix seconds, by
+ * default now) dates the readings of a timed batch sent before the node's
+ * clock was synced.
+ */
+export const decodeUplink = (bytes: Uint8Array, receivedAt = Date.now() / 1000): MutationResult<TtnDecodedPayload[]> => {
+  if (bytes.length === 0) return { ok: false, error: "empty payload" };
+
+  const marker = bytes[0]!;
+  if (marker === LOG_MARKER) return { ok: true, data: [{ messagetyp: "LogEintrag", message: ascii(bytes.subarray(1)) }] };
+
+  if (marker === COMPRESSED_LOG_MARKER) return { ok: true, data: [{ messagetyp: "LogEintrag", message: decodeCompressedLog(bytes) }] };
+
+  if (marker === VALUE_MARKER) {
+    // Trailing zero padding up to 99 bytes is simply never read; a compact
+    // frame must end exactly where its record does.
+    const record = decodeRecord(bytes, 1);
+    if (!record.ok) return record;
+    const compact = (bytes[1]! & COMPACT_FLAG) !== 0;
+    if (compact && record.data.end !== bytes.length) return { ok: false, error: "trailing bytes after compact value" };
+    return { ok: true, data: [record.data.value] };
+  }
+
+  if (marker === BATCH_MARKER) return decodeBatch(bytes);
+
+  if (marker === REGISTRATION_MARKER) return decodeRegistration(bytes, receivedAt);
+
+  if (marker === TIMED_BATCH_MARKER) return decodeTimedBatch(bytes, receivedAt);
+
+  if (marker === FRAGMENT_MARKER) return { ok: false, error: "fragment must be reassembled before decoding" };
+
+  return { ok: false, error: `unknown message marker: 0x${marker.toString(16).padStart(2, "0")}` };
+};
+
+//====================================
+// FRAGMENTS
+//====================================
+
+/** One fragment of a payload that was too large for the node's data rate. */
+export type UplinkFragment = { message: number; index: number; count: number; data: Uint8Array };
+
+/** True if the uplink is a fragment, to be reassembled before `decodeUplink()`. */
+export const isFragment = (bytes: Uint8Array): boolean => bytes.length > 0 && bytes[0] === FRAGMENT_MARKER;
+
+/**
+ * Parses a fragment frame: `0x09`, the message number, the fragment index
+ * and count, then the next slice of the original payload. Mirrors
+ * `MintFragment.split()`.
+ */
+export const parseFragment = (bytes: Uint8Array): MutationResult<UplinkFragment> => {
+  if (!isFragment(bytes)) return { ok: false, error: "not a fragment" };
+  if (bytes.length <= FRAGMENT_HEADER_SIZE) return { ok: false, error: "truncated fragment" };
+  const message = bytes[1]!;
+  const index = bytes[2]!;
+  const count = bytes[3]!;
+  if (count < 2 || index >= count) return { ok: false, error: `invalid fragment ${index + 1}/${count}` };
+  return { ok: true, data: { message, index, count, data: bytes.subarray(FRAGMENT_HEADER_SIZE) } };
+};
+
+/**
+ * Joins the fragments of one message back into the original payload. Returns
+ * null unless exactly the fragments 0 .. count-1 of the same message are given
+ * (in any order).
+ */
+export const assembleFragments = (fragments: UplinkFragment[]): Uint8Array | null => {
+  const first = fragments[0];
+  if (!first || fragments.length !== first.count) return null;
+  const ordered = [...fragments].sort((a, b) => a.index - b.index);
+  if (ordered.some((f, i) => f.index !== i || f.count !== first.count || f.message !== first.message)) return null;
+
+  const payload = new Uint8Array(ordered.reduce((size, f) => size + f.data.length, 0));
+  let pos = 0;
+  for (const fragment of ordered) {
+    payload.set(fragment.data, pos);
+    pos += fragment.data.length;
+  }
+  return payload;
+};
@@ -1,6 +1,10 @@
-import { up } from "./migrations/001-initial-schema"
+import { up as initialSchema } from "./migrations/001-initial-schema"
+import { up as deviceMetadata } from "./migrations/002-device-metadata"
+import { up as uplinkFragments } from "./migrations/003-uplink-fragments"
 
 console.log("Running migrations...")
-await up()
+await initialSchema()
+await deviceMetadata()
+await uplinkFragments()
 console.log("Migrations complete.")
 process.exit(0)
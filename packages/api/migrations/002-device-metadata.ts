@@ -0,0 +1,16 @@
+import { sql } from "bun"
+
+export const up = async () => {
+  await sql`
+    CREATE TABLE IF NOT EXISTS device_metadata (
+      device_eui VARCHAR(16) NOT NULL,
+      metadata_id SMALLINT NOT NULL CHECK (metadata_id BETWEEN 0 AND 255),
+      unit VARCHAR(40) NOT NULL,
+      measurand VARCHAR(40) NOT NULL,
+      location VARCHAR(40) NOT NULL,
+      sensor VARCHAR(40) NOT NULL,
+      updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+      PRIMARY KEY (device_eui, metadata_id)
+    )
+  `.simple()
+}
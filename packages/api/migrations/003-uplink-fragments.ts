@@ -0,0 +1,15 @@
+import { sql } from "bun"
+
+export const up = async () => {
+  await sql`
+    CREATE TABLE IF NOT EXISTS uplink_fragments (
+      device_eui VARCHAR(16) NOT NULL,
+      message_id SMALLINT NOT NULL CHECK (message_id BETWEEN 0 AND 255),
+      fragment_index SMALLINT NOT NULL CHECK (fragment_index BETWEEN 0 AND 254),
+      fragment_count SMALLINT NOT NULL CHECK (fragment_count BETWEEN 2 AND 255),
+      data BYTEA NOT NULL,
+      received_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+      PRIMARY KEY (device_eui, message_id, fragment_index)
+    )
+  `.simple()
+}
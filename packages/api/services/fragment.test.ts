@@ -0,0 +1,37 @@
+import { describe, expect, test } from "bun:test";
+import type { UplinkFragment } from "../lib/uplink";
+import { uplinkFragments } from "./fragment";
+
+const EUI = "A1B2C3D4E5F60001";
+
+const fragment = (over: Partial<UplinkFragment> = {}): UplinkFragment => ({
+  message: 7,
+  index: 1,
+  count: 3,
+  data: new Uint8Array([0x06, 0x11]),
+  ...over,
+});
+
+describe("uplinkFragments.validate", () => {
+  test("accepts a valid fragment", () => {
+    const result = uplinkFragments.validate(fragment(), EUI);
+    expect(result).toEqual({
+      ok: true,
+      data: { deviceEui: EUI, messageId: 7, index: 1, count: 3, data: new Uint8Array([0x06, 0x11]) },
+    });
+  });
+
+  test("rejects a device_eui that is not 16 hex chars", () => {
+    expect(uplinkFragments.validate(fragment(), "nope").ok).toBe(false);
+  });
+
+  test("rejects an index outside the fragment count", () => {
+    expect(uplinkFragments.validate(fragment({ index: 3 }), EUI).ok).toBe(false);
+    expect(uplinkFragments.validate(fragment({ index: -1 }), EUI).ok).toBe(false);
+    expect(uplinkFragments.validate(fragment({ count: 1, index: 0 }), EUI).ok).toBe(false);
+  });
+
+  test("rejects an empty fragment", () => {
+    expect(uplinkFragments.validate(fragment({ data: new Uint8Array() }), EUI).ok).toBe(false);
+  });
+});
@@ -0,0 +1,88 @@
+import { sql } from "bun";
+import { assembleFragments } from "../lib/uplink";
+import type { UplinkFragment } from "../lib/uplink";
+import type { MutationResult, ValidatedFragment } from "../types";
+
+//====================================
+// CONSTANTS
+//====================================
+
+const HEX_PATTERN = /^[0-9A-Fa-f]{16}$/;
+
+/** Fragments of a message that is still incomplete after this long are dropped. */
+const FRAGMENT_TTL = "1 hour";
+
+//====================================
+// VALIDATION
+//====================================
+
+const validate = (fragment: UplinkFragment, deviceEui: string): MutationResult<ValidatedFragment> => {
+  if (!HEX_PATTERN.test(deviceEui)) return { ok: false, error: "device_eui must be exactly 16 hex characters" };
+  const { message, index, count, data } = fragment;
+  if (!Number.isInteger(message) || message < 0 || message > 255)
+    return { ok: false, error: "fragment message must be an integer between 0 and 255" };
+  if (!Number.isInteger(count) || count < 2 || count > 255)
+    return { ok: false, error: "fragment count must be an integer between 2 and 255" };
+  if (!Number.isInteger(index) || index < 0 || index >= count)
+    return { ok: false, error: "fragment index must be an integer below the fragment count" };
+  if (data.length === 0) return { ok: false, error: "fragment carries no data" };
+  return { ok: true, data: { deviceEui, messageId: message, index, count, data } };
+};
+
+//====================================
+// STORAGE
+//====================================
+
+/**
+ * Stores a fragment and, if it completes its message, removes and returns all
+ * fragments of that message. Stale fragments - older than the TTL, or left
+ * over from an earlier message with the same (wrapped-around) number but a
+ * different count - are dropped first. A repeated fragment overwrites itself.
+ */
+const store = async (data: ValidatedFragment): Promise<UplinkFragment[]> => {
+  await sql`
+    DELETE FROM uplink_fragments
+    WHERE device_eui = ${data.deviceEui}
+      AND (received_at < now() - ${FRAGMENT_TTL}::interval
+           OR (message_id = ${data.messageId} AND fragment_count <> ${data.count}))
+  `;
+  await sql`
+    INSERT INTO uplink_fragments (device_eui, message_id, fragment_index, fragment_count, data)
+    VALUES (${data.deviceEui}, ${data.messageId}, ${data.index}, ${data.count}, ${Buffer.from(data.data)})
+    ON CONFLICT (device_eui, message_id, fragment_index) DO UPDATE
+      SET fragment_count = EXCLUDED.fragment_count, data = EXCLUDED.data, received_at = now()
+  `;
+  const rows = await sql`
+    DELETE FROM uplink_fragments
+    WHERE device_eui = ${data.deviceEui} AND message_id = ${data.messageId}
+      AND (SELECT count(*) FROM uplink_fragments
+           WHERE device_eui = ${data.deviceEui} AND message_id = ${data.messageId}) = ${data.count}
+    RETURNING fragment_index, fragment_count, data
+  `;
+  return rows.map((row: { fragment_index: number; fragment_count: number; data: Uint8Array }) => ({
+    message: data.messageId,
+    index: row.fragment_index,
+    count: row.fragment_count,
+    data: new Uint8Array(row.data),
+  }));
+};
+
+//====================================
+// PUBLIC API
+//====================================
+
+/**
+ * Validate + store a fragment in one call. Returns the reassembled payload
+ * once the last fragment of a message arrived, null while it is incomplete.
+ */
+const collect = async (fragment: UplinkFragment, deviceEui: string): Promise<MutationResult<Uint8Array | null>> => {
+  const validated = validate(fragment, deviceEui);
+  if (!validated.ok) return validated;
+  const fragments = await store(validated.data);
+  if (fragments.length === 0) return { ok: true, data: null };
+  const payload = assembleFragments(fragments);
+  if (!payload) return { ok: false, error: `fragments of message ${fragment.message} do not fit together` };
+  return { ok: true, data: payload };
+};
+
+export const uplinkFragments = { validate, store, collect };
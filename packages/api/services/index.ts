@@ -1,2 +1,4 @@
 export { measurements } from "./measurement";
 export { logEntries } from "./log-entry";
+export { deviceMetadata } from "./metadata";
+export { uplinkFragments } from "./fragment";
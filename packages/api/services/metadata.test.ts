@@ -0,0 +1,57 @@
+import { describe, expect, test } from "bun:test";
+import type { TtnDecodedPayload } from "../types";
+import { deviceMetadata } from "./metadata";
+
+const EUI = "A1B2C3D4E5F60001";
+
+const payload = (over: Partial<TtnDecodedPayload> = {}): TtnDecodedPayload => ({
+  messagetyp: "Metadaten",
+  metadata_id: 3,
+  unit: "*C",
+  measurand: "Temperatur",
+  location: "Raum 101",
+  sensor: "BME280",
+  ...over,
+});
+
+describe("deviceMetadata.validate", () => {
+  test("accepts a valid registration", () => {
+    const result = deviceMetadata.validate(payload(), EUI);
+    expect(result).toEqual({
+      ok: true,
+      data: { deviceEui: EUI, metadataId: 3, unit: "*C", measurand: "Temperatur", location: "Raum 101", sensor: "BME280" },
+    });
+  });
+
+  test("rejects a device_eui that is not 16 hex chars", () => {
+    expect(deviceMetadata.validate(payload(), "nope").ok).toBe(false);
+  });
+
+  test("rejects a missing or out-of-range metadata_id", () => {
+    expect(deviceMetadata.validate(payload({ metadata_id: undefined }), EUI).ok).toBe(false);
+    expect(deviceMetadata.validate(payload({ metadata_id: 256 }), EUI).ok).toBe(false);
+    expect(deviceMetadata.validate(payload({ metadata_id: -1 }), EUI).ok).toBe(false);
+  });
+
+  test("rejects an empty metadata field", () => {
+    expect(deviceMetadata.validate(payload({ sensor: "" }), EUI).ok).toBe(false);
+  });
+});
+
+describe("deviceMetadata.resolve", () => {
+  test("passes a payload without metadata_id through unchanged", async () => {
+    const value: TtnDecodedPayload = { messagetyp: "Messwert", value: 1 };
+    expect(await deviceMetadata.resolve(value, EUI)).toEqual({ ok: true, data: value });
+  });
+
+  test("resolves against a registration of the same uplink first", async () => {
+    const registered = deviceMetadata.validate(payload(), EUI);
+    if (!registered.ok) throw new Error(registered.error);
+    const pending = new Map([[3, registered.data]]);
+    const value: TtnDecodedPayload = { messagetyp: "Messwert", metadata_id: 3, value: 21.5 };
+    expect(await deviceMetadata.resolve(value, EUI, pending)).toEqual({
+      ok: true,
+      data: { ...value, unit: "*C", measurand: "Temperatur", location: "Raum 101", sensor: "BME280" },
+    });
+  });
+});
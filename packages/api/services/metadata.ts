@@ -0,0 +1,109 @@
+import { sql } from "bun";
+import type { MutationResult, TtnDecodedPayload, ValidatedMetadata } from "../types";
+
+//====================================
+// CONSTANTS
+//====================================
+
+const HEX_PATTERN = /^[0-9A-Fa-f]{16}$/;
+
+//====================================
+// VALIDATION
+//====================================
+
+const validateStringField = (name: string, value: unknown, maxLength: number) => {
+  if (typeof value !== "string" || value.trim().length === 0) return `${name} must be a non-empty string`;
+  if (value.length > maxLength) return `${name} must be at most ${maxLength} characters`;
+  return null;
+};
+
+const validate = (payload: TtnDecodedPayload, deviceEui: string): MutationResult<ValidatedMetadata> => {
+  if (!HEX_PATTERN.test(deviceEui)) return { ok: false, error: "device_eui must be exactly 16 hex characters" };
+
+  const id = payload.metadata_id;
+  if (id === undefined || !Number.isInteger(id) || id < 0 || id > 255)
+    return { ok: false, error: "metadata_id must be an integer between 0 and 255" };
+
+  for (const [name, value] of [
+    ["location", payload.location],
+    ["measurand", payload.measurand],
+    ["sensor", payload.sensor],
+    ["unit", payload.unit],
+  ] as const) {
+    const err = validateStringField(name, value, 40);
+    if (err) return { ok: false, error: err };
+  }
+
+  return {
+    ok: true,
+    data: {
+      deviceEui,
+      metadataId: id,
+      unit: payload.unit!,
+      measurand: payload.measurand!,
+      location: payload.location!,
+      sensor: payload.sensor!,
+    },
+  };
+};
+
+//====================================
+// STORAGE
+//====================================
+
+/** Stores a registration; a device re-announcing an id (e.g. after a reboot) overwrites it. */
+const store = async (data: ValidatedMetadata): Promise<MutationResult<ValidatedMetadata>> => {
+  await sql`
+    INSERT INTO device_metadata (device_eui, metadata_id, unit, measurand, location, sensor)
+    VALUES (${data.deviceEui}, ${data.metadataId}, ${data.unit}, ${data.measurand}, ${data.location}, ${data.sensor})
+    ON CONFLICT (device_eui, metadata_id) DO UPDATE
+      SET unit = EXCLUDED.unit, measurand = EXCLUDED.measurand, location = EXCLUDED.location,
+          sensor = EXCLUDED.sensor, updated_at = now()
+  `;
+  return { ok: true, data };
+};
+
+//====================================
+// PUBLIC API
+//====================================
+
+/** Validate + store a metadata registration in one call. */
+const register = async (payload: TtnDecodedPayload, deviceEui: string): Promise<MutationResult<ValidatedMetadata>> => {
+  const validated = validate(payload, deviceEui);
+  if (!validated.ok) return validated;
+  return store(validated.data);
+};
+
+/**
+ * Fills in unit, measurand, location and sensor of a value that refers to
+ * registered metadata by `metadata_id`. Payloads without an id pass through
+ * unchanged. `pending` holds registrations of the same uplink that are not
+ * stored yet; they take precedence over the stored ones.
+ */
+const resolve = async (
+  payload: TtnDecodedPayload,
+  deviceEui: string,
+  pending: Map<number, ValidatedMetadata> = new Map(),
+): Promise<MutationResult<TtnDecodedPayload>> => {
+  if (payload.metadata_id === undefined) return { ok: true, data: payload };
+
+  const registered = pending.get(payload.metadata_id);
+  if (registered) {
+    const { unit, measurand, location, sensor } = registered;
+    return { ok: true, data: { ...payload, unit, measurand, location, sensor } };
+  }
+
+  const [row] = await sql`
+    SELECT unit, measurand, location, sensor
+    FROM device_metadata
+    WHERE device_eui = ${deviceEui} AND metadata_id = ${payload.metadata_id}
+  `;
+  if (!row) return { ok: false, error: `unknown metadata_id ${payload.metadata_id} for device ${deviceEui}` };
+
+  return {
+    ok: true,
+    data: { ...payload, unit: row.unit, measurand: row.measurand, location: row.location, sensor: row.sensor },
+  };
+};
+
+export const deviceMetadata = { validate, store, register, resolve };
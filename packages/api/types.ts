@@ -70,6 +70,9 @@ export const TtnDecodedPayloadSchema = z.object({
   timemethode: z.string().optional(),
   timevalue: z.unknown().optional(),
   message: z.string().optional(),
+  // Set by lib/uplink.ts: the id of a metadata registration ("Metadaten") or
+  // of the registered metadata a compact value refers to.
+  metadata_id: z.number().int().optional(),
 });
 
 export const TtnPayloadSchema = z.object({
@@ -77,7 +80,13 @@ export const TtnPayloadSchema = z.object({
     dev_eui: z.string(),
   }),
   uplink_message: z.object({
-    decoded_payload: TtnDecodedPayloadSchema,
+    // Raw uplink bytes (base64). When present, the backend decodes them itself
+    // (see lib/uplink.ts); `decoded_payload` is only used as a fallback.
+    frm_payload: z.string().optional(),
+    decoded_payload: TtnDecodedPayloadSchema.optional(),
+    // When the network server received the uplink (ISO 8601); dates the
+    // readings of a timed batch sent before the node's clock was synced.
+    received_at: z.string().optional(),
   }),
 });
 
@@ -177,6 +186,23 @@ export type ValidatedMeasurement = {
   recordedAt: Date | null;
 };
 
+export type ValidatedMetadata = {
+  deviceEui: string;
+  metadataId: number;
+  unit: string;
+  measurand: string;
+  location: string;
+  sensor: string;
+};
+
+export type ValidatedFragment = {
+  deviceEui: string;
+  messageId: number;
+  index: number;
+  count: number;
+  data: Uint8Array;
+};
+
 export type ValidatedLogEntry = {
   deviceEui: string;
   message: string;
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Encoding benchmarks for the loramint package, run under CPython.
+
+Measures, per case, the time per call (best of several rounds), the
+resulting throughput and the peak memory a single call allocates (via
+tracemalloc):
+
+    to_bytes            padded 99-byte value frame
+    to_bytes_compact    compact value frame
+    to_bytes_ref        value frame referring to a metadata id
+    to_bytes_half       the same with a half-precision value
+    to_bytes_fixed      the same with a fixed-point value (fixed16 at 0.1)
+    to_byte_string      padded frame as a hex string
+    to_record_string    string value with a custom timestamp
+    log_compressed      a 43-character log message compressed (MintLog)
+    reading             a new MintValue built and encoded (compact)
+    reading_template    the same reading from a MintTemplate
+    batch_pack          ten values packed into batch frames (222 bytes)
+    sendb_command       AT+SENDB command for a 99-byte payload
+    send_value          LoRaMINT.sendValue() against the LA66 emulator
+                        answering without latency
+
+The absolute numbers only mean something relative to each other on the same
+machine; to catch regressions, save a run and compare later runs against it:
+
+    python3 dev_scripts/bench_encode.py --json before.json
+    ... change the encoder ...
+    python3 dev_scripts/bench_encode.py --baseline before.json
+
+With --baseline, the exit status is 1 if any case got slower by more than
+--threshold percent (default 10).
+
+--boot instead times boot to first uplink - LoRaMINT(warm_start=True),
+ensure_joined() and an acknowledged sendValue(), as in
+examples/deep_sleep.py - once after a cold boot and once after a wake-up
+from deep sleep, against the emulator with its default reply latency and a
+--join-ms join:
+
+    python3 dev_scripts/bench_encode.py --boot
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, HERE)
+
+import loramint.loramint as driver  # noqa: E402
+from la66_emulator import LA66Emulator  # noqa: E402
+from loramint import LoRaMINT, MintValue  # noqa: E402
+from loramint._compat import DEEPSLEEP_RESET, PWRON_RESET, RTC  # noqa: E402
+from loramint.mintbatch import MintBatch  # noqa: E402
+from loramint.mintlog import MintLog  # noqa: E402
+from loramint.minttemplate import MintTemplate  # noqa: E402
+
+# ====================================================================== #
+# Cases
+# ====================================================================== #
+
+
+def cases():
+    """Return {name: zero-argument callable} for every benchmark case."""
+    value = MintValue(21.5, "*C", "Raum 101", "Temperatur", "BME280")
+    half = MintValue(21.5, "*C", "Raum 101", "Temperatur", "BME280", "half")
+    fixed = MintValue(21.5, "*C", "Raum 101", "Temperatur", "BME280",
+                      "fixed16", resolution=0.1)
+    text = MintValue("active", "enum", "Raum 101", "Status", "Gateway",
+                     time=1700000000)
+    values = [MintValue(20.0 + i, "*C", "Raum {}".format(i), "Temperatur",
+                        "BME280") for i in range(10)]
+    template = MintTemplate("*C", "Raum 101", "Temperatur", "BME280")
+    payload = value.to_bytes()
+
+    emulator = LA66Emulator(latency_ms=0, join_ms=0, tx_busy_ms=0)
+    lora = LoRaMINT(uart=emulator)
+    lora.join()
+
+    return {
+        "to_bytes": value.to_bytes,
+        "to_bytes_compact": lambda: value.to_bytes(compact=True),
+        "to_bytes_ref": lambda: value.to_bytes(metadata_id=3),
+        "to_bytes_half": lambda: half.to_bytes(metadata_id=3),
+        "to_bytes_fixed": lambda: fixed.to_bytes(metadata_id=3),
+        "to_byte_string": value.to_byte_string,
+        "to_record_string": text.to_record,
+        "log_compressed": lambda: MintLog.encode(
+            "Sensor Fehler: keine Verbindung zum BME280"),
+        "reading": lambda: MintValue(21.5, "*C", "Raum 101", "Temperatur",
+                                     "BME280").to_bytes(compact=True),
+        "reading_template": lambda: template.value(21.5).to_bytes(compact=True),
+        "batch_pack": lambda: MintBatch.pack(values, 222),
+        "sendb_command": lambda: lora._sendb_command(payload),
+        "send_value": lambda: lora.sendValue(value),
+    }
+
+
+# ====================================================================== #
+# Measurement
+# ====================================================================== #
+
+
+def measure(call, rounds, min_time):
+    """Return (seconds per call, peak bytes allocated by one call)."""
+    # calibrate the number of calls so a round takes at least min_time
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            call()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2
+
+    best = elapsed / number
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            call()
+        best = min(best, (time.perf_counter() - start) / number)
+
+    tracemalloc.start()
+    call()   # warm up caches (e.g. the AT+SENDB view) before measuring
+    tracemalloc.reset_peak()
+    before = tracemalloc.get_traced_memory()[0]
+    call()
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return best, peak
+
+
+def boot(emulator, reset_cause):
+    """
+    Milliseconds from constructing the driver to an acknowledged uplink,
+    after a boot with the given reset cause (the emulator, like the LA66,
+    keeps its session across the ESP32's deep sleep).
+    """
+    restore, driver.reset_cause = driver.reset_cause, lambda: reset_cause
+    try:
+        start = time.perf_counter()
+        lora = LoRaMINT(uart=emulator, warm_start=True)
+        if not lora.ensure_joined():
+            raise RuntimeError("the emulator did not join")
+        if not lora.sendValue(MintValue(21.5, "*C", "Raum 101", "Temperatur",
+                                        "BME280")):
+            raise RuntimeError("the uplink was not acknowledged")
+        elapsed = (time.perf_counter() - start) * 1000
+        lora.wait_tx_done()     # the radio is idle before deep sleep
+        return elapsed
+    finally:
+        driver.reset_cause = restore
+
+
+def boot_times(join_ms):
+    """Return {"cold": ms, "warm": ms} of boot to first uplink."""
+    RTC().memory(b"")           # no session remembered: a first boot
+    emulator = LA66Emulator(join_ms=join_ms)
+    cold = boot(emulator, PWRON_RESET)
+    warm = boot(emulator, DEEPSLEEP_RESET)
+    return {"cold": cold, "warm": warm}
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Print the change against a baseline; return True if nothing regressed."""
+    ok = True
+    print()
+    print("{:<18} {:>12} {:>12} {:>8}".format("vs. " + (baseline.get("revision") or "baseline"),
+                                               "before us", "now us", "change"))
+    for name, result in results.items():
+        before = baseline["cases"].get(name)
+        if before is None:
+            continue
+        change = (result["seconds"] / before["seconds"] - 1) * 100
+        regressed = change > threshold
+        ok = ok and not regressed
+        print("{:<18} {:>12.2f} {:>12.2f} {:>7.1f}%{}".format(
+            name, before["seconds"] * 1e6, result["seconds"] * 1e6, change,
+            "  REGRESSION" if regressed else ""))
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="minimum seconds per round")
+    parser.add_argument("--only", help="comma-separated case names")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare with a saved --json file")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="slowdown in percent that counts as a regression")
+    parser.add_argument("--boot", action="store_true",
+                        help="time boot to first uplink, cold and warm start")
+    parser.add_argument("--join-ms", type=int, default=5000,
+                        help="emulated join time for --boot")
+    args = parser.parse_args()
+
+    if args.boot:
+        times = boot_times(args.join_ms)
+        print("{:<18} {:>12}".format("boot to uplink", "ms"))
+        for name, ms in times.items():
+            print("{:<18} {:>12.0f}".format(name, ms))
+        print("warm start saves {:.0f} ms ({:.0f}x faster)".format(
+            times["cold"] - times["warm"], times["cold"] / times["warm"]))
+        return
+
+    selected = cases()
+    if args.only:
+        names = args.only.split(",")
+        selected = {name: selected[name] for name in names}
+
+    results = {}
+    print("{:<18} {:>12} {:>14} {:>12}".format("case", "us/call", "calls/s", "peak bytes"))
+    for name, call in selected.items():
+        seconds, peak = measure(call, args.rounds, args.min_time)
+        results[name] = {"seconds": seconds, "peak_bytes": peak}
+        print("{:<18} {:>12.2f} {:>14,.0f} {:>12}".format(
+            name, seconds * 1e6, 1 / seconds, peak))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"revision": git_revision(), "python": sys.version.split()[0],
+                       "cases": results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Compiles the loramint package to MicroPython bytecode (.mpy) with mpy-cross.
+
+Installed as source, every module is compiled on the board at each boot:
+that takes time before the first reading and leaves the compiler's garbage
+on the heap. An .mpy install is loaded as ready bytecode instead. The .mpy
+format must match the firmware: use the mpy-cross of the board's MicroPython
+version (`pip install mpy-cross==<version>`; on the board,
+`sys.implementation._mpy` shows the format it loads).
+
+Usage (from packages/esp32):
+
+    python3 dev_scripts/build_mpy.py                # -> build/loramint/*.mpy
+    python3 dev_scripts/build_mpy.py -O 3           # also drop line numbers
+
+    mpremote rm -r :lib/loramint                    # a .py next to an .mpy wins
+    mpremote mkdir :lib
+    mpremote cp -r build/loramint :lib/
+
+To freeze the package into the firmware instead (no loading into RAM at
+all), build MicroPython with FROZEN_MANIFEST pointing at manifest.py.
+dev_scripts/import_report.py measures the difference on the board.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PACKAGE = os.path.join(HERE, "..", "loramint")
+
+
+def compile_package(mpy_cross, out, opt):
+    """Compile every module into out/loramint; return [(name, py, mpy bytes)]."""
+    target = os.path.join(out, "loramint")
+    os.makedirs(target, exist_ok=True)
+    sizes = []
+    for name in sorted(os.listdir(PACKAGE)):
+        if not name.endswith(".py"):
+            continue
+        source = os.path.join(PACKAGE, name)
+        output = os.path.join(target, name[:-3] + ".mpy")
+        # -s keeps tracebacks pointing at the package path, not the build host
+        subprocess.check_call([mpy_cross, "-O{}".format(opt),
+                               "-s", "loramint/" + name, "-o", output, source])
+        sizes.append((name[:-3], os.path.getsize(source),
+                      os.path.getsize(output)))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--out", default=os.path.join(HERE, "..", "build"),
+                        help="output directory (default: packages/esp32/build)")
+    parser.add_argument("-O", dest="opt", type=int, default=0,
+                        choices=range(4),
+                        help="mpy-cross optimisation level (3 drops line numbers)")
+    parser.add_argument("--mpy-cross", default=shutil.which("mpy-cross"),
+                        help="mpy-cross executable (default: from PATH)")
+    args = parser.parse_args()
+
+    if not args.mpy_cross:
+        sys.exit("mpy-cross not found - pip install mpy-cross (matching the "
+                 "board's MicroPython version) or pass --mpy-cross")
+    version = subprocess.check_output([args.mpy_cross, "--version"]).decode().strip()
+    print(version)
+
+    sizes = compile_package(args.mpy_cross, args.out, args.opt)
+    print("{:<16} {:>10} {:>10}".format("module", "source B", ".mpy B"))
+    for name, source, compiled in sizes:
+        print("{:<16} {:>10} {:>10}".format(name, source, compiled))
+    print("{:<16} {:>10} {:>10}".format(
+        "total", sum(s[1] for s in sizes), sum(s[2] for s in sizes)))
+    print("written to", os.path.normpath(os.path.join(args.out, "loramint")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,638 @@
+#!/usr/bin/env python3
+"""
+Reference decoder for LoRaMINT uplinks, for re-decoding archives of raw
+frm_payload captures on a PC.
+
+decode_uplink() is a line-by-line port of the backend decoder
+(packages/api/lib/uplink.ts) and mirrors MintValue.to_bytes()/to_record():
+it returns the `decoded_payload` dicts the /webhook route ingests - one per
+value in a batch frame, a "Metadaten" payload for a metadata registration,
+a "LogEintrag" for a log frame, plain or compressed - and raises ValueError with the backend's
+error message for a malformed uplink. The readings of a timed batch (0x0A)
+come out with a custom time: the base time plus their offset, or, for a
+batch sent before the node's clock was synced, `received_at` (default: now)
+minus their age. A fragment (0x09) is parsed with
+parse_fragment() and decoded once assemble_fragments() has all of its
+message; the line mode does so for the captures of one device.
+
+decode_frames() is the bulk mode for archives of fixed-width frames: every
+frame occupies MintValue.MAX_MESSAGE_SIZE (99) bytes, zero-padded if it is
+shorter, as a padded value frame already is. The file is memory-mapped and
+decoded chunk by chunk with NumPy array operations on a structured view of
+the frames; Python code only runs once per distinct metadata tuple and
+string value, not once per frame. It needs NumPy; decode_uplink() does not.
+
+Usage (from packages/esp32):
+
+    # one base64 (or --hex) frm_payload per line -> one JSON payload per line
+    python3 dev_scripts/decode_uplinks.py captures.txt
+
+    # fixed-width 99-byte frames, decoded with NumPy
+    python3 dev_scripts/decode_uplinks.py --frames captures.bin
+
+    # wrap each payload in a webhook body, ready to replay against /webhook
+    python3 dev_scripts/decode_uplinks.py captures.txt --dev-eui 70B3D57ED0000001
+
+    # date unsynced timed batches back from the capture's receive time
+    python3 dev_scripts/decode_uplinks.py captures.txt --received-at 1700000000
+"""
+
+import argparse
+import base64
+import binascii
+import json
+import math
+import os
+import struct
+import sys
+import time
+from decimal import ROUND_HALF_UP, Decimal
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from loramint.mintlog import MintLog  # noqa: E402  (the shared log dictionary)
+
+LOG_MARKER = 0x05
+VALUE_MARKER = 0x06
+BATCH_MARKER = 0x07
+REGISTRATION_MARKER = 0x08
+FRAGMENT_MARKER = 0x09
+TIMED_BATCH_MARKER = 0x0A
+COMPRESSED_LOG_MARKER = 0x0B
+FRAGMENT_HEADER_SIZE = 4    # marker, message, index, count
+TIMED_BASE_FLAG = 0x01      # timed batch flags: a 4-byte base time follows
+
+SEPARATOR = 0x1E
+COMPACT_FLAG = 0x80
+METADATA_REF_FLAG = 0x40
+FRAME_SIZE = 99             # MintValue.MAX_MESSAGE_SIZE
+
+# wire datatype ((option1 >> 2) & 0x0F) -> backend datatype, value size in
+# bytes (0 = separator-terminated string) and struct format; the fixed-point
+# types are a signed raw value in steps of 10**e, e = (wire & 3) - 3 (see
+# MintValue)
+WIRE_DATATYPES = {
+    1: ("integer", 1, ">B"),   # byte (unsigned)
+    2: ("integer", 2, ">h"),   # int (signed 16-bit)
+    3: ("integer", 4, ">i"),   # long (signed 32-bit)
+    4: ("float", 4, ">f"),     # float (IEEE-754 single)
+    5: ("float", 4, ">f"),     # double (sent as a single, like the AVR build)
+    6: ("string", 0, None),
+    7: ("float", 2, ">e"),     # half (IEEE-754 half precision)
+    8: ("float", 1, ">b"),     # fixed8, steps of 0.001
+    9: ("float", 1, ">b"),     # fixed8, 0.01
+    10: ("float", 1, ">b"),    # fixed8, 0.1
+    11: ("float", 1, ">b"),    # fixed8, 1
+    12: ("float", 2, ">h"),    # fixed16, 0.001
+    13: ("float", 2, ">h"),    # fixed16, 0.01
+    14: ("float", 2, ">h"),    # fixed16, 0.1
+    15: ("float", 2, ">h"),    # fixed16, 1
+}
+HALF = 7
+FIXED8 = 8
+
+# time flag (option1 & 0b11) -> time method
+TIME_METHODS = {0: "none", 1: "server", 2: "custom"}
+
+METADATA_FIELDS = ("unit", "measurand", "location", "sensor")   # wire order
+
+# ====================================================================== #
+# Single uplinks
+# ====================================================================== #
+
+
+def decode_uplink(data, received_at=None):
+    """
+    Decode one raw uplink (bytes) into a list of `decoded_payload` dicts.
+    `received_at` (Unix seconds, default now) dates the readings of a timed
+    batch without a base time. Raises ValueError if the uplink is malformed.
+    """
+    data = bytes(data)
+    if not data:
+        raise ValueError("empty payload")
+
+    marker = data[0]
+    if marker == LOG_MARKER:
+        return [{"messagetyp": "LogEintrag", "message": _ascii(data[1:])}]
+
+    if marker == COMPRESSED_LOG_MARKER:
+        return [{"messagetyp": "LogEintrag", "message": MintLog.decode(data)}]
+
+    if marker == VALUE_MARKER:
+        # trailing zero padding up to 99 bytes is never read; a compact frame
+        # must end exactly where its record does
+        payload, end = decode_record(data, 1)
+        if data[1] & COMPACT_FLAG and end != len(data):
+            raise ValueError("trailing bytes after compact value")
+        return [payload]
+
+    if marker == BATCH_MARKER:
+        if len(data) < 2:
+            raise ValueError("truncated batch header")
+        payloads = []
+        pos = 2
+        for i in range(data[1]):
+            try:
+                payload, pos = decode_record(data, pos)
+            except ValueError as e:
+                raise ValueError("batch record {}: {}".format(i + 1, e))
+            payloads.append(payload)
+        return payloads
+
+    if marker == REGISTRATION_MARKER:
+        if len(data) < 2:
+            raise ValueError("truncated metadata registration")
+        metadata, end = _read_metadata(data, 2)
+        registration = {"messagetyp": "Metadaten", "metadata_id": data[1]}
+        registration.update(metadata)
+        if end == len(data):
+            return [registration]
+        return [registration] + decode_uplink(data[end:], received_at)
+
+    if marker == TIMED_BATCH_MARKER:
+        return decode_timed_batch(data, received_at)
+
+    if marker == FRAGMENT_MARKER:
+        raise ValueError("fragment must be reassembled before decoding")
+
+    raise ValueError("unknown message marker: 0x{:02x}".format(marker))
+
+
+def decode_record(data, offset):
+    """
+    Decode the value record starting at `offset` (mirrors
+    MintValue.to_record()); return (payload, offset after the record).
+    """
+    if offset >= len(data):
+        raise ValueError("truncated record")
+
+    option1 = data[offset]
+    wire_type = (option1 & 0x3C) >> 2
+    if wire_type not in WIRE_DATATYPES:
+        raise ValueError("unknown datatype: {}".format(wire_type))
+    datatype, size, fmt = WIRE_DATATYPES[wire_type]
+    if option1 & 0b11 not in TIME_METHODS:
+        raise ValueError("unknown time flag")
+    timemethode = TIME_METHODS[option1 & 0b11]
+    is_ref = option1 & METADATA_REF_FLAG
+    pos = offset + 1
+
+    metadata_id = None
+    if is_ref:
+        if pos >= len(data):
+            raise ValueError("truncated metadata id")
+        metadata_id = data[pos]
+        pos += 1
+
+    # value: fixed-size number, or a string terminated by the separator
+    if size == 0:
+        value, pos = _read_field(data, pos)
+    else:
+        if pos + size > len(data):
+            raise ValueError("truncated value")
+        value = _read_number(data, pos, wire_type)
+        pos += size
+        if not is_ref:
+            if pos >= len(data) or data[pos] != SEPARATOR:
+                raise ValueError("missing separator after value")
+            pos += 1
+
+    payload = {"messagetyp": "Messwert", "datatype": datatype}
+    if not is_ref:
+        metadata, pos = _read_metadata(data, pos)
+        payload.update(metadata)
+    payload["value"] = value
+    payload["timemethode"] = timemethode
+
+    if timemethode == "custom":
+        if pos + 4 > len(data):
+            raise ValueError("truncated timestamp")
+        payload["timevalue"] = struct.unpack_from(">I", data, pos)[0]
+        pos += 4
+
+    if metadata_id is not None:
+        payload["metadata_id"] = metadata_id
+    return payload, pos
+
+
+def decode_timed_batch(data, received_at=None):
+    """
+    Decode a timed batch frame (mirrors TimedBatch): `0x0A`, the count, the
+    flags, the optional 4-byte base time, then per reading its varint offset
+    and value record. Readings without a timestamp of their own get one.
+    """
+    if len(data) < 3:
+        raise ValueError("truncated timed batch header")
+    base = None
+    pos = 3
+    if data[2] & TIMED_BASE_FLAG:
+        if len(data) < 7:
+            raise ValueError("truncated timed batch header")
+        base = struct.unpack_from(">I", data, 3)[0]
+        pos = 7
+    elif received_at is None:
+        received_at = int(time.time())
+    payloads = []
+    for i in range(data[1]):
+        try:
+            offset, pos = _read_varint(data, pos)
+            payload, pos = decode_record(data, pos)
+        except ValueError as e:
+            raise ValueError("batch record {}: {}".format(i + 1, e))
+        if payload["timemethode"] == "server":
+            payload["timemethode"] = "custom"
+            payload["timevalue"] = (base + offset if base is not None
+                                    else int(received_at) - offset)
+        payloads.append(payload)
+    return payloads
+
+
+def parse_fragment(data):
+    """
+    Return (message, index, count, data) of a fragment frame. Raises
+    ValueError like the backend's parseFragment().
+    """
+    data = bytes(data)
+    if not data or data[0] != FRAGMENT_MARKER:
+        raise ValueError("not a fragment")
+    if len(data) <= FRAGMENT_HEADER_SIZE:
+        raise ValueError("truncated fragment")
+    message, index, count = data[1], data[2], data[3]
+    if count < 2 or index >= count:
+        raise ValueError("invalid fragment {}/{}".format(index + 1, count))
+    return message, index, count, data[FRAGMENT_HEADER_SIZE:]
+
+
+def assemble_fragments(fragments):
+    """
+    Join parsed fragments of one message (in any order) into the original
+    payload, or return None unless all of them are given.
+    """
+    if not fragments or len(fragments) != fragments[0][2]:
+        return None
+    ordered = sorted(fragments, key=lambda f: f[1])
+    first = ordered[0]
+    for i, fragment in enumerate(ordered):
+        if fragment[1] != i or fragment[2] != first[2] or fragment[0] != first[0]:
+            return None
+    return b"".join(fragment[3] for fragment in ordered)
+
+
+# ====================================================================== #
+# Fixed-width frame archives (NumPy)
+# ====================================================================== #
+
+if np is not None:
+    # Overlapping fields: the value bytes after option1 seen as every numeric
+    # wire type at once, so picking a value is a select, not a parse. i8 is
+    # the raw value of fixed8 (i16 that of fixed16).
+    FRAME_DTYPE = np.dtype({
+        "names": ["marker", "option1", "u8", "i16", "i32", "f32", "f16",
+                  "i8"],
+        "formats": ["u1", "u1", "u1", ">i2", ">i4", ">f4", ">f2", "i1"],
+        "offsets": [0, 1, 2, 2, 2, 2, 2, 2],
+        "itemsize": FRAME_SIZE,
+    })
+
+    # wire datatype -> value size (0 = string, -1 = unknown)
+    _SIZES = np.full(16, -1, dtype=np.int16)
+    for _wire, (_, _size, _) in WIRE_DATATYPES.items():
+        _SIZES[_wire] = _size
+
+
+class DecodedFrames:
+    """
+    Column-wise result of decode_frames(), one entry per frame:
+
+        ok           frame decoded (bool)
+        wire_type    datatype code, see WIRE_DATATYPES
+        time_flag    0 none, 1 server, 2 custom
+        number       numeric value (float64; NaN for strings)
+        text         index into `strings` for string values, else -1
+        series       index into `series_table` (unit, measurand, location,
+                     sensor)
+        timevalue    custom Unix time (uint32; 0 without one)
+
+    Frames that are not single value frames with inline metadata (log,
+    batch or registration frames, metadata references) or that are
+    malformed have ok == False.
+    """
+
+    def __init__(self, columns, series_table, strings):
+        self.__dict__.update(columns)
+        self.series_table = series_table
+        self.strings = strings
+
+    def __len__(self):
+        return len(self.ok)
+
+    def payloads(self):
+        """Yield (index, decoded_payload dict) for every decoded frame."""
+        for i in np.flatnonzero(self.ok):
+            wire_type = int(self.wire_type[i])
+            datatype = WIRE_DATATYPES[wire_type][0]
+            payload = {"messagetyp": "Messwert", "datatype": datatype}
+            payload.update(zip(METADATA_FIELDS, self.series_table[self.series[i]]))
+            if datatype == "string":
+                payload["value"] = self.strings[self.text[i]]
+            elif wire_type == HALF:
+                payload["value"] = _half(float(self.number[i]))
+            elif wire_type >= FIXED8:
+                payload["value"] = float(self.number[i])   # fixed: exact
+            else:
+                payload["value"] = _number(float(self.number[i]), datatype)
+            payload["timemethode"] = TIME_METHODS[int(self.time_flag[i])]
+            if self.time_flag[i] == 2:
+                payload["timevalue"] = int(self.timevalue[i])
+            yield int(i), payload
+
+
+def load_frames(path):
+    """Memory-map a file of fixed-width frames as an (n, 99) uint8 array."""
+    _require_numpy()
+    frames = np.memmap(path, dtype=np.uint8, mode="r")
+    if frames.size % FRAME_SIZE:
+        raise ValueError("{}: size is not a multiple of {} bytes".format(
+            path, FRAME_SIZE))
+    return frames.reshape(-1, FRAME_SIZE)
+
+
+def decode_frames(frames, chunk=16384):
+    """
+    Decode an (n, 99) uint8 array of frames (e.g. from load_frames()) into
+    a DecodedFrames. Works through `chunk` frames at a time, so the
+    temporary arrays stay a few MB regardless of the archive size.
+    """
+    _require_numpy()
+    series_ids = {}
+    string_ids = {}
+    parts = [_decode_chunk(np.ascontiguousarray(frames[start:start + chunk]),
+                           series_ids, string_ids)
+             for start in range(0, len(frames), chunk)]
+    if not parts:
+        parts = [_decode_chunk(np.zeros((0, FRAME_SIZE), dtype=np.uint8),
+                               series_ids, string_ids)]
+
+    columns = {name: np.concatenate([part[name] for part in parts])
+               for name in parts[0]}
+    series_table = [tuple(_ascii(field) for field in key.split(b"\x1e")[:4])
+                    for key in series_ids]
+    return DecodedFrames(columns, series_table, [_ascii(key) for key in string_ids])
+
+
+def _decode_chunk(raw, series_ids, string_ids):
+    """Decode one contiguous (n, 99) block; intern strings into the tables."""
+    n = len(raw)
+    rows = np.arange(n)
+    cols = np.arange(FRAME_SIZE)
+    records = raw.reshape(-1).view(FRAME_DTYPE)
+
+    option1 = records["option1"]
+    wire_type = (option1 >> 2) & 0x0F
+    time_flag = option1 & 0b11
+    size = _SIZES[wire_type]
+    ok = ((records["marker"] == VALUE_MARKER)
+          & (option1 & METADATA_REF_FLAG == 0)
+          & (size >= 0) & (time_flag != 3))
+
+    # position of the separator after the value: fixed for numbers, the
+    # first separator for strings
+    separators = raw == SEPARATOR
+    is_string = size == 0
+    first = np.argmax(separators[:, 2:], axis=1) + 2
+    value_end = np.where(is_string, first, 2 + size.astype(np.int64))
+    value_end = np.minimum(value_end, FRAME_SIZE - 1)
+    ok &= separators[rows, value_end]
+
+    # the next four separators terminate unit, measurand, location, sensor
+    counts = np.cumsum(separators & (cols > value_end[:, None]), axis=1,
+                       dtype=np.uint8)
+    ok &= counts[:, -1] >= 4
+    metadata_end = np.argmax(counts >= 4, axis=1)
+
+    # custom timestamp: the 4 bytes after the metadata
+    time_pos = metadata_end + 1
+    custom = time_flag == 2
+    ok &= ~custom | (time_pos + 4 <= FRAME_SIZE)
+    stamp = np.take_along_axis(
+        raw, np.minimum(time_pos[:, None] + np.arange(4), FRAME_SIZE - 1),
+        axis=1).astype(np.uint32)
+    timevalue = np.where(
+        custom & ok,
+        (stamp[:, 0] << 24) | (stamp[:, 1] << 16) | (stamp[:, 2] << 8) | stamp[:, 3],
+        0).astype(np.uint32)
+
+    # fixed point: raw / 10**(3 - (wire & 3)), an 8-bit raw below code 12
+    fixed = (np.where(wire_type < 12, records["i8"], records["i16"])
+             / np.power(10.0, 3 - (wire_type & 3)))
+
+    number = np.select(
+        [wire_type == 1, wire_type == 2, wire_type == 3, wire_type == 7,
+         wire_type >= 8],
+        [records["u8"], records["i16"], records["i32"], records["f16"], fixed],
+        records["f32"]).astype(np.float64)
+    number[is_string] = np.nan
+
+    # metadata bytes (with their terminators) and string values, shifted to
+    # the start of the row, as fixed-width byte strings: equal tuples compare
+    # equal, so np.unique leaves one entry per distinct series
+    series = _intern(raw, value_end + 1, metadata_end + 1, ok, series_ids)
+    text = _intern(raw, np.full(n, 2), value_end, ok & is_string, string_ids)
+
+    return {"ok": ok, "wire_type": wire_type.astype(np.uint8),
+            "time_flag": time_flag.astype(np.uint8), "number": number,
+            "text": text, "series": series, "timevalue": timevalue}
+
+
+def _intern(raw, begin, end, mask, table):
+    """
+    Return, per row, the index in `table` (bytes -> index, grown as needed)
+    of raw[row, begin:end]; -1 where `mask` is False.
+    """
+    ids = np.full(len(raw), -1, dtype=np.int32)
+    if not mask.any():
+        return ids
+    raw, begin, end = raw[mask], begin[mask], end[mask]
+    # zero everything outside the span (in place of shifting it to the row
+    # start, which costs a gather); a span only ever starts after zeros,
+    # so lstrip() recovers it from the key
+    cols = np.arange(FRAME_SIZE)
+    span = (cols >= begin[:, None]) & (cols < end[:, None])
+    keys = (raw * span).view("S{}".format(FRAME_SIZE)).ravel()
+    unique, inverse = np.unique(keys, return_inverse=True)
+    index = np.array([table.setdefault(bytes(key).lstrip(b"\0"), len(table))
+                      for key in unique], dtype=np.int32)
+    ids[mask] = index[inverse.ravel()]
+    return ids
+
+
+# ====================================================================== #
+# Helpers
+# ====================================================================== #
+
+
+def _ascii(data):
+    # like String.fromCharCode in the backend: one character per byte
+    return bytes(data).decode("latin-1")
+
+
+def _read_field(data, offset):
+    """Read a 0x1E-terminated field; return (text, offset after it)."""
+    end = data.find(SEPARATOR, offset)
+    if end == -1:
+        raise ValueError("unterminated field")
+    return _ascii(data[offset:end]), end + 1
+
+
+def _read_varint(data, offset):
+    """Read an unsigned LEB128 varint (at most 4 bytes); return (value, end)."""
+    value = 0
+    for i in range(4):
+        if offset + i >= len(data):
+            raise ValueError("truncated time offset")
+        byte = data[offset + i]
+        value |= (byte & 0x7F) << (7 * i)
+        if not byte & 0x80:
+            return value, offset + i + 1
+    raise ValueError("time offset too long")
+
+
+def _read_metadata(data, offset):
+    """Read unit, measurand, location and sensor; return (dict, offset)."""
+    metadata = {}
+    for name in METADATA_FIELDS:
+        metadata[name], offset = _read_field(data, offset)
+    return metadata, offset
+
+
+def _read_number(data, pos, wire_type):
+    """Read the numeric value of `wire_type` at `pos`, like readNumber()."""
+    datatype, _, fmt = WIRE_DATATYPES[wire_type]
+    value = struct.unpack_from(fmt, data, pos)[0]
+    if wire_type >= FIXED8:
+        return _fixed(value, wire_type)
+    if wire_type == HALF:
+        return _half(value)
+    return _number(value, datatype)
+
+
+def _number(value, datatype):
+    if datatype == "integer":
+        return int(value)
+    # trim the single-precision noise (23.4, not 23.399999618530273), like
+    # Number(x.toPrecision(7)) in the backend
+    return _precision(value, 7)
+
+
+def _half(value):
+    # the shortest decimal (at most 5 digits) that is still this half-precision
+    # value: 23.4, not 23.40625
+    if value == 0 or not math.isfinite(value):
+        return value
+    exponent = (struct.unpack(">H", struct.pack(">e", value))[0] >> 10) & 0x1F
+    ulp = 2.0 ** (max(exponent, 1) - 25)
+    for digits in range(1, 5):
+        candidate = _precision(value, digits)
+        if abs(candidate - value) < ulp / 2:
+            return candidate
+    return _precision(value, 5)
+
+
+def _fixed(raw, wire_type):
+    # raw * 10**e with e = (wire_type & 3) - 3; dividing keeps 0.1 steps exact
+    return raw / 10 ** (3 - (wire_type & 3))
+
+
+def _precision(value, digits):
+    # Number(value.toPrecision(digits)): rounds ties away from zero, where
+    # Python's formatting would round them to even
+    if value == 0 or not math.isfinite(value):
+        return value
+    exact = Decimal(value)
+    return float(exact.quantize(Decimal(1).scaleb(exact.adjusted() - digits + 1),
+                                rounding=ROUND_HALF_UP))
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("decoding fixed-width frames needs NumPy "
+                          "(pip install numpy)")
+
+
+# ====================================================================== #
+# Command line
+# ====================================================================== #
+
+
+def _emit(payload, dev_eui):
+    if dev_eui:
+        payload = {"end_device_ids": {"dev_eui": dev_eui},
+                   "uplink_message": {"decoded_payload": payload}}
+    print(json.dumps(payload, ensure_ascii=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path", help="capture file")
+    parser.add_argument("--frames", action="store_true",
+                        help="the file holds fixed-width 99-byte frames (NumPy)")
+    parser.add_argument("--hex", action="store_true",
+                        help="text lines are hex instead of base64")
+    parser.add_argument("--received-at", type=int,
+                        help="Unix time the captures were received, for "
+                             "timed batches sent unsynced (default: now)")
+    parser.add_argument("--dev-eui",
+                        help="print webhook bodies for this device instead "
+                             "of bare decoded payloads")
+    args = parser.parse_args()
+
+    failed = 0
+    pending = {}    # message -> {index: fragment}, until complete
+    if args.frames:
+        decoded = decode_frames(load_frames(args.path))
+        for _, payload in decoded.payloads():
+            _emit(payload, args.dev_eui)
+        failed = len(decoded) - int(decoded.ok.sum())
+    else:
+        with open(args.path) as f:
+            for number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    data = (binascii.unhexlify(line) if args.hex
+                            else base64.b64decode(line, validate=True))
+                    if data[:1] == bytes([FRAGMENT_MARKER]):
+                        fragment = parse_fragment(data)
+                        parts = pending.setdefault(fragment[0], {})
+                        if parts and next(iter(parts.values()))[2] != fragment[2]:
+                            parts.clear()   # message number reused
+                        parts[fragment[1]] = fragment
+                        data = assemble_fragments(list(parts.values()))
+                        if data is None:
+                            continue
+                        del pending[fragment[0]]
+                    payloads = decode_uplink(data, args.received_at)
+                except (ValueError, binascii.Error) as e:
+                    print("line {}: {}".format(number, e), file=sys.stderr)
+                    failed += 1
+                    continue
+                for payload in payloads:
+                    _emit(payload, args.dev_eui)
+
+    for message, parts in sorted(pending.items()):
+        print("message {}: {} of {} fragments".format(
+            message, len(parts), next(iter(parts.values()))[2]),
+            file=sys.stderr)
+        failed += 1
+    if failed:
+        print("{} frame(s) could not be decoded".format(failed), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Import-time and heap report for the loramint package - runs ON the board
+(MicroPython), not on the PC:
+
+    mpremote run dev_scripts/import_report.py
+
+mpremote soft-resets the board first, so every run starts from a fresh heap.
+Run it once with the source install (mip / manual copy) and once with the
+.mpy build (dev_scripts/build_mpy.py) or frozen firmware, and compare:
+
+    import          milliseconds for `import loramint` (LoRaMINT, MintValue
+                    and the driver modules they need), and for
+                    loramint.asyncloramint on top of it
+    retained        heap still allocated after gc.collect() - the modules
+                    themselves (bytecode, classes, constants)
+    peak            heap allocated right after the import, before collecting -
+                    on a source install mostly the compiler's garbage (a lower
+                    bound: a collection during the import frees some of it)
+    modules         the loramint modules `import loramint` loaded
+    free            gc.mem_free() once everything is imported
+
+The install format is read from the package directory: "source" (.py),
+"bytecode" (.mpy) or "frozen" (no files).
+"""
+
+import gc
+import os
+import sys
+import time
+
+
+def install_format(module):
+    """Return "source", "bytecode" or "frozen" for an imported package."""
+    path = getattr(module, "__file__", "")
+    directory = path.rsplit("/", 1)[0]
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return "frozen"
+    if any(name.endswith(".py") for name in names):
+        return "source"
+    return "bytecode" if any(name.endswith(".mpy") for name in names) else "frozen"
+
+
+def measure(name):
+    """Import a module; return (ms, retained bytes, peak bytes)."""
+    gc.collect()
+    before = gc.mem_alloc()
+    start = time.ticks_us()
+    __import__(name)
+    elapsed = time.ticks_diff(time.ticks_us(), start)
+    peak = gc.mem_alloc() - before
+    gc.collect()
+    return elapsed / 1000, gc.mem_alloc() - before, peak
+
+
+def main():
+    if not hasattr(gc, "mem_free"):
+        sys.exit("run this on the board: mpremote run dev_scripts/import_report.py")
+
+    print("MicroPython", sys.version, "on", sys.platform)
+    print("{:<24} {:>9} {:>12} {:>10}".format("import", "ms", "retained B", "peak B"))
+    for name in ("loramint", "loramint.asyncloramint"):
+        try:
+            ms, retained, peak = measure(name)
+        except ImportError as e:
+            print("{:<24} {}".format(name, e))
+            continue
+        print("{:<24} {:>9.1f} {:>12} {:>10}".format(name, ms, retained, peak))
+        if name == "loramint":
+            modules = sorted(m for m in sys.modules if m.startswith("loramint."))
+            print("modules: {}".format(", ".join(modules)))
+
+    package = sys.modules["loramint"]
+    print("install: {} ({})".format(install_format(package),
+                                    getattr(package, "__file__", "frozen")))
+    gc.collect()
+    print("free: {} B".format(gc.mem_free()))
+
+
+main()
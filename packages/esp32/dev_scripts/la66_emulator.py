@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+LA66 emulator - runs the loramint driver on a PC, without an ESP32 or LA66.
+
+Emulates the part of the Dragino LA66 AT command set the library uses (ATZ,
+AT+VER=?, AT+DR, AT+ADR, AT+NJS=?, AT+JOIN, AT+SENDB, AT+RECVB=?, AT+SYNCMOD,
+AT+TIMESTAMP=?) behind the
+machine.UART interface: write() takes commands, any()/read()/readline()/
+readinto() return the replies once their latency has passed. Configurable:
+
+    latency_ms         delay before a reply line appears
+    join_ms            time from AT+JOIN to its result
+    join_failure_rate  fraction of joins answered with "Join failed"
+    garbage_rate       fraction of reply lines preceded by a garbage line
+    tx_busy_ms         how long after an accepted uplink AT+SENDB answers
+                       AT_BUSY_ERROR (the radio's TX + RX windows); "txDone"
+                       comes after a third of it, "rxTimeout" for RX1 after
+                       two thirds and for RX2 at the end
+    rx_timeouts        print the "rxTimeout" lines (off: only "txDone", as
+                       some firmware versions do)
+    data_rate          reported by AT+DR=?; also bounds the payload size
+
+queue_downlink(port, payload) has the next accepted uplink answered with a
+downlink in RX1 ("rxDone"), readable with AT+RECVB=?.
+
+After AT+SYNCMOD=1, the first uplink accepted after a join gets the network
+time (DeviceTimeAns): from then on AT+TIMESTAMP=? answers the PC's Unix time,
+before that 0.
+
+In-process, hand it to the driver as its UART (the library falls back to
+CPython equivalents for the MicroPython modules it uses, see
+loramint/_compat.py):
+
+    emulator = LA66Emulator(join_failure_rate=0.2)
+    lora = LoRaMINT(uart=emulator)
+
+For code that opens the UART itself, install() registers a stand-in
+`machine` module whose UART() returns the emulator.
+
+Usage as a script (from packages/esp32):
+
+    python3 dev_scripts/la66_emulator.py            # time the driver's calls
+    python3 dev_scripts/la66_emulator.py --pty      # serve on a pseudo-terminal
+
+With --pty the emulator answers on a pseudo-terminal whose path is printed,
+e.g. for a serial terminal or a MicroPython unix port driving a UART on it.
+"""
+
+import argparse
+import binascii
+import os
+import random
+import sys
+import threading
+import time
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+VERSION = "LA66 emulator v1.0"
+MAX_PAYLOAD = (51, 51, 51, 115, 222, 222, 222, 222)   # EU868, per data rate
+
+# ====================================================================== #
+# Emulator
+# ====================================================================== #
+
+
+class LA66Emulator:
+    IRQ_RXIDLE = 0x1000
+
+    def __init__(self, latency_ms=10, join_ms=5000, join_failure_rate=0.0,
+                 garbage_rate=0.0, tx_busy_ms=3000, data_rate=5, seed=None,
+                 rx_timeouts=True):
+        self.latency_ms = latency_ms
+        self.join_ms = join_ms
+        self.join_failure_rate = join_failure_rate
+        self.garbage_rate = garbage_rate
+        self.tx_busy_ms = tx_busy_ms
+        self.data_rate = data_rate
+        self.rx_timeouts = rx_timeouts
+        self.adr = True
+        self.time_sync = False  # AT+SYNCMOD
+        self._time_known = False   # a DeviceTimeAns arrived since the join
+        self.uplinks = []       # (port, payload bytes) accepted by AT+SENDB
+        self.commands = []      # every command line received
+        self.downlinks = []     # (port, payload bytes) still to deliver
+        self._received = None   # last delivered downlink, for AT+RECVB=?
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._input = bytearray()
+        self._pending = []      # (due monotonic seconds, line bytes)
+        self._rx = bytearray()  # reply bytes that are due
+        self._busy_until = 0.0
+        self._joined_at = None  # monotonic time the current join succeeds
+        self._handler = None
+
+    @property
+    def joined(self):
+        """True once a successful AT+JOIN has reported JOINED."""
+        return self._joined_at is not None and time.monotonic() >= self._joined_at
+
+    def queue_downlink(self, port, payload):
+        """Answer the next accepted uplink with this downlink."""
+        self.downlinks.append((port, bytes(payload)))
+
+    # ------------------------------------------------------------------ #
+    # machine.UART interface
+    # ------------------------------------------------------------------ #
+
+    def write(self, data):
+        """Receive bytes from the driver; complete lines are executed."""
+        if isinstance(data, str):
+            data = data.encode()
+        data = bytes(data)
+        self._input += data
+        while b"\n" in self._input:
+            line, _, rest = bytes(self._input).partition(b"\n")
+            self._input = bytearray(rest)
+            command = line.strip().decode("ascii", "replace")
+            if command:
+                self.commands.append(command)
+                self._execute(command)
+        return len(data)
+
+    def any(self):
+        self._deliver()
+        return len(self._rx)
+
+    def read(self, n=None):
+        self._deliver()
+        with self._lock:
+            if not self._rx:
+                return None
+            n = len(self._rx) if n is None else min(n, len(self._rx))
+            data = bytes(self._rx[:n])
+            del self._rx[:n]
+        return data
+
+    def readinto(self, buf, n=None):
+        data = self.read(min(len(buf), n or len(buf)))
+        if not data:
+            return None
+        buf[:len(data)] = data
+        return len(data)
+
+    def readline(self):
+        self._deliver()
+        with self._lock:
+            end = self._rx.find(b"\n")
+            if end == -1:
+                return None
+            line = bytes(self._rx[:end + 1])
+            del self._rx[:end + 1]
+        return line
+
+    def irq(self, handler=None, trigger=0, hard=False):
+        """Call `handler(uart)` whenever reply bytes become due."""
+        self._handler = handler
+
+    # ------------------------------------------------------------------ #
+    # AT commands
+    # ------------------------------------------------------------------ #
+
+    def _execute(self, command):
+        upper = command.upper()
+        if upper == "ATZ":
+            self._joined_at = None
+            self._time_known = False
+            self._busy_until = 0.0
+            self._reply("LA66 LoRaWAN module", VERSION)
+        elif upper == "AT+VER=?":
+            self._reply(VERSION, "OK")
+        elif upper == "AT+DR=?":
+            self._reply(str(self.data_rate), "OK")
+        elif upper.startswith("AT+DR=") and upper[6:].isdigit() \
+                and int(upper[6:]) < len(MAX_PAYLOAD):
+            self.data_rate = int(upper[6:])
+            self._reply("OK")
+        elif upper in ("AT+ADR=0", "AT+ADR=1"):
+            self.adr = upper.endswith("1")
+            self._reply("OK")
+        elif upper == "AT+RECVB=?":
+            if self._received is None:
+                self._reply("0:", "OK")
+            else:
+                port, payload = self._received
+                self._reply("{}:{}".format(
+                    port, binascii.hexlify(payload).decode().upper()), "OK")
+        elif upper in ("AT+SYNCMOD=0", "AT+SYNCMOD=1"):
+            self.time_sync = upper.endswith("1")
+            self._reply("OK")
+        elif upper == "AT+TIMESTAMP=?":
+            self._reply(str(int(time.time())) if self._time_known else "0", "OK")
+        elif upper == "AT+NJS=?":
+            self._reply("1" if self.joined else "0", "OK")
+        elif upper == "AT+JOIN":
+            self._reply("OK")
+            success = self._random.random() >= self.join_failure_rate
+            self._joined_at = None
+            self._time_known = False
+            if success:
+                self._joined_at = time.monotonic() + (self.latency_ms + self.join_ms) / 1000
+            self._reply("JOINED" if success else "Join failed",
+                        delay_ms=self.join_ms)
+        elif upper.startswith("AT+SENDB="):
+            self._send(command[len("AT+SENDB="):])
+        else:
+            self._reply("AT_ERROR")
+
+    def _send(self, arguments):
+        try:
+            confirm, port, length, data = arguments.split(",")
+            payload = binascii.unhexlify(data)
+            valid = int(length) == len(payload) and int(confirm) in (0, 1)
+        except ValueError:
+            valid = False
+        if not valid or len(payload) > MAX_PAYLOAD[self.data_rate]:
+            self._reply("AT_PARAM_ERROR")
+        elif not self.joined:
+            self._reply("AT_NO_NETWORK_JOINED")
+        elif time.monotonic() < self._busy_until:
+            self._reply("AT_BUSY_ERROR")
+        else:
+            self.uplinks.append((int(port), payload))
+            self._time_known = self._time_known or self.time_sync
+            self._busy_until = time.monotonic() + self.tx_busy_ms / 1000
+            self._reply("OK")
+            self._reply("txDone", delay_ms=self.tx_busy_ms // 3)
+            if self.downlinks:
+                self._received = self.downlinks.pop(0)
+                self._busy_until -= self.tx_busy_ms / 3000   # no RX2
+                self._reply("rxDone", delay_ms=self.tx_busy_ms * 2 // 3)
+            elif self.rx_timeouts:
+                self._reply("rxTimeout", delay_ms=self.tx_busy_ms * 2 // 3)
+                self._reply("rxTimeout", delay_ms=self.tx_busy_ms)
+
+    def _reply(self, *lines, delay_ms=0):
+        """Queue reply lines, due after the latency (plus `delay_ms`)."""
+        due = time.monotonic() + (self.latency_ms + delay_ms) / 1000
+        with self._lock:
+            for line in lines:
+                if self._random.random() < self.garbage_rate:
+                    noise = bytes(self._random.randrange(32, 127)
+                                  for _ in range(self._random.randrange(1, 12)))
+                    self._pending.append((due, noise + b"\r\n"))
+                self._pending.append((due, line.encode() + b"\r\n"))
+            self._pending.sort(key=lambda item: item[0])
+        if self._handler:
+            timer = threading.Timer(due - time.monotonic(), self._interrupt)
+            timer.daemon = True
+            timer.start()
+
+    def _deliver(self):
+        """Move replies whose time has come into the receive buffer."""
+        now = time.monotonic()
+        with self._lock:
+            while self._pending and self._pending[0][0] <= now:
+                self._rx += self._pending.pop(0)[1]
+            return len(self._rx)
+
+    def _interrupt(self):
+        if self._deliver() and self._handler:
+            self._handler(self)
+
+
+# ====================================================================== #
+# In-process use
+# ====================================================================== #
+
+
+def install(emulator, reset_cause=1):
+    """
+    Register a stand-in `machine` module under CPython whose UART() returns
+    `emulator`, for code that constructs LoRaMINT() without uart=. Must run
+    before loramint is imported.
+    """
+    machine = types.ModuleType("machine")
+    machine.PWRON_RESET = 1
+    machine.DEEPSLEEP_RESET = 4
+
+    class UART:
+        IRQ_RXIDLE = LA66Emulator.IRQ_RXIDLE
+
+        def __new__(cls, *args, **kwargs):
+            return emulator
+
+    class RTC:
+        _memory = b""
+
+        def memory(self, data=None):
+            if data is None:
+                return RTC._memory
+            RTC._memory = bytes(data)
+
+    machine.UART = UART
+    machine.RTC = RTC
+    machine.reset_cause = lambda: reset_cause
+    machine.disable_irq = lambda: None
+    machine.enable_irq = lambda state: None
+    sys.modules["machine"] = machine
+
+
+# ====================================================================== #
+# Command line
+# ====================================================================== #
+
+
+def timed(label, call, *args):
+    start = time.perf_counter()
+    result = call(*args)
+    print("{:<22} {:>9.1f} ms   -> {}".format(
+        label, (time.perf_counter() - start) * 1000, result))
+    return result
+
+
+def benchmark(emulator, rx_irq=False):
+    """Time the driver's public calls against the emulator."""
+    from loramint import LoRaMINT, MintValue
+
+    value = MintValue(21.5, "*C", "Raum 101", "Temperatur", "BME280")
+    lora = timed("LoRaMINT() (ATZ)",
+                 lambda: LoRaMINT(rx_irq=rx_irq, uart=emulator))
+    timed("get_version()", lora.get_version)
+    timed("join()", lora.join)
+    timed("get_data_rate()", lora.get_data_rate)
+    timed("sendValue()", lora.sendValue, value)
+    timed("sendValue() right after", lora.sendValue, value)
+    timed("wait_tx_done()", lora.wait_tx_done)
+    timed("sendLog()", lora.sendLog, "Emulator")
+    print("uplinks:", len(emulator.uplinks))
+
+
+def serve_pty(emulator):
+    """Answer on a pseudo-terminal until interrupted."""
+    import select
+    import tty
+
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    print("LA66 emulator on", os.ttyname(slave), "(Ctrl+C to stop)")
+    try:
+        while True:
+            ready, _, _ = select.select([master], [], [], 0.005)
+            if ready:
+                emulator.write(os.read(master, 1024))
+            data = emulator.read()
+            if data:
+                os.write(master, data)
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pty", action="store_true",
+                        help="serve on a pseudo-terminal instead of benchmarking")
+    parser.add_argument("--rx-irq", action="store_true",
+                        help="benchmark LoRaMINT(rx_irq=True)")
+    parser.add_argument("--latency-ms", type=int, default=10)
+    parser.add_argument("--join-ms", type=int, default=5000)
+    parser.add_argument("--join-failure-rate", type=float, default=0.0)
+    parser.add_argument("--garbage-rate", type=float, default=0.0)
+    parser.add_argument("--tx-busy-ms", type=int, default=3000)
+    parser.add_argument("--data-rate", type=int, default=5)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--no-rx-timeouts", action="store_true",
+                        help="do not print rxTimeout after the RX windows")
+    args = parser.parse_args()
+
+    emulator = LA66Emulator(args.latency_ms, args.join_ms,
+                            args.join_failure_rate, args.garbage_rate,
+                            args.tx_busy_ms, args.data_rate, args.seed,
+                            not args.no_rx_timeouts)
+    if args.pty:
+        serve_pty(emulator)
+    else:
+        benchmark(emulator, args.rx_irq)
+
+
+if __name__ == "__main__":
+    main()
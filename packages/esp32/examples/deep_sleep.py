@@ -0,0 +1,39 @@
+"""
+Example: battery node that wakes from deep sleep, sends one measurement value
+and goes back to sleep.
+
+With warm_start=True, a wake-up from deep sleep skips the LA66 reset (ATZ and
+its 2 s wait) and, if the node was joined before it went to sleep, the OTAA
+join: the LA66 stays powered during the ESP32's deep sleep and keeps its
+session. Only the first boot (or a wake-up after the session was lost) pays
+for a full reset and join.
+
+Prints the time from boot to the acknowledged uplink, so cold and warm starts
+can be compared on the serial console. time.ticks_ms() restarts at every boot,
+deep-sleep wake-ups included.
+
+Install the loramint package on the board, then copy this file to the board
+root as main.py.
+"""
+
+import time
+
+import machine
+from loramint import LoRaMINT, MintValue
+
+SLEEP_MS = 5 * 60 * 1000   # deep sleep between measurements
+
+warm = machine.reset_cause() == machine.DEEPSLEEP_RESET
+lora = LoRaMINT(warm_start=True)
+
+if lora.ensure_joined():
+    value = MintValue(21.5, "*C", "Raum 101", "Temperatur", "BME280")
+    if lora.sendValue(value):
+        print("Boot to first uplink ({} start): {} ms".format(
+            "warm" if warm else "cold", time.ticks_ms()))
+    # let the uplink and its receive windows finish before sleeping
+    lora.wait_tx_done()
+else:
+    print("Join failed.")
+
+machine.deepsleep(SLEEP_MS)
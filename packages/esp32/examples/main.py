@@ -8,14 +8,16 @@ as main.py so it runs automatically after boot.py.
 import time
 
 from loramint import LoRaMINT, MintValue
+from loramint.airtime import AirtimeScheduler
 
-# Seconds to wait between uplinks. A delay is required: the LA66 must not be
-# given a new uplink while it is still busy with the previous one (Class A RX
-# windows). ~10 s or more works reliably; it also respects TTN fair use.
-UPLINK_INTERVAL = 60
+# Seconds between measurements. The spacing the radio needs between uplinks is
+# left to the AirtimeScheduler: it holds an uplink back until the LA66 is done
+# with the previous one (Class A RX windows) and the EU868 duty cycle and the
+# TTN fair-use budget (30 s airtime per day) allow it.
+MEASURE_INTERVAL = 60
 
 # Open the UART to the LA66 (defaults: UART2, TX=GPIO17, RX=GPIO16, 9600 baud)
-lora = LoRaMINT()
+lora = LoRaMINT(scheduler=AirtimeScheduler())
 
 # Verify the UART link before doing anything else
 if not lora.check_connection():
@@ -30,9 +32,9 @@ print("Joined.")
 if lora.sendLog("ESP32 gestartet"):
     print("Log entry sent.")
 
-# Send a measurement value every UPLINK_INTERVAL seconds
+# Send a measurement value every MEASURE_INTERVAL seconds
 while True:
-    time.sleep(UPLINK_INTERVAL)
+    time.sleep(MEASURE_INTERVAL)
     value = MintValue(21.5, "*C", "Raum 101", "Temperatur", "BME280")
     if lora.sendValue(value):
         print("Measurement sent.")
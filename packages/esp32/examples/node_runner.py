@@ -0,0 +1,45 @@
+"""
+Example: a BME280 node declared with a NodeRunner instead of a read/send loop.
+
+Temperature is sent every minute, humidity every 5 and air pressure every 10
+minutes. Measurands that are due together share one BME280 read and one batch
+uplink; in between the runner sleeps until the next deadline.
+
+Needs a BME280 MicroPython driver (not bundled) — e.g. robert-hh/BME280:
+    mpremote mip install github:robert-hh/BME280
+Different drivers expose slightly different APIs; adjust the reader below to
+match the driver you install.
+
+Wiring (I2C, ESP32-S3): SDA=GPIO10, SCL=GPIO11, BME280 at address 0x76.
+"""
+
+from machine import I2C, Pin
+
+import bme280
+from loramint import LoRaMINT
+from loramint.noderunner import NodeRunner
+
+# BME280 on I2C (ESP32-S3 pins; change to match your board)
+I2C_SDA = 10
+I2C_SCL = 11
+i2c = I2C(0, sda=Pin(I2C_SDA), scl=Pin(I2C_SCL))
+sensor = bme280.BME280(i2c=i2c)
+
+lora = LoRaMINT()
+
+if not lora.check_connection():
+    raise SystemExit("Aborting: no UART connection to the LA66.")
+
+print("Joining LoRaWAN network...")
+if not lora.join():
+    raise SystemExit("Join failed.")
+print("Joined.")
+
+runner = NodeRunner(lora, "Raum 101")
+# robert-hh/BME280 (float variant): returns (temperature, pressure, humidity).
+runner.add_sensor("BME280", sensor.read_compensated_data)
+runner.add_measurand("BME280", "Temperatur", "*C", 60, index=0)
+runner.add_measurand("BME280", "Luftfeuchte", "% rel", 300, index=2)
+runner.add_measurand("BME280", "Druck", "hPa", 600, index=1,
+                     convert=lambda pa: pa / 100)
+runner.run()
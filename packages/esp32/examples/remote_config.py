@@ -0,0 +1,58 @@
+"""
+Example: a BME280 node whose reporting the backend can change over the air.
+
+Like send_temperature.py, but the sampling interval, the temperature
+dead-band, the batch size and the data rate come from a RemoteConfig: a
+downlink on port 10 changes them, they are kept in loramint.cfg on flash and
+survive a reboot, and the next uplink reports the new settings as a log
+entry. E.g. a downlink of 01 01 2C 02 00 32 (hex) makes the node sample
+every 5 minutes and report changes of 0.5 degrees or more.
+
+Needs a BME280 MicroPython driver (not bundled) — e.g. robert-hh/BME280:
+    mpremote mip install github:robert-hh/BME280
+Different drivers expose slightly different APIs; adjust the read line below to
+match the driver you install.
+
+Wiring (I2C, ESP32-S3): SDA=GPIO10, SCL=GPIO11, BME280 at address 0x76.
+"""
+
+import time
+from machine import I2C, Pin
+
+import bme280
+from loramint import LoRaMINT, MintValue
+from loramint.remoteconfig import RemoteConfig
+from loramint.reportpolicy import ReportPolicy
+
+# BME280 on I2C (ESP32-S3 pins; change to match your board)
+I2C_SDA = 10
+I2C_SCL = 11
+i2c = I2C(0, sda=Pin(I2C_SDA), scl=Pin(I2C_SCL))
+sensor = bme280.BME280(i2c=i2c)
+
+# Defaults until the first configuration downlink
+policy = ReportPolicy(absolute=0.2, heartbeat=3600)
+config = RemoteConfig("loramint.cfg", interval=60, policy=policy)
+lora = LoRaMINT(config=config)
+
+if not lora.check_connection():
+    raise SystemExit("Aborting: no UART connection to the LA66.")
+
+print("Joining LoRaWAN network...")
+if not lora.join():
+    raise SystemExit("Join failed.")
+print("Joined.")
+
+while True:
+    # robert-hh/BME280 (float variant): returns (temperature, pressure, humidity).
+    temperature, _, _ = sensor.read_compensated_data()
+    value = MintValue(temperature, "*C", "Raum 101", "Temperatur", "BME280")
+    if policy.due(value):
+        if lora.sendValue(value):
+            print("Measurement sent:", temperature)
+        else:
+            policy.failed(value)
+    downlink = lora.check_downlink()
+    if downlink:
+        print("Downlink:", downlink, "-", config.report())
+    time.sleep(config.interval)
@@ -0,0 +1,62 @@
+"""
+Example: sample a BME280 every second while the LA66 joins and sends, using
+the uasyncio driver AsyncLoRaMINT.
+
+With the blocking LoRaMINT, join() can stall the program for up to 60 s and
+every send for up to 5 s. AsyncLoRaMINT awaits the radio instead, so the
+sampling task below keeps its 1 s rhythm the whole time.
+
+Needs a BME280 MicroPython driver (not bundled) — e.g. robert-hh/BME280:
+    mpremote mip install github:robert-hh/BME280
+
+Wiring (I2C, ESP32-S3): SDA=GPIO10, SCL=GPIO11, BME280 at address 0x76.
+"""
+
+import uasyncio as asyncio
+from machine import I2C, Pin
+
+import bme280
+from loramint import MintValue
+from loramint.asyncloramint import AsyncLoRaMINT
+
+UPLINK_INTERVAL = 60  # seconds between uplinks
+SAMPLE_INTERVAL = 1   # seconds between sensor reads
+
+# BME280 on I2C (ESP32-S3 pins; change to match your board)
+I2C_SDA = 10
+I2C_SCL = 11
+i2c = I2C(0, sda=Pin(I2C_SDA), scl=Pin(I2C_SCL))
+sensor = bme280.BME280(i2c=i2c)
+
+latest = None  # most recent temperature reading
+
+
+async def sample():
+    global latest
+    while True:
+        # robert-hh/BME280 (float variant): returns (temperature, pressure, humidity).
+        latest, _, _ = sensor.read_compensated_data()
+        await asyncio.sleep(SAMPLE_INTERVAL)
+
+
+async def main():
+    asyncio.create_task(sample())
+
+    lora = AsyncLoRaMINT()
+    await lora.reset()
+    if not await lora.check_connection():
+        raise SystemExit("Aborting: no UART connection to the LA66.")
+
+    print("Joining LoRaWAN network...")
+    if not await lora.join():
+        raise SystemExit("Join failed.")
+    print("Joined.")
+
+    while True:
+        await asyncio.sleep(UPLINK_INTERVAL)
+        value = MintValue(latest, "*C", "Raum 101", "Temperatur", "BME280")
+        if await lora.send_value(value):
+            print("Measurement sent:", latest)
+
+
+asyncio.run(main())
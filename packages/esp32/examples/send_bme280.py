@@ -0,0 +1,60 @@
+"""
+Example: sample temperature, humidity and air pressure from a BME280 every few
+seconds and send their mean, minimum and maximum once per minute.
+
+MintAggregator keeps only running statistics per measurand, so oversampling
+costs no RAM; one noisy sample no longer stands for the whole minute.
+sendValues() packs the nine values into batch frames (see MintBatch); with
+metadata_ids=True each costs 7 bytes after the first uplink, so from DR3 on
+they travel in a single uplink.
+
+Needs a BME280 MicroPython driver (not bundled) — e.g. robert-hh/BME280:
+    mpremote mip install github:robert-hh/BME280
+Different drivers expose slightly different APIs; adjust the read line below to
+match the driver you install.
+
+Wiring (I2C, ESP32-S3): SDA=GPIO10, SCL=GPIO11, BME280 at address 0x76.
+"""
+
+import time
+from machine import I2C, Pin
+
+import bme280
+from loramint import LoRaMINT
+from loramint.aggregator import MintAggregator
+
+UPLINK_INTERVAL = 60  # seconds between uplinks
+SAMPLE_INTERVAL = 2   # seconds between BME280 readings
+
+# BME280 on I2C (ESP32-S3 pins; change to match your board)
+I2C_SDA = 10
+I2C_SCL = 11
+i2c = I2C(0, sda=Pin(I2C_SDA), scl=Pin(I2C_SCL))
+sensor = bme280.BME280(i2c=i2c)
+
+lora = LoRaMINT(metadata_ids=True)
+aggregator = MintAggregator("Raum 101", "BME280")
+
+if not lora.check_connection():
+    raise SystemExit("Aborting: no UART connection to the LA66.")
+
+print("Joining LoRaWAN network...")
+if not lora.join():
+    raise SystemExit("Join failed.")
+print("Joined.")
+
+while True:
+    start = time.ticks_ms()
+    while time.ticks_diff(time.ticks_ms(), start) < UPLINK_INTERVAL * 1000:
+        # robert-hh/BME280 (float variant): returns (temperature, pressure, humidity).
+        temperature, pressure, humidity = sensor.read_compensated_data()
+        aggregator.add("Temperatur", "*C", temperature)
+        aggregator.add("Luftfeuchte", "% rel", humidity)
+        aggregator.add("Druck", "hPa", pressure / 100)
+        time.sleep(SAMPLE_INTERVAL)
+
+    temperature = aggregator.stats("Temperatur")
+    if lora.sendValues(aggregator.values()):
+        print("Sent {} samples: {:.2f} *C ({:.2f}..{:.2f})".format(
+            temperature["count"], temperature["mean"], temperature["min"],
+            temperature["max"]))
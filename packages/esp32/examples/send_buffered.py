@@ -0,0 +1,49 @@
+"""
+Example: keep measuring while the LoRaWAN link is down and deliver the stored
+readings once it is back.
+
+Every reading carries its own timestamp. If it cannot be sent (not joined yet,
+no gateway in range), it is put into a MintQueue on flash - it survives a
+reboot - and sent later, together with the other queued readings, in as few
+batch uplinks as possible.
+
+The RTC must be set to the current time for the timestamps to be meaningful,
+e.g. with ntptime over WiFi or from a battery-backed RTC module.
+"""
+
+import time
+
+from loramint import LoRaMINT, MintValue
+from loramint.mintqueue import MintQueue
+
+UPLINK_INTERVAL = 60      # seconds between readings
+QUEUE_SLOTS = 128         # readings kept on flash while offline (~13 KB)
+
+# Seconds between the board's time epoch and the Unix epoch (1970). Older
+# MicroPython builds count from 2000.
+EPOCH_OFFSET = 946684800 if time.gmtime(0)[0] == 2000 else 0
+
+lora = LoRaMINT()
+queue = MintQueue("loramint.queue", slots=QUEUE_SLOTS)
+print("Readings waiting from before the reboot:", len(queue))
+
+if not lora.check_connection():
+    raise SystemExit("Aborting: no UART connection to the LA66.")
+
+joined = lora.join()
+
+while True:
+    value = MintValue(21.5, "*C", "Raum 101", "Temperatur", "BME280",
+                      time=time.time() + EPOCH_OFFSET)
+    if not joined:
+        joined = lora.join()
+
+    if joined and lora.sendValue(value):
+        print("Measurement sent.")
+        if len(queue):
+            print("Queued readings sent:", lora.sendQueued(queue))
+    else:
+        queue.enqueue(value)
+        print("Offline - readings queued:", len(queue))
+
+    time.sleep(UPLINK_INTERVAL)
@@ -1,5 +1,11 @@
 """
-Example: read the temperature from a BME280 and send it once per minute.
+Example: read the temperature from a BME280 once per minute and send it when
+it has changed.
+
+A room temperature barely moves from one minute to the next, so a ReportPolicy
+only lets a reading through once it differs by at least 0.2 degrees from the
+last one sent - and at least once an hour, so a silent node can be told apart
+from a steady room.
 
 Needs a BME280 MicroPython driver (not bundled) — e.g. robert-hh/BME280:
     mpremote mip install github:robert-hh/BME280
@@ -14,8 +20,9 @@ from machine import I2C, Pin
 
 import bme280
 from loramint import LoRaMINT, MintValue
+from loramint.reportpolicy import ReportPolicy
 
-UPLINK_INTERVAL = 60  # seconds between uplinks
+SAMPLE_INTERVAL = 60  # seconds between readings
 
 # BME280 on I2C (ESP32-S3 pins; change to match your board)
 I2C_SDA = 10
@@ -24,6 +31,7 @@ i2c = I2C(0, sda=Pin(I2C_SDA), scl=Pin(I2C_SCL))
 sensor = bme280.BME280(i2c=i2c)
 
 lora = LoRaMINT()
+policy = ReportPolicy(absolute=0.2, heartbeat=3600)
 
 if not lora.check_connection():
     raise SystemExit("Aborting: no UART connection to the LA66.")
@@ -37,6 +45,9 @@ while True:
     # robert-hh/BME280 (float variant): returns (temperature, pressure, humidity).
     temperature, _, _ = sensor.read_compensated_data()
     value = MintValue(temperature, "*C", "Raum 101", "Temperatur", "BME280")
-    if lora.sendValue(value):
-        print("Measurement sent:", temperature)
-    time.sleep(UPLINK_INTERVAL)
+    if policy.due(value):
+        if lora.sendValue(value):
+            print("Measurement sent:", temperature)
+        else:
+            policy.failed(value)
+    time.sleep(SAMPLE_INTERVAL)
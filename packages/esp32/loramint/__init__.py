@@ -3,6 +3,12 @@ LoRaMINT - MicroPython library for LoRaMINT sensor nodes on an ESP32 with a
 Dragino LA66 LoRaWAN module.
 
     from loramint import LoRaMINT, MintValue
+
+The optional classes are imported from their modules, so a node only loads
+(and, on a source install, compiles) what it uses:
+
+    from loramint.minttemplate import MintTemplate
+    from loramint.noderunner import NodeRunner
 """
 
 from .loramint import LoRaMINT
@@ -0,0 +1,87 @@
+"""
+MicroPython / CPython compatibility. The library is written for MicroPython;
+these fallbacks let the encoder and the driver be imported, tested and
+profiled under CPython on a PC as well.
+
+On a board every name below is the MicroPython original. Under CPython:
+
+    ubinascii        binascii
+    const            returns its argument (micropython.const)
+    getrandbits      random.getrandbits
+    mem_alloc        None (gc.mem_alloc/mem_free: no heap figures under CPython)
+    mem_free         None
+    ticks_*          time.monotonic() in milliseconds (no wrap-around)
+    sleep_ms         time.sleep() in milliseconds
+    UART             None - pass an object with the UART methods instead,
+                     LoRaMINT(uart=...), e.g. the LA66 emulator in dev_scripts
+    RTC              keeps its memory in RAM for the lifetime of the process
+    reset_cause      always PWRON_RESET, so there is never a warm start
+    disable_irq      no-ops: there are no interrupts under CPython
+    enable_irq
+"""
+
+import time
+
+try:
+    import ubinascii
+except ImportError:
+    import binascii as ubinascii
+
+try:
+    from micropython import const
+except ImportError:
+    def const(value):
+        return value
+
+try:
+    from random import getrandbits
+except ImportError:     # MicroPython before 1.19
+    from urandom import getrandbits
+
+try:
+    from gc import mem_alloc, mem_free
+except ImportError:
+    mem_alloc = mem_free = None
+
+try:
+    ticks_ms = time.ticks_ms
+    ticks_add = time.ticks_add
+    ticks_diff = time.ticks_diff
+    sleep_ms = time.sleep_ms
+except AttributeError:
+    def ticks_ms():
+        return int(time.monotonic() * 1000)
+
+    def ticks_add(ticks, delta):
+        return ticks + delta
+
+    def ticks_diff(end, start):
+        return end - start
+
+    def sleep_ms(ms):
+        time.sleep(ms / 1000)
+
+try:
+    from machine import (DEEPSLEEP_RESET, PWRON_RESET, RTC, UART, disable_irq,
+                         enable_irq, reset_cause)
+except ImportError:
+    PWRON_RESET = 1
+    DEEPSLEEP_RESET = 4
+    UART = None
+
+    class RTC:
+        _memory = b""
+
+        def memory(self, data=None):
+            if data is None:
+                return RTC._memory
+            RTC._memory = bytes(data)
+
+    def reset_cause():
+        return PWRON_RESET
+
+    def disable_irq():
+        return None
+
+    def enable_irq(state):
+        pass
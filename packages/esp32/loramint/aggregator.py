@@ -0,0 +1,141 @@
+"""
+MintAggregator - windowed statistics of oversampled readings, sent as a few
+MintValues per uplink instead of one arbitrary sample.
+
+A node usually uplinks once a minute but can read its sensors far more often.
+The aggregator takes every sample and keeps, per measurand, only running
+statistics - count, min, max, mean and variance (Welford's algorithm) - so
+its RAM use does not grow with the number of samples. At uplink time,
+values() turns each measurand into MintValues and starts the next window:
+
+    aggregator = MintAggregator("Raum 101", "BME280")
+    ... every few seconds:
+        aggregator.add("Temperatur", "*C", temperature)
+    ... every minute:
+        lora.sendValues(aggregator.values())
+
+The mean is sent under the measurand itself, so a series keeps its name
+whether it is sampled once or aggregated. The other statistics are sent as
+measurands of their own, named with a suffix (see SUFFIXES), e.g.
+"Temperatur max"; a measurand too long for the 15-character field is cut
+short to fit the suffix. sendValues() packs them into batch frames; with
+LoRaMINT(metadata_ids=True) each statistic costs 7 bytes once its metadata is
+registered, so mean, min and max of three measurands fit one uplink from DR3.
+"""
+
+import math
+
+from .mintvalue import MintValue
+
+
+class MintAggregator:
+    # statistic -> suffix appended to the measurand on the wire
+    SUFFIXES = {
+        "mean": "",
+        "min": " min",
+        "max": " max",
+        "std": " sd",      # sample standard deviation
+        "count": " n",     # number of samples, as a "long"
+    }
+
+    # per-measurand state, a list so that add() updates it in place
+    _UNIT, _COUNT, _MEAN, _M2, _MIN, _MAX = range(6)
+
+    def __init__(self, location, sensor, stats=("mean", "min", "max")):
+        """
+        Aggregate readings of `sensor` at `location`. `stats` selects what
+        values() sends per measurand, any of SUFFIXES.
+        """
+        for stat in stats:
+            if stat not in self.SUFFIXES:
+                raise ValueError("unknown statistic: " + stat)
+        self._location = location
+        self._sensor = sensor
+        self._stats = tuple(stats)
+        self._series = {}      # measurand -> [unit, count, mean, m2, min, max]
+
+    def __len__(self):
+        """Number of measurands with samples in the current window."""
+        return len(self._series)
+
+    # ------------------------------------------------------------------ #
+    # Sampling
+    # ------------------------------------------------------------------ #
+
+    def add(self, measurand, unit, sample):
+        """Add one numeric sample of `measurand` (in `unit`) to the window."""
+        state = self._series.get(measurand)
+        if state is None:
+            self._series[measurand] = [unit, 1, sample, 0.0, sample, sample]
+            return
+        count = state[self._COUNT] + 1
+        delta = sample - state[self._MEAN]
+        mean = state[self._MEAN] + delta / count
+        state[self._COUNT] = count
+        state[self._MEAN] = mean
+        state[self._M2] += delta * (sample - mean)
+        if sample < state[self._MIN]:
+            state[self._MIN] = sample
+        elif sample > state[self._MAX]:
+            state[self._MAX] = sample
+
+    def stats(self, measurand):
+        """
+        Return {"count", "min", "max", "mean", "variance"} of the current
+        window of `measurand`, or None without samples. The variance is the
+        sample variance (0.0 for a single sample).
+        """
+        state = self._series.get(measurand)
+        if state is None:
+            return None
+        count = state[self._COUNT]
+        return {
+            "count": count,
+            "min": state[self._MIN],
+            "max": state[self._MAX],
+            "mean": state[self._MEAN],
+            "variance": state[self._M2] / (count - 1) if count > 1 else 0.0,
+        }
+
+    # ------------------------------------------------------------------ #
+    # Output
+    # ------------------------------------------------------------------ #
+
+    def values(self, reset=True, time=None):
+        """
+        Return the selected statistics of every measurand as MintValues and
+        (with `reset`) start a new window. `time` is passed on as the values'
+        Unix timestamp.
+        """
+        values = []
+        for measurand, state in self._series.items():
+            stats = self.stats(measurand)
+            for stat in self._stats:
+                if stat == "count":
+                    value, datatype = stats["count"], "long"
+                elif stat == "std":
+                    value, datatype = math.sqrt(stats["variance"]), "float"
+                else:
+                    value, datatype = float(stats[stat]), "float"
+                values.append(MintValue(
+                    value, state[self._UNIT], self._location,
+                    self._name(measurand, self.SUFFIXES[stat]), self._sensor,
+                    datatype=datatype, time=time))
+        if reset:
+            self.reset()
+        return values
+
+    def reset(self):
+        """Discard the current window."""
+        self._series = {}
+
+    # ------------------------------------------------------------------ #
+    # Helpers
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _name(measurand, suffix):
+        """`measurand` with `suffix`, shortened to fit the measurand field."""
+        if not suffix:
+            return measurand
+        return measurand[:MintValue.MAX_MEASURAND - len(suffix)] + suffix
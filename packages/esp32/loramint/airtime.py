@@ -0,0 +1,140 @@
+"""
+AirtimeScheduler - keeps a node's uplinks within the EU868 duty cycle and the
+TTN fair-use policy, and lets them go at the earliest moment both allow.
+
+For every uplink the LoRa time-on-air is computed from the payload size and
+the data rate (spreading factor and bandwidth). After a transmission the
+sub-band is closed for 99x the time-on-air (1 % duty cycle), and at least
+until the two Class A receive windows have passed. Over any 24 hours the
+airtime may add up to 30 s (TTN fair use); once that budget is spent, the
+next uplink waits until enough earlier airtime has left the window.
+
+    lora = LoRaMINT(scheduler=AirtimeScheduler())
+    lora.sendValue(value)    # sleeps first if sending now would be illegal
+
+The history lives in RAM: after a reset or deep sleep the scheduler starts
+with a full budget again.
+"""
+
+from ._compat import ticks_add, ticks_diff, ticks_ms
+
+
+class AirtimeScheduler:
+    DUTY_CYCLE = 0.01            # EU868 g1 sub-band: 1 % of the time
+    FAIR_USE_MS = 30000          # TTN: 30 s uplink airtime per device and day
+    WINDOW_MS = 24 * 3600 * 1000
+    RX_WINDOWS_MS = 3000         # RX1 at +1 s, RX2 at +2 s after the uplink
+    MERGE_MS = 60000             # history resolution (one entry per minute)
+    EXPIRY_MS = WINDOW_MS + MERGE_MS   # entry age at which all of it is out
+
+    # LoRaWAN framing around the application payload: MHDR (1), FHDR
+    # without FOpts (7), FPort (1) and MIC (4)
+    OVERHEAD_BYTES = 13
+    PREAMBLE_SYMBOLS = 8
+    CODING_RATE = 1              # 4/5
+
+    # EU868 data rate -> (spreading factor, bandwidth in Hz); DR7 is FSK
+    DATA_RATES = (
+        (12, 125000), (11, 125000), (10, 125000), (9, 125000),
+        (8, 125000), (7, 125000), (7, 250000),
+    )
+    FSK_BITRATE = 50000          # DR7
+    WORST_DATA_RATE = 0          # assumed when the data rate is unknown
+
+    def __init__(self, duty_cycle=DUTY_CYCLE, fair_use_ms=FAIR_USE_MS):
+        """
+        Create a scheduler for the given duty cycle (fraction of time the
+        radio may transmit) and daily airtime budget in milliseconds.
+        """
+        self._duty_cycle = duty_cycle
+        self._fair_use_ms = fair_use_ms
+        self._history = []       # [first ticks_ms, airtime_ms], oldest first
+        self._next = None        # ticks_ms from which the radio may send again
+
+    # ------------------------------------------------------------------ #
+    # Time-on-air
+    # ------------------------------------------------------------------ #
+
+    @classmethod
+    def time_on_air(cls, payload_size, data_rate=None):
+        """
+        Return the time-on-air in milliseconds of an uplink carrying
+        `payload_size` application bytes at the EU868 `data_rate` (index;
+        None = unknown, assumes the slowest rate).
+        """
+        if data_rate is None:
+            data_rate = cls.WORST_DATA_RATE
+        size = payload_size + cls.OVERHEAD_BYTES
+
+        if data_rate >= len(cls.DATA_RATES):
+            # FSK: preamble (5), sync word (3), length (1), payload, CRC (2)
+            return -(-(5 + 3 + 1 + size + 2) * 8 * 1000 // cls.FSK_BITRATE)
+
+        sf, bandwidth = cls.DATA_RATES[data_rate]
+        symbol_us = (1 << sf) * 1000000 // bandwidth
+        # low data rate optimisation for symbols longer than 16 ms
+        de = 1 if symbol_us > 16000 else 0
+        # explicit header, CRC on (Semtech AN1200.13)
+        bits = 8 * size - 4 * sf + 28 + 16
+        blocks = -(-bits // (4 * (sf - 2 * de))) if bits > 0 else 0
+        symbols = 8 + blocks * (cls.CODING_RATE + 4)
+        preamble_us = (4 * cls.PREAMBLE_SYMBOLS + 17) * symbol_us // 4
+        return -(-(preamble_us + symbols * symbol_us) // 1000)
+
+    # ------------------------------------------------------------------ #
+    # Budget
+    # ------------------------------------------------------------------ #
+
+    def airtime_used(self):
+        """Airtime in milliseconds spent within the last 24 hours."""
+        self._expire(ticks_ms())
+        return sum(entry[1] for entry in self._history)
+
+    def delay(self, payload_size, data_rate=None):
+        """
+        Return how many milliseconds to wait before an uplink of
+        `payload_size` bytes at `data_rate` may be sent (0 = right away).
+        Raises ValueError if it would never fit into the daily budget.
+        """
+        airtime = self.time_on_air(payload_size, data_rate)
+        if airtime > self._fair_use_ms:
+            raise ValueError("uplink exceeds the daily airtime budget")
+
+        now = ticks_ms()
+        self._expire(now)
+        wait = 0
+        if self._next is not None:
+            wait = max(0, ticks_diff(self._next, now))
+
+        excess = sum(entry[1] for entry in self._history) + airtime - self._fair_use_ms
+        for sent, spent in self._history:
+            if excess <= 0:
+                break
+            excess -= spent
+            if excess <= 0:
+                expiry = ticks_add(sent, self.EXPIRY_MS)
+                wait = max(wait, ticks_diff(expiry, now))
+        return wait
+
+    def record(self, payload_size, data_rate=None):
+        """Account for an uplink that the radio has just been handed."""
+        airtime = self.time_on_air(payload_size, data_rate)
+        now = ticks_ms()
+        closed = max(int(airtime / self._duty_cycle), airtime + self.RX_WINDOWS_MS)
+        self._next = ticks_add(now, closed)
+
+        history = self._history
+        if history and ticks_diff(now, history[-1][0]) < self.MERGE_MS:
+            history[-1][1] += airtime
+        else:
+            history.append([now, airtime])
+
+    def _expire(self, now):
+        """
+        Drop history entries that have left the 24-hour window. An entry
+        covers uplinks up to MERGE_MS after its timestamp, so it is kept that
+        much longer - airtime never leaves the budget too early.
+        """
+        history = self._history
+        while history and ticks_diff(now, history[0][0]) >= self.EXPIRY_MS:
+            history.pop(0)
@@ -0,0 +1,407 @@
+"""
+AsyncLoRaMINT - uasyncio variant of LoRaMINT. join() and the send methods are
+coroutines that yield while the radio is busy instead of blocking the
+interpreter: sensor sampling, display updates and other tasks keep running in
+the meantime.
+
+    import uasyncio as asyncio
+    from loramint import MintValue
+    from loramint.asyncloramint import AsyncLoRaMINT
+
+    async def main():
+        lora = AsyncLoRaMINT()
+        await lora.reset()
+        if await lora.join():
+            await lora.send_value(MintValue(21.5, "*C", "Raum 101",
+                                            "Temperatur", "BME280"))
+
+    asyncio.run(main())
+
+Payload encoding (compact frames, metadata ids, batches, queued readings) and
+the UART reading are shared with LoRaMINT: the driver polls the UART from the
+event loop with readinto() into the same ATParser, so a line that is only
+partly received when a wait times out is completed by the next read rather
+than lost. Each public coroutine holds the driver's lock for its whole
+command/response sequence, so tasks sending at the same time take turns on
+the one UART instead of interleaving their AT commands. It lives in its own module so the blocking LoRaMINT does not pull
+in uasyncio; under CPython it runs on asyncio, e.g. against the LA66 emulator
+(AsyncLoRaMINT(uart=emulator)).
+"""
+
+from ._compat import UART, ticks_add, ticks_diff, ticks_ms
+from .atparser import ATParser
+from .loramint import LoRaMINT
+
+try:
+    import uasyncio as asyncio
+    sleep_ms = asyncio.sleep_ms
+except ImportError:     # CPython
+    import asyncio
+
+    def sleep_ms(ms):
+        return asyncio.sleep(ms / 1000)
+
+
+def _exclusive(method):
+    """
+    Run a public coroutine holding the driver's lock. The task holding it
+    may call other public coroutines (send_value() awaits wait_tx_done()).
+    """
+    async def locked(self, *args, **kwargs):
+        task = asyncio.current_task()
+        if self._owner is task:
+            return await method(self, *args, **kwargs)
+        async with self._lock:
+            self._owner = task
+            try:
+                return await method(self, *args, **kwargs)
+            finally:
+                self._owner = None
+    return locked
+
+
+class AsyncLoRaMINT(LoRaMINT):
+    def __init__(self, uart_id=2, tx=17, rx=16, baudrate=9600, compact=False,
+                 metadata_ids=False, scheduler=None, warm_start=False,
+                 config=None, stats_interval=None, time_sync=False,
+                 compress_logs=False, uart=None):
+        """
+        Open the UART to the LA66. Unlike LoRaMINT, the module is not reset
+        here (that would block for 2 s) - await reset() before the first
+        command. `compact`, `metadata_ids`, `scheduler`, `warm_start`,
+        `config`, `stats_interval`, `time_sync`, `compress_logs` and `uart`
+        work as in LoRaMINT; waiting for the scheduler does not block other
+        tasks, and after a warm start from deep sleep reset() returns at once.
+        """
+        self._configure(compact, metadata_ids, scheduler, warm_start, config,
+                        stats_interval, time_sync, compress_logs)
+        if uart is None:
+            if UART is None:
+                raise ValueError("no machine.UART on this platform - pass uart=")
+            # timeout=0: reads never block (the event loop polls instead);
+            # a TX buffer holding the longest command lets write() return
+            # without waiting for the bytes to go out at 9600 baud
+            uart = UART(uart_id, baudrate=baudrate, bits=8, parity=None,
+                        stop=1, tx=tx, rx=rx, timeout=0, txbuf=len(self._tx))
+        self._uart = uart
+        self._rx_irq = False    # the event loop polls the UART
+        self._lock = asyncio.Lock()   # one command/response sequence at a time
+        self._owner = None            # the task holding the lock
+
+    # ------------------------------------------------------------------ #
+    # Public API (coroutines)
+    # ------------------------------------------------------------------ #
+
+    @_exclusive
+    async def reset(self):
+        """Reset the LA66 module (ATZ) and wait for it to come back up."""
+        if self._warm:
+            self._drain()
+            return
+        self._drain()
+        self._uart.write(b"ATZ\r\n")       # not timed: no "OK" follows
+        await asyncio.sleep(2)
+        self._drain()
+        if self._config is not None and self._config.data_rate is not None:
+            await self._set_data_rate(self._config.data_rate)
+        if self._time_sync:
+            await self._command("AT+SYNCMOD=1")
+            await self._response(3000)
+
+    @_exclusive
+    async def check_connection(self, timeout_ms=3000):
+        """Verify the UART link via AT+VER=? (see LoRaMINT.check_connection)."""
+        return self._report_connection(await self.get_version(timeout_ms))
+
+    @_exclusive
+    async def get_version(self, timeout_ms=3000):
+        """Query the LA66 firmware version; None if the module did not respond."""
+        await self._command("AT+VER=?")
+        return self._parse_version(await self._response(timeout_ms))
+
+    @_exclusive
+    async def join(self, timeout_ms=60000):
+        """
+        Join the LoRaWAN network via OTAA (AT+JOIN). Other tasks keep running
+        until the module reports a join result or the timeout elapses.
+        Returns True on success, False otherwise.
+        """
+        start = ticks_ms()
+        await self._command("AT+JOIN")
+        event = await self._expect((ATParser.JOINED, ATParser.JOIN_FAILED,
+                                    ATParser.ERROR), timeout_ms)
+        return self._joined(event == ATParser.JOINED, start)
+
+    @_exclusive
+    async def is_joined(self, timeout_ms=3000):
+        """Ask the LA66 whether it has joined the network (AT+NJS=?)."""
+        await self._command("AT+NJS=?")
+        return self._parse_number(await self._response(timeout_ms)) == 1
+
+    @_exclusive
+    async def ensure_joined(self, timeout_ms=60000):
+        """Join only if necessary (see LoRaMINT.ensure_joined)."""
+        if self._warm and self._rtc_joined() and await self.is_joined():
+            return True
+        return await self.join(timeout_ms)
+
+    @_exclusive
+    async def get_data_rate(self, timeout_ms=3000):
+        """Query the current data rate index (AT+DR=?); None if unknown."""
+        await self._command("AT+DR=?")
+        return self._note_data_rate(self._parse_number(await self._response(timeout_ms)))
+
+    @_exclusive
+    async def max_payload(self):
+        """Maximum application payload in bytes at the current data rate."""
+        return self._payload_limit(await self.get_data_rate())
+
+    @_exclusive
+    async def sync_time(self, timeout_ms=3000):
+        """Set the clock from the LA66's network time (see LoRaMINT.sync_time)."""
+        await self._command("AT+TIMESTAMP=?")
+        return self._set_clock(await self._response(timeout_ms))
+
+    @_exclusive
+    async def wait_tx_done(self, timeout_ms=LoRaMINT.TX_WAIT_MS):
+        """
+        Wait, without blocking other tasks, until the last uplink has been
+        transmitted and its receive windows have closed (see
+        LoRaMINT.wait_tx_done). Returns True once the radio is idle.
+        """
+        radio = self._radio
+        deadline = ticks_add(ticks_ms(), timeout_ms)
+        while radio.busy():
+            now = ticks_ms()
+            left = ticks_diff(deadline, now)
+            if left <= 0:
+                return False
+            await self._next_event(ticks_add(now, min(left, radio.remaining_ms())))
+        if self._rx_pending:
+            await self._fetch_downlink()
+        return True
+
+    @_exclusive
+    async def check_downlink(self):
+        """
+        Return the latest downlink received since the last call as (port,
+        payload bytes), or None (see LoRaMINT.check_downlink).
+        """
+        await self.wait_tx_done()
+        downlink, self._received = self._received, None
+        return downlink
+
+    @_exclusive
+    async def send_log(self, message):
+        """Send a log entry; True if the LA66 acknowledged with "OK"."""
+        return await self._send(self._encode_log(message))
+
+    @_exclusive
+    async def send_value(self, value):
+        """Send a MintValue; True if the LA66 acknowledged with "OK"."""
+        payload, registered = self._encode_value(value)
+        max_size = await self._max_size_async(len(payload))
+        if len(payload) > max_size:
+            payload = self._compact_value(value, payload)
+        ok = await self._send(payload, max_size)
+        if not ok:
+            self._forget_metadata(registered)
+        return ok
+
+    @_exclusive
+    async def send_values(self, values):
+        """
+        Send several MintValues in as few batch frames as the current data
+        rate allows (see LoRaMINT.sendValues); other tasks keep running while
+        a frame waits for the radio to finish the previous one.
+        """
+        if self._config is not None:
+            await self.wait_tx_done()
+        ok = True
+        max_size = await self._max_size_async()
+        for batch in self._pack_values(values, max_size):
+            if not await self._send(batch.to_bytes(), max_size):
+                self._forget_metadata(batch.registered)
+                ok = False
+        return ok
+
+    @_exclusive
+    async def send_queued(self, queue):
+        """
+        Deliver the readings waiting in a MintQueue in batch frames (see
+        LoRaMINT.sendQueued). Returns the number of readings sent.
+        """
+        if self._config is not None:
+            await self.wait_tx_done()
+        sent = 0
+        max_size = await self._max_size_async()
+        while len(queue):
+            batch, slots = self._fill_batch(queue, max_size)
+            if not len(batch):
+                queue.pop(slots)    # only unreadable slots
+                continue
+            if not await self._send(batch.to_bytes(), max_size):
+                break
+            queue.pop(slots)
+            sent += len(batch)
+        return sent
+
+    @_exclusive
+    async def send_buffered(self, buffer):
+        """
+        Deliver the readings of a MintBuffer in timed batch frames (see
+        LoRaMINT.sendBuffered). Returns the number of readings sent.
+        """
+        if self._config is not None:
+            await self.wait_tx_done()
+        if self._sync_due():
+            await self.sync_time()
+        sent = 0
+        max_size = await self._max_size_async()
+        while len(buffer):
+            batch = self._timed_batch(buffer, max_size)
+            if not await self._send(batch.to_bytes(), max_size):
+                self._forget_metadata(batch.registered)
+                break
+            buffer.pop(len(batch))
+            sent += len(batch)
+        return sent
+
+    # The Arduino-style names are the same coroutines.
+    sendLog = send_log
+    sendValue = send_value
+    sendValues = send_values
+    sendQueued = send_queued
+    sendBuffered = send_buffered
+
+    # ------------------------------------------------------------------ #
+    # LA66 / UART helpers
+    # ------------------------------------------------------------------ #
+
+    async def _command(self, command):
+        """Discard stale input, then write an AT command terminated with CRLF."""
+        self._drain()
+        self._send_at(command)
+
+    async def _send(self, payload, max_size=None):
+        """
+        Send raw payload bytes, in fragments if needed and after the due
+        reports (see LoRaMINT._send_payload).
+        """
+        if self._config is not None:
+            await self.wait_tx_done()     # a downlink may change the config
+        for report, reported in self._reports():
+            if await self._send_frames(report):
+                reported()
+        return await self._send_frames(payload, max_size)
+
+    async def _send_frames(self, payload, max_size=None):
+        """Transmit a payload, or its fragments (see LoRaMINT._send_frames)."""
+        if max_size is None:
+            max_size = await self._max_size_async(len(payload))
+        for frame in self._fragments(payload, max_size):
+            if not await self._transmit(frame):
+                return False
+        return True
+
+    async def _max_size_async(self, length=None):
+        """Payload limit for `length` bytes (see LoRaMINT._max_size)."""
+        if length is not None and length <= self.MIN_PAYLOAD:
+            return self.MIN_PAYLOAD
+        return self._payload_limit(await self._known_data_rate_async())
+
+    async def _known_data_rate_async(self):
+        """The last known data rate (see LoRaMINT._known_data_rate)."""
+        if self._data_rate is None:
+            return await self.get_data_rate()
+        return self._data_rate
+
+    async def _fetch_downlink(self, timeout_ms=3000):
+        """Read the reported downlink (see LoRaMINT._fetch_downlink)."""
+        self._rx_pending = False
+        await self._command("AT+RECVB=?")
+        downlink = self._parse_downlink(await self._response(timeout_ms))
+        if downlink is not None:
+            self._received = downlink
+            if self._apply_config(*downlink):
+                await self._set_data_rate(self._config.data_rate)
+
+    async def _set_data_rate(self, data_rate):
+        """Fix the data rate, or go back to ADR (see LoRaMINT._set_data_rate)."""
+        self._data_rate = data_rate
+        if data_rate is None:
+            await self._command("AT+ADR=1")
+            await self._response(3000)
+            return
+        await self._command("AT+ADR=0")
+        await self._response(3000)
+        await self._command("AT+DR={}".format(data_rate))
+        await self._response(3000)
+
+    async def _transmit(self, payload):
+        """
+        Send raw payload bytes via AT+SENDB once the radio is idle; True on
+        "OK" (see LoRaMINT._transmit).
+        """
+        if self._scheduler:
+            data_rate = await self._known_data_rate_async()
+            await sleep_ms(self._scheduler.delay(len(payload), data_rate))
+        command = self._sendb_command(payload)
+        for _ in range(2):
+            await self.wait_tx_done()
+            self._drain()
+            self._stats.command("AT+SENDB")
+            self._uart.write(command)
+            self._radio.queued()
+            event = await self._expect((ATParser.OK, ATParser.ERROR), 5000)
+            if event != ATParser.ERROR or not self._radio.busy():
+                break
+        ok = self._send_result(event, len(payload))
+        if ok and self._scheduler:
+            self._scheduler.record(len(payload), data_rate)
+        return ok
+
+    async def _next_event(self, deadline):
+        """
+        Await the next (event, text) from the parser, polling the UART, or
+        None once the deadline (ticks_ms) has passed (see
+        LoRaMINT._next_event). Bytes of a partial line stay in the parser.
+        """
+        parser = self._parser
+        while True:
+            event = parser.next()
+            if event is not None:
+                self._track(event[0], event[1])
+                return event
+            if ticks_diff(deadline, ticks_ms()) <= 0:
+                return None
+            if not self._receive():
+                await sleep_ms(self.POLL_MS)
+
+    async def _response(self, timeout_ms):
+        """
+        Collect lines until a final "OK"/"ERROR" line or the timeout elapses
+        (see LoRaMINT._read_response).
+        """
+        deadline = ticks_add(ticks_ms(), timeout_ms)
+        lines = []
+        while True:
+            event = await self._next_event(deadline)
+            if event is None:
+                return lines
+            lines.append(event[1])
+            if event[0] == ATParser.OK or event[0] == ATParser.ERROR:
+                return lines
+
+    async def _expect(self, events, timeout_ms):
+        """
+        Await an event of one of the given ATParser types. Returns the event
+        type, or None on timeout.
+        """
+        deadline = ticks_add(ticks_ms(), timeout_ms)
+        while True:
+            event = await self._next_event(deadline)
+            if event is None:
+                return None
+            if event[0] in events:
+                return event[0]
@@ -0,0 +1,132 @@
+"""
+ATParser - incremental, line-oriented parser for the LA66's UART output.
+
+Bytes are fed in as they arrive (from a polling loop or a UART RX interrupt);
+every completed line is classified exactly once against a precomputed token
+table and queued as an (event, text) pair:
+
+    OK           the final "OK" of a command
+    ERROR        any "AT_..." status reply, e.g. "AT_ERROR",
+                 "AT_BUSY_ERROR", "AT_NO_NETWORK_JOINED", or a line
+                 containing "error"
+    JOINED       OTAA join accepted ("JOINED")
+    JOIN_FAILED  OTAA join rejected or timed out ("Join failed")
+    TX_DONE      the radio finished transmitting an uplink ("txDone")
+    RX           the module received a downlink ("rxDone", "Rx data")
+    RX_TIMEOUT   a receive window closed without a downlink ("rxTimeout")
+    LINE         anything else (version strings, data rate, echoes ...)
+
+Waiting for a result is then a matter of looking at event types, instead of
+re-scanning all text received so far for every token. The line buffer and the
+event list are kept for the parser's lifetime, and the replies every uplink
+gets ("OK", "txDone", "rxTimeout") are queued as shared constant events, so
+they are not decoded into new strings.
+"""
+
+from ._compat import const
+
+# Event types, folded into the bytecode on MicroPython (public: ATParser.OK ...)
+_OK = const(0)
+_ERROR = const(1)
+_JOINED = const(2)
+_JOIN_FAILED = const(3)
+_TX_DONE = const(4)
+_RX = const(5)
+_LINE = const(6)
+_RX_TIMEOUT = const(7)
+
+
+class ATParser:
+    # event types
+    OK = _OK
+    ERROR = _ERROR
+    JOINED = _JOINED
+    JOIN_FAILED = _JOIN_FAILED
+    TX_DONE = _TX_DONE
+    RX = _RX
+    LINE = _LINE
+    RX_TIMEOUT = _RX_TIMEOUT
+
+    # (lowercase substring, event), checked in order after the "OK" and
+    # "AT_..." replies (so "AT_NO_NETWORK_JOINED" does not count as a join).
+    TOKENS = (
+        ("error", _ERROR),
+        ("join failed", _JOIN_FAILED),
+        ("join_fail", _JOIN_FAILED),
+        ("joined", _JOINED),
+        ("txdone", _TX_DONE),
+        ("rxdone", _RX),
+        ("rxtimeout", _RX_TIMEOUT),
+        ("rx data", _RX),
+    )
+
+    MAX_LINE = 256   # longer lines are cut (LA66 replies are far shorter)
+
+    # (exact line, event) queued as is, without decoding the line
+    CONSTANT_EVENTS = (
+        (b"OK", (_OK, "OK")),
+        (b"txDone", (_TX_DONE, "txDone")),
+        (b"rxTimeout", (_RX_TIMEOUT, "rxTimeout")),
+    )
+
+    def __init__(self):
+        self._line = bytearray()
+        self._events = []
+
+    def __len__(self):
+        """Number of parsed events not yet taken with next()."""
+        return len(self._events)
+
+    def feed(self, data, length=None):
+        """
+        Consume received bytes (the first `length` of `data`, or all of it).
+        A line ends at CR or LF; empty lines are ignored.
+        """
+        line = self._line
+        if length is None:
+            length = len(data)
+        for i in range(length):
+            byte = data[i]
+            if byte == 0x0A or byte == 0x0D:
+                if line:
+                    self._complete(line)
+                    line[:] = b""       # in place: the buffer is reused
+            elif len(line) < self.MAX_LINE:
+                line.append(byte)
+
+    def next(self):
+        """Return the oldest queued (event, text) pair, or None."""
+        if self._events:
+            return self._events.pop(0)
+        return None
+
+    def reset(self):
+        """Discard queued events and any partial line (keeping the buffers)."""
+        self._line[:] = b""
+        del self._events[:]
+
+    @classmethod
+    def classify(cls, text):
+        """Return the event type of one (stripped) response line."""
+        lowered = text.lower()
+        if lowered == "ok":
+            return _OK
+        if lowered.startswith("at_"):
+            return _ERROR
+        for token, event in cls.TOKENS:
+            if token in lowered:
+                return event
+        return _LINE
+
+    def _complete(self, line):
+        """Classify a finished line and queue its event."""
+        for raw, event in self.CONSTANT_EVENTS:
+            if line == raw:
+                self._events.append(event)
+                return
+        try:
+            text = line.decode().strip()
+        except Exception:
+            text = str(bytes(line)).strip()
+        if text:
+            self._events.append((self.classify(text), text))
@@ -0,0 +1,73 @@
+"""
+NetworkClock - Unix time on a node without a real-time clock, set from the
+LoRaWAN network.
+
+After a cold boot the ESP32 does not know the time. The LA66 can ask the
+network for it (DeviceTimeReq, a LoRaWAN MAC command sent along with the
+first uplink after the join); LoRaMINT.sync_time() reads the answer and sets
+the clock. From then on the clock counts on with ticks_ms():
+
+    clock.set(1700000000)
+    clock.time()                # Unix time now, in seconds
+    clock.time(sampled)         # Unix time at an earlier ticks_ms() value
+
+so a reading taken before the sync still gets its true time, as long as its
+ticks_ms() value is at most half the ticks period old (about 6 days on the
+ESP32). The anchor moves along with every call, so the ticks_ms() wrap-around
+does not matter to the clock itself.
+"""
+
+from ._compat import ticks_diff, ticks_ms
+
+
+class NetworkClock:
+    MIN_TIME = 1577836800    # 2020-01-01: anything earlier is not network time
+    MAX_TIME = 0xFFFFFFFF    # the protocol's timestamps are 4 bytes
+
+    def __init__(self):
+        self._ms = None          # Unix time in ms at _ticks; None = not set
+        self._ticks = ticks_ms()
+        self._age_ms = 0         # ms since the last set()
+
+    def set(self, unix_time):
+        """
+        Set the clock to `unix_time` (seconds), now. Returns False (leaving
+        the clock as it was) if the time is not plausible.
+        """
+        if not self.MIN_TIME <= unix_time <= self.MAX_TIME:
+            return False
+        self._ticks = ticks_ms()
+        self._ms = unix_time * 1000
+        self._age_ms = 0
+        return True
+
+    def synced(self):
+        """True once the clock has been set."""
+        return self._ms is not None
+
+    def time(self, ticks=None):
+        """
+        Return the Unix time in seconds at `ticks` (a ticks_ms() value, by
+        default now), or None if the clock has never been set.
+        """
+        now = self._advance()
+        if self._ms is None:
+            return None
+        if ticks is None:
+            return self._ms // 1000
+        return (self._ms + ticks_diff(ticks, now)) // 1000
+
+    def sync_due(self, interval_ms):
+        """True if the clock was never set, or last set `interval_ms` ago."""
+        self._advance()
+        return self._ms is None or self._age_ms >= interval_ms
+
+    def _advance(self):
+        """Move the anchor to now; return ticks_ms()."""
+        now = ticks_ms()
+        elapsed = ticks_diff(now, self._ticks)
+        self._ticks = now
+        if self._ms is not None:
+            self._ms += elapsed
+            self._age_ms += elapsed
+        return now
@@ -3,8 +3,15 @@ LoRaMINT - MicroPython library for sending data via LoRaWAN using the Dragino
 LA66 module on an ESP32, following the LoRaMINT message protocol (version 1).
 
 Mirrors the Arduino LoRaMINT library: log messages are encoded as a 0x05 marker
-byte followed by the ASCII message and transmitted with the LA66 AT command
-"AT+SENDB=<confirm>,<port>,<len>,<hexdata>".
+byte followed by the ASCII message (or compressed, see MintLog) and
+transmitted with the LA66 AT command
+"AT+SENDB=<confirm>,<port>,<len>,<hexdata>". Several measurement values can be
+packed into one uplink with sendValues() (see MintBatch), and readings that
+could not be sent can be kept on flash and delivered later (see MintQueue).
+A payload larger than the current data rate allows is compacted or sent in
+fragments (see MintFragment). AT round trips, joins and uplinks are counted
+for stats() (see DriverStats). Readings buffered in RAM are sent in timed
+batches, dated with the network time (see MintBuffer, NetworkClock).
 
 The ESP32 talks to the LA66 over a hardware UART:
 
@@ -17,10 +24,16 @@ Created for the LoRaMINT project.
 
 import time
 
-import ubinascii
-from machine import UART
+from ._compat import (DEEPSLEEP_RESET, RTC, UART, disable_irq, enable_irq,
+                      getrandbits, reset_cause, sleep_ms, ticks_add,
+                      ticks_diff, ticks_ms, ubinascii)
+from .atparser import ATParser
+from .clock import NetworkClock
+from .radio import RadioState
+from .stats import DriverStats
 
-from .mintvalue import MintValue
+# MintBatch, TimedBatch, MintFragment and MintLog are imported in the methods
+# that use them: a node that sends single values never loads (or compiles) them.
 
 
 class LoRaMINT:
@@ -30,11 +43,89 @@ class LoRaMINT:
     CONFIRM = 0            # 0 = unconfirmed uplink
     MAX_LOG_CHARS = 140    # maximum log message length (matches the Arduino lib)
 
-    def __init__(self, uart_id=2, tx=17, rx=16, baudrate=9600):
-        """Open the UART to the LA66 and reset the module."""
-        self._uart = UART(uart_id, baudrate=baudrate, bits=8, parity=None,
-                          stop=1, tx=tx, rx=rx, timeout=1000)
-        self._reset()
+    # EU868 maximum application payload (bytes) per data rate DR0..DR7
+    MAX_PAYLOAD = (51, 51, 51, 115, 222, 222, 222, 222)
+    DEFAULT_MAX_PAYLOAD = 51   # used when the data rate cannot be queried
+    MIN_PAYLOAD = 51           # fits at every data rate
+    MAX_METADATA_IDS = 256     # metadata ids are a single byte
+
+    SENDB_PREFIX = b"AT+SENDB="
+    HEX_DIGITS = b"0123456789ABCDEF"
+    RX_CHUNK = 64              # bytes read per readinto() from the UART
+    POLL_MS = 20               # UART polling interval while awaiting a reply
+    IRQ_POLL_MS = 1            # event check interval with rx_irq=True
+    RTC_JOINED = b"LMJ\x01"     # RTC memory marker: joined before deep sleep
+    TX_WAIT_MS = 10000         # longest wait for the radio before an uplink
+    SYNC_INTERVAL_MS = 86400000   # time_sync: ask the LA66 again after a day
+
+    def __init__(self, uart_id=2, tx=17, rx=16, baudrate=9600, compact=False,
+                 metadata_ids=False, rx_irq=False, scheduler=None,
+                 warm_start=False, uart=None, config=None, stats_interval=None,
+                 time_sync=False, compress_logs=False):
+        """
+        Open the UART to the LA66 and reset the module.
+
+        With `compact`, sendValue() sends values in the compact wire mode
+        (no zero padding to 99 bytes, see MintValue.to_bytes).
+
+        With `metadata_ids`, the unit/measurand/location/sensor of each value
+        is announced once under a 1-byte id, and later values carry only that
+        id plus the value bytes. The announced ids are cached in RAM, so after
+        a reboot they are simply announced again.
+
+        With `rx_irq`, received bytes are fed to the response parser from a
+        UART RX interrupt instead of by polling every POLL_MS, so a reply is
+        seen within about a millisecond (needs UART.irq, MicroPython 1.24+).
+
+        With a `scheduler` (see AirtimeScheduler), every uplink first waits
+        until the duty cycle and the daily airtime budget allow it.
+
+        With `warm_start`, waking from deep sleep skips the ATZ reset (and its
+        2 s wait): the LA66 stays powered and keeps its session, so
+        ensure_joined() can go straight to sending. The join state is kept in
+        RTC memory, which warm_start then uses for itself.
+
+        With a `config` (see RemoteConfig), configuration downlinks are
+        applied and persisted, a data rate set that way is restored after
+        each reset, and changed settings are reported in the next uplink.
+
+        With a `stats_interval` (seconds), a summary of stats() is sent as a
+        log entry in front of the first uplink after each interval.
+
+        With `time_sync`, the LA66 is told to ask the network for the time
+        (AT+SYNCMOD=1, DeviceTimeReq with the first uplink after the join),
+        and sendBuffered() reads it into the clock (see sync_time) until it
+        has it, and again once a day.
+
+        With `compress_logs`, log messages - those of sendLog() and the
+        config and stats reports - are sent compressed with the dictionary
+        shared with the backend (see MintLog), typically in half the bytes.
+
+        `uart` replaces the UART the library would open - any object with
+        the machine.UART methods used here (write, any, readinto, irq), e.g.
+        the LA66 emulator in dev_scripts when running under CPython.
+        """
+        self._configure(compact, metadata_ids, scheduler, warm_start, config,
+                        stats_interval, time_sync, compress_logs)
+        if uart is None:
+            if UART is None:
+                raise ValueError("no machine.UART on this platform - pass uart=")
+            uart = UART(uart_id, baudrate=baudrate, bits=8, parity=None,
+                        stop=1, tx=tx, rx=rx, timeout=0)
+        self._uart = uart
+        self._rx_irq = rx_irq
+        if rx_irq:
+            self._uart.irq(handler=self._on_rx, trigger=uart.IRQ_RXIDLE)
+        if self._warm:
+            self._drain()
+        else:
+            self._reset()
+            if config is not None and config.data_rate is not None:
+                self._set_data_rate(config.data_rate)
+            if time_sync:
+                self._drain()
+                self._send_at("AT+SYNCMOD=1")
+                self._read_response()
 
     # ------------------------------------------------------------------ #
     # Public API
@@ -46,13 +137,7 @@ class LoRaMINT:
         (AT+VER=?). Prints a status message and returns True if the module
         responded, False otherwise.
         """
-        version = self.get_version(timeout_ms)
-        if version:
-            print("UART OK - LA66 version:", version)
-            return True
-        print("UART connection failed - no response to AT+VER=? "
-              "(check TX/RX wiring, common GND, UART pins and baud rate)")
-        return False
+        return self._report_connection(self.get_version(timeout_ms))
 
     def get_version(self, timeout_ms=3000):
         """
@@ -63,12 +148,7 @@ class LoRaMINT:
         """
         self._drain()
         self._send_at("AT+VER=?")
-        for line in self._read_response(timeout_ms):
-            upper = line.upper()
-            if upper == "OK" or upper.startswith("AT+VER"):
-                continue  # skip the command echo and the trailing OK
-            return line
-        return None
+        return self._parse_version(self._read_response(timeout_ms))
 
     def join(self, timeout_ms=60000):
         """
@@ -79,9 +159,127 @@ class LoRaMINT:
         are already configured on the LA66.
         """
         self._drain()
+        start = ticks_ms()
         self._send_at("AT+JOIN")
-        matched = self._wait_for(("joined", "join failed", "join_fail"), timeout_ms)
-        return matched == "joined"
+        event = self._wait_for((ATParser.JOINED, ATParser.JOIN_FAILED,
+                                ATParser.ERROR), timeout_ms)
+        return self._joined(event == ATParser.JOINED, start)
+
+    def is_joined(self, timeout_ms=3000):
+        """Ask the LA66 whether it has joined the network (AT+NJS=?)."""
+        self._drain()
+        self._send_at("AT+NJS=?")
+        return self._parse_number(self._read_response(timeout_ms)) == 1
+
+    def ensure_joined(self, timeout_ms=60000):
+        """
+        Make sure the node is joined, joining only if necessary.
+
+        After a warm start from deep sleep, a node that had joined before
+        going to sleep only confirms its session with AT+NJS=? (a few
+        milliseconds) instead of a new OTAA join (seconds, and airtime).
+        Returns True once joined.
+        """
+        if self._warm and self._rtc_joined() and self.is_joined():
+            return True
+        return self.join(timeout_ms)
+
+    def get_data_rate(self, timeout_ms=3000):
+        """
+        Query the current LoRaWAN data rate (AT+DR=?).
+
+        Returns the data rate index (0 = SF12 ... 5 = SF7 on EU868), or None
+        if the module did not answer with a number.
+        """
+        self._drain()
+        self._send_at("AT+DR=?")
+        return self._note_data_rate(self._parse_number(self._read_response(timeout_ms)))
+
+    def max_payload(self):
+        """
+        Return the maximum application payload in bytes allowed at the
+        current data rate, or DEFAULT_MAX_PAYLOAD if it cannot be determined.
+        """
+        return self._payload_limit(self.get_data_rate())
+
+    def sync_time(self, timeout_ms=3000):
+        """
+        Set the clock from the LA66's network time (AT+TIMESTAMP=?). Returns
+        True if the LA66 knew the time - only once it got the network's
+        answer to a DeviceTimeReq (see time_sync).
+        """
+        self._drain()
+        self._send_at("AT+TIMESTAMP=?")
+        return self._set_clock(self._read_response(timeout_ms))
+
+    def network_time(self):
+        """Return the Unix time in seconds, or None before the first sync."""
+        return self._clock.time()
+
+    def stats(self):
+        """
+        Return the driver's counters and timings since it was created: AT
+        round trips per command, joins, uplinks sent and failed by cause,
+        bytes, estimated airtime and heap high-water marks (see DriverStats).
+        """
+        return self._stats.as_dict()
+
+    def stats_summary(self):
+        """The key figures of stats() as one log message, e.g. for sendLog()."""
+        return self._stats.summary()
+
+    def add_stats_hook(self, hook):
+        """
+        Call hook(event, detail) on every AT round trip, join and uplink
+        (see DriverStats), e.g. to log or plot them on the node.
+        """
+        self._stats.add_hook(hook)
+
+    def radio_state(self):
+        """
+        Return what the LA66's radio is doing, as tracked from its output:
+        "idle", "queued", "transmitting", "rx1" or "rx2" (see RadioState).
+        """
+        return RadioState.NAMES[self._radio.state()]
+
+    def wait_tx_done(self, timeout_ms=TX_WAIT_MS):
+        """
+        Wait until the last uplink is through: transmitted and both Class A
+        receive windows closed, so the LA66 accepts the next one. Returns
+        True once the radio is idle, False if the timeout elapsed first.
+
+        The send methods call this themselves before each uplink; call it
+        directly to find out when a send has really finished, e.g. before
+        going to deep sleep. A downlink received in the receive windows is
+        fetched here (see check_downlink).
+        """
+        radio = self._radio
+        deadline = ticks_add(ticks_ms(), timeout_ms)
+        self._drain()
+        while radio.busy():
+            now = ticks_ms()
+            left = ticks_diff(deadline, now)
+            if left <= 0:
+                return False
+            self._next_event(ticks_add(now, min(left, radio.remaining_ms())))
+        self._drain()
+        if self._rx_pending:
+            self._fetch_downlink()
+        return True
+
+    def check_downlink(self):
+        """
+        Return the latest downlink received since the last call as (port,
+        payload bytes), or None.
+
+        Downlinks arrive in the receive windows after an uplink. Once the
+        windows have closed (see wait_tx_done, which every send calls first)
+        the driver reads them from the LA66 with AT+RECVB=?; with a
+        RemoteConfig, one on its port has been applied by then.
+        """
+        self.wait_tx_done()
+        downlink, self._received = self._received, None
+        return downlink
 
     def sendLog(self, message):
         """
@@ -90,50 +288,475 @@ class LoRaMINT:
         The payload is the 0x05 marker byte followed by the ASCII bytes of
         `message`, hex-encoded and sent via AT+SENDB. Returns True if the LA66
         acknowledged the command with "OK".
+
+        Like every send method, it first waits for the previous uplink to
+        finish (see wait_tx_done) but returns as soon as the new one is
+        accepted, while it is still on air. A message too long for the
+        current data rate is sent in fragments.
         """
-        payload = self._encode_log(message)
-        hex_payload = ubinascii.hexlify(payload).decode().upper()
-        command = "AT+SENDB={},{},{},{}".format(
-            self.CONFIRM, self.FPORT, len(payload), hex_payload
-        )
-        self._drain()
-        self._send_at(command)
-        return self._wait_for(("ok",), 5000) == "ok"
+        return self._send_payload(self._encode_log(message))
 
     def sendValue(self, value):
         """
         Send a measurement value ("Messwert") to the LoRaMINT backend.
 
-        `value` is a MintValue instance. Its 99-byte payload is hex-encoded and
-        sent via AT+SENDB. Returns True if the LA66 acknowledged with "OK".
+        `value` is a MintValue instance. Its 99-byte payload (or the compact
+        payload, if enabled) is hex-encoded and sent via AT+SENDB. Returns True
+        if the LA66 acknowledged with "OK".
+
+        With metadata ids enabled, the value refers to its metadata by id; the
+        first time a metadata tuple is used its registration is sent in the
+        same uplink, in front of the value.
+
+        If the frame exceeds the payload limit of the current data rate (51
+        bytes at DR0-DR2), it is sent compact instead, and if that is still
+        too large, in fragments.
         """
-        command = "AT+SENDB={},{},{},{}".format(
-            self.CONFIRM, self.FPORT, MintValue.MAX_MESSAGE_SIZE, value.to_byte_string()
-        )
-        self._drain()
-        self._send_at(command)
-        return self._wait_for(("ok",), 5000) == "ok"
+        payload, registered = self._encode_value(value)
+        max_size = self._max_size(len(payload))
+        if len(payload) > max_size:
+            payload = self._compact_value(value, payload)
+        ok = self._send_payload(payload, max_size)
+        if not ok:
+            self._forget_metadata(registered)
+        return ok
+
+    def sendValues(self, values):
+        """
+        Send several measurement values in as few uplinks as possible.
+
+        The values are packed into batch frames (see MintBatch) filled up to
+        the payload limit of the current data rate; only when they do not fit
+        into one frame is a further frame sent, as soon as the LA66 is done
+        with the previous one. Returns True if the LA66 acknowledged every
+        frame with "OK".
+        """
+        if self._config is not None:
+            self.wait_tx_done()     # pack with the current config
+        ok = True
+        max_size = self._max_size()
+        for batch in self._pack_values(values, max_size):
+            if not self._send_payload(batch.to_bytes(), max_size):
+                self._forget_metadata(batch.registered)
+                ok = False
+        return ok
+
+    def sendQueued(self, queue):
+        """
+        Deliver the readings waiting in a MintQueue, oldest first, packed into
+        batch frames up to the payload limit of the current data rate.
+
+        A reading is removed from the queue only once the LA66 acknowledged
+        its frame; the first failed frame ends the run and leaves the rest
+        queued for the next attempt. A record too large for the data rate on
+        its own travels alone, in fragments. Returns the number of readings
+        sent.
+        """
+        if self._config is not None:
+            self.wait_tx_done()
+        sent = 0
+        max_size = self._max_size()
+        while len(queue):
+            batch, slots = self._fill_batch(queue, max_size)
+            if not len(batch):
+                # peek() found only unreadable slots: drop them. (A batch
+                # always takes its first record, however large, so an
+                # oversized record is sent fragmented, never left here.)
+                queue.pop(slots)
+                continue
+            if not self._send_payload(batch.to_bytes(), max_size):
+                break
+            queue.pop(slots)
+            sent += len(batch)
+        return sent
+
+    def sendBuffered(self, buffer):
+        """
+        Deliver the readings of a MintBuffer, oldest first, in timed batch
+        frames (see TimedBatch) up to the payload limit of the current data
+        rate: one base time per frame and a 1-3 byte offset per reading, or,
+        before the clock is synced, each reading's age.
+
+        A reading is removed from the buffer once its frame got "OK"; the
+        first failed frame ends the run. Returns the number of readings sent.
+        """
+        if self._config is not None:
+            self.wait_tx_done()
+        if self._sync_due():
+            self.sync_time()
+        sent = 0
+        max_size = self._max_size()
+        while len(buffer):
+            batch = self._timed_batch(buffer, max_size)
+            if not self._send_payload(batch.to_bytes(), max_size):
+                self._forget_metadata(batch.registered)
+                break
+            buffer.pop(len(batch))
+            sent += len(batch)
+        return sent
 
     # ------------------------------------------------------------------ #
     # Payload encoding
     # ------------------------------------------------------------------ #
 
+    def _configure(self, compact, metadata_ids, scheduler, warm_start, config,
+                   stats_interval, time_sync, compress_logs):
+        """
+        Set up the encoding options and transmit buffers shared by LoRaMINT
+        and AsyncLoRaMINT.
+        """
+        self._config = config
+        self._clock = NetworkClock()
+        self._time_sync = time_sync
+        self._stats = DriverStats()
+        self._stats_interval = (None if stats_interval is None
+                                else int(stats_interval * 1000))
+        self._data_rate = None     # last known data rate, None = ask AT+DR=?
+        self._message = getrandbits(8)   # fragment message number
+        self._rx_pending = False   # the LA66 reported a downlink, not fetched
+        self._received = None      # last downlink, until check_downlink()
+        self._compact = compact
+        self._compress_logs = compress_logs
+        self._metadata_ids = {} if metadata_ids else None   # metadata -> id
+        self._next_metadata_id = 0
+        self._scheduler = scheduler
+        self._warm_start = warm_start
+        # a warm start only applies when waking from deep sleep
+        self._warm = warm_start and reset_cause() == DEEPSLEEP_RESET
+
+        # Allocated once, so building and writing a command allocates nothing
+        # per payload byte: the AT+SENDB command is hex-encoded into _tx (prefix,
+        # three numbers, two hex digits per payload byte, CRLF) and _drain()
+        # reads into _rx.
+        self._max_sendb = max(self.MAX_PAYLOAD)
+        self._tx = bytearray(len(self.SENDB_PREFIX) + 12
+                             + 2 * self._max_sendb + 2)
+        self._tx[:len(self.SENDB_PREFIX)] = self.SENDB_PREFIX
+        self._tx_view = memoryview(self._tx)
+        self._tx_views = {}    # command length -> view of _tx to write
+        self._rx = bytearray(self.RX_CHUNK)
+        self._command_names = {}   # AT command -> its stats name (up to "=")
+        self._parser = ATParser()
+        self._radio = RadioState()
+
+    def _encode_value(self, value):
+        """
+        Build the payload for one value according to the encoding options.
+        Returns (payload, metadata ids announced by it).
+        """
+        if self._metadata_ids is None:
+            return value.to_bytes(self._compact), ()
+        metadata_id, registration = self._metadata_ref(value)
+        payload = registration + value.to_bytes(metadata_id=metadata_id)
+        return payload, ((metadata_id,) if registration else ())
+
+    def _pack_values(self, values, max_size):
+        """Pack values into batches of at most max_size bytes (see MintBatch)."""
+        from .mintbatch import MintBatch
+        metadata_ref = self._metadata_ref if self._metadata_ids is not None else None
+        return MintBatch.pack(values, max_size, metadata_ref, self._max_count())
+
+    def _fill_batch(self, queue, max_size):
+        """
+        Pack the oldest queued records into one batch of at most max_size
+        bytes. Returns (batch, slots): `slots` is the number of queue slots it
+        used up - its records and the unreadable slots among and after them.
+        """
+        from .mintbatch import MintBatch
+        max_count = self._max_count()
+        batch = MintBatch(max_size, max_count)
+        slots = 0
+        for used, record in queue.peek(max_count):
+            if not batch.add_record(record):
+                return batch, slots
+            slots = used
+        # everything peek() looked at is packed or unreadable
+        return batch, min(len(queue), max_count)
+
+    def _timed_batch(self, buffer, max_size):
+        """
+        Pack the oldest buffered readings into one TimedBatch of at most
+        max_size bytes, based on the clock's time of the oldest - or, while
+        the clock is not synced, on each reading's age now.
+        """
+        from .timedbatch import TimedBatch
+        max_count = self._max_count()
+        clock = self._clock
+        now = ticks_ms()
+        batch = None
+        for ticks, value in buffer.peek(max_count):
+            if batch is None:
+                batch = TimedBatch(max_size, max_count, clock.time(ticks))
+            if batch.base is None:
+                offset = ticks_diff(now, ticks) // 1000
+            else:
+                offset = clock.time(ticks) - batch.base
+            metadata_id, registration = None, b""
+            if self._metadata_ids is not None:
+                metadata_id, registration = self._metadata_ref(value)
+            if not batch.add(value, metadata_id, registration, offset):
+                if registration:
+                    self._forget_metadata((metadata_id,))
+                break
+        return batch
+
+    def _compact_value(self, value, payload):
+        """A value frame without its zero padding (others are already compact)."""
+        if self._compact or self._metadata_ids is not None:
+            return payload
+        return value.to_bytes(compact=True)
+
+    def _fragments(self, payload, max_size):
+        """
+        Return the frames that carry `payload`: the payload itself if it
+        fits into `max_size` bytes, otherwise its MintFragments under the
+        next message number.
+        """
+        if len(payload) <= max_size:
+            return (payload,)
+        from .mintfragment import MintFragment
+        self._message = (self._message + 1) & 0xFF
+        return MintFragment.split(payload, max_size, self._message)
+
+    def _reports(self):
+        """
+        Return the log payloads due in front of the next uplink - a changed
+        RemoteConfig, a stats summary - each with the method marking it sent.
+        """
+        reports = []
+        config = self._config
+        if config is not None and config.unreported:
+            reports.append((self._encode_log(config.report()), config.reported))
+        interval = self._stats_interval
+        if interval is not None and self._stats.report_due(interval):
+            stats = self._stats
+            reports.append((self._encode_log(stats.summary()), stats.reported))
+        return reports
+
+    def _max_count(self):
+        """Most records per batch frame: the RemoteConfig batch size, if set."""
+        if self._config is not None and self._config.batch:
+            return self._config.batch
+        from .mintbatch import MintBatch
+        return MintBatch.MAX_COUNT
+
     def _encode_log(self, message):
-        """Build the raw payload bytes for a log message: [0x05] + ASCII."""
+        """
+        Build the raw payload bytes for a log message: [0x05] + ASCII, or
+        with compress_logs [0x0B] + MintLog codes.
+        """
         if len(message) > self.MAX_LOG_CHARS:
             raise ValueError(
                 "log message exceeds {} characters".format(self.MAX_LOG_CHARS)
             )
+        if self._compress_logs:
+            from .mintlog import MintLog
+            return MintLog.encode(message)
         # "replace" keeps non-ASCII input from raising (it becomes "?").
         return bytes([self.LOG_MARKER]) + message.encode("ascii", "replace")
 
+    def _metadata_ref(self, value):
+        """
+        Return (metadata_id, registration) for a value: the cached id and no
+        registration if its metadata was announced before, otherwise a newly
+        assigned id and the registration bytes announcing it.
+        """
+        key = value.metadata()
+        metadata_id = self._metadata_ids.get(key)
+        if metadata_id is not None:
+            return metadata_id, b""
+
+        if self._next_metadata_id >= self.MAX_METADATA_IDS:
+            # All ids used: start over. Re-announced ids overwrite the old
+            # mapping on the server.
+            self._metadata_ids.clear()
+            self._next_metadata_id = 0
+        metadata_id = self._next_metadata_id
+        self._next_metadata_id += 1
+        self._metadata_ids[key] = metadata_id
+        return metadata_id, value.to_registration(metadata_id)
+
+    def _forget_metadata(self, metadata_ids):
+        """Drop ids whose registration was not delivered, so they are announced again."""
+        if not metadata_ids:
+            return
+        for key in [k for k, v in self._metadata_ids.items() if v in metadata_ids]:
+            del self._metadata_ids[key]
+
+    # ------------------------------------------------------------------ #
+    # Response parsing
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _report_connection(version):
+        """Print the outcome of a connection check; True if the LA66 answered."""
+        if version:
+            print("UART OK - LA66 version:", version)
+            return True
+        print("UART connection failed - no response to AT+VER=? "
+              "(check TX/RX wiring, common GND, UART pins and baud rate)")
+        return False
+
+    @staticmethod
+    def _parse_version(lines):
+        """Return the version line of an AT+VER=? response, or None."""
+        for line in lines:
+            upper = line.upper()
+            if upper == "OK" or upper.startswith("AT+VER"):
+                continue  # skip the command echo and the trailing OK
+            return line
+        return None
+
+    @staticmethod
+    def _parse_number(lines):
+        """
+        Return the number answered to a query such as AT+DR=? or AT+NJS=?,
+        or None.
+        """
+        for line in lines:
+            upper = line.upper()
+            if upper == "OK" or upper.startswith("AT+"):
+                continue  # skip the command echo and the trailing OK
+            digits = "".join(c for c in line if c.isdigit())
+            if digits:
+                return int(digits)
+        return None
+
+    @staticmethod
+    def _parse_timestamp(lines):
+        """
+        Return the Unix time in an AT+TIMESTAMP=? response - the first
+        10-digit number, whether the firmware prints it alone or next to a
+        date - or None.
+        """
+        for line in lines:
+            if line.upper().startswith("AT+"):
+                continue  # skip the command echo
+            digits = ""
+            for c in line + " ":
+                if c.isdigit():
+                    digits += c
+                elif digits:
+                    if len(digits) == 10:
+                        return int(digits)
+                    digits = ""
+        return None
+
+    @staticmethod
+    def _parse_downlink(lines):
+        """
+        Return (port, payload bytes) from an AT+RECVB=? response
+        ("<port>:<hex>"), or None if it holds no downlink.
+        """
+        for line in lines:
+            port, sep, data = line.partition(":")
+            if not sep or not port.strip().isdigit():
+                continue
+            data = data.replace(" ", "").strip()
+            if not data:
+                return None
+            try:
+                return int(port), ubinascii.unhexlify(data)
+            except ValueError:
+                return None
+        return None
+
+    def _apply_config(self, port, payload):
+        """
+        Apply a configuration downlink to the RemoteConfig. Returns True if
+        the data rate has to be set on the LA66.
+        """
+        config = self._config
+        if config is None or port != config.FPORT:
+            return False
+        data_rate = config.data_rate
+        return config.apply(payload) and config.data_rate != data_rate
+
+    def _set_clock(self, lines):
+        """Set the clock from an AT+TIMESTAMP=? response; True if it held a time."""
+        unix_time = self._parse_timestamp(lines)
+        return unix_time is not None and self._clock.set(unix_time)
+
+    def _sync_due(self):
+        """True if time_sync is on and the clock needs the network time."""
+        return self._time_sync and self._clock.sync_due(self.SYNC_INTERVAL_MS)
+
+    def _note_data_rate(self, data_rate):
+        """Remember a queried data rate (payload limit, airtime); return it."""
+        if data_rate is not None:
+            self._data_rate = data_rate
+        return data_rate
+
+    def _send_result(self, event, size):
+        """
+        Count the outcome of an AT+SENDB (the final reply event) in the
+        stats; return True if it was acknowledged.
+        """
+        if event == ATParser.OK:
+            self._stats.sent(size, self._data_rate)
+            return True
+        if event is None:
+            self._stats.failed("timeout")
+        elif self._radio.busy():
+            self._stats.failed("busy")
+        else:
+            self._stats.failed("error")
+            self._data_rate = None     # query it again before the next send
+        return False
+
+    def _max_size(self, length=None):
+        """
+        Payload limit for a payload of `length` bytes (None: any payload) at
+        the last known data rate. Payloads that fit at every data rate never
+        need it; otherwise see _known_data_rate.
+        """
+        if length is not None and length <= self.MIN_PAYLOAD:
+            return self.MIN_PAYLOAD
+        return self._payload_limit(self._known_data_rate())
+
+    def _known_data_rate(self):
+        """
+        The last known data rate. It is queried (AT+DR=?) only while unknown:
+        at start, after a join, after going back to ADR and after a send the
+        LA66 rejected (e.g. for its length, once ADR lowered the data rate).
+        """
+        if self._data_rate is None:
+            return self.get_data_rate()
+        return self._data_rate
+
+    def _payload_limit(self, data_rate):
+        """Maximum application payload for a data rate index (None = unknown)."""
+        if data_rate is None or data_rate >= len(self.MAX_PAYLOAD):
+            return self.DEFAULT_MAX_PAYLOAD
+        return self.MAX_PAYLOAD[data_rate]
+
+    # ------------------------------------------------------------------ #
+    # Join state in RTC memory
+    # ------------------------------------------------------------------ #
+
+    def _rtc_joined(self):
+        """True if RTC memory says the node was joined before deep sleep."""
+        return RTC().memory()[:len(self.RTC_JOINED)] == self.RTC_JOINED
+
+    def _remember_join(self, joined):
+        """Record a join result in RTC memory (warm_start only); return it."""
+        if self._warm_start:
+            RTC().memory(self.RTC_JOINED if joined else b"")
+        return joined
+
+    def _joined(self, joined, start):
+        """Count a join that began at `start` (ticks_ms) and remember it."""
+        self._stats.join(joined, ticks_diff(ticks_ms(), start))
+        self._data_rate = None     # ADR may start the session at another one
+        return self._remember_join(joined)
+
     # ------------------------------------------------------------------ #
     # LA66 / UART helpers
     # ------------------------------------------------------------------ #
 
     def _reset(self):
         """Reset the LA66 module (ATZ) and wait for it to come back up."""
-        self._send_at("ATZ")
+        self._uart.write(b"ATZ\r\n")     # not timed: no "OK" follows
         time.sleep(2)
         self._drain()
 
@@ -143,51 +766,229 @@ class LoRaMINT:
         Returns the non-empty lines received (including the terminating one).
         An empty list means the module did not respond at all.
         """
-        deadline = time.ticks_add(time.ticks_ms(), timeout_ms)
+        deadline = ticks_add(ticks_ms(), timeout_ms)
         lines = []
-        while time.ticks_diff(deadline, time.ticks_ms()) > 0:
-            line = self._uart.readline()
-            if line:
-                try:
-                    text = line.decode().strip()
-                except Exception:
-                    text = str(line).strip()
-                if text:
-                    lines.append(text)
-                    upper = text.upper()
-                    if upper == "OK" or "ERROR" in upper:
-                        break
-            else:
-                time.sleep_ms(20)
-        return lines
+        while True:
+            event = self._next_event(deadline)
+            if event is None:
+                return lines
+            lines.append(event[1])
+            if event[0] == ATParser.OK or event[0] == ATParser.ERROR:
+                return lines
+
+    def _send_payload(self, payload, max_size=None):
+        """
+        Send raw payload bytes (see _transmit), in fragments if they exceed
+        `max_size` (by default the limit of the current data rate). Returns
+        True once every frame was acknowledged; the first failed fragment
+        ends the message.
+
+        Due reports go out first, as log entries: a RemoteConfig changed
+        since it was last reported, and the stats summary (stats_interval).
+        """
+        if self._config is not None:
+            self.wait_tx_done()     # a downlink may change the config
+        for report, reported in self._reports():
+            if self._send_frames(report):
+                reported()
+        return self._send_frames(payload, max_size)
+
+    def _send_frames(self, payload, max_size=None):
+        """Transmit a payload, or its fragments; True if all got "OK"."""
+        if max_size is None:
+            max_size = self._max_size(len(payload))
+        for frame in self._fragments(payload, max_size):
+            if not self._transmit(frame):
+                return False
+        return True
+
+    def _transmit(self, payload):
+        """
+        Send raw payload bytes via AT+SENDB. Returns True if the LA66
+        acknowledged the command with "OK".
+
+        With a scheduler, first sleeps until the uplink is allowed. Then waits
+        for the radio to be idle; if the LA66 still reports it busy (an
+        uplink the driver did not see, e.g. from before a warm start), waits
+        for that one too and tries once more.
+        """
+        if self._scheduler:
+            data_rate = self._known_data_rate()
+            sleep_ms(self._scheduler.delay(len(payload), data_rate))
+        command = self._sendb_command(payload)
+        for _ in range(2):
+            self.wait_tx_done()
+            self._stats.command("AT+SENDB")
+            self._uart.write(command)
+            self._radio.queued()
+            event = self._wait_for((ATParser.OK, ATParser.ERROR), 5000)
+            if event != ATParser.ERROR or not self._radio.busy():
+                break
+        ok = self._send_result(event, len(payload))
+        if ok and self._scheduler:
+            self._scheduler.record(len(payload), data_rate)
+        return ok
+
+    def _sendb_command(self, payload):
+        """
+        Encode "AT+SENDB=<confirm>,<port>,<len>,<HEX>\\r\\n" for the payload
+        (any bytes-like object) into the preallocated command buffer and
+        return a memoryview of the command, ready for a single write.
+
+        Nothing is allocated per payload byte: the digits are written in
+        place, and the view for each command length is created once and
+        reused. The view is only valid until the next call.
+        """
+        length = len(payload)
+        if length > self._max_sendb:
+            raise ValueError("payload exceeds {} bytes".format(self._max_sendb))
+
+        tx = self._tx
+        digits = self.HEX_DIGITS
+        pos = self._put_number(len(self.SENDB_PREFIX), self.CONFIRM)
+        tx[pos] = 0x2C   # ","
+        pos = self._put_number(pos + 1, self.FPORT)
+        tx[pos] = 0x2C
+        pos = self._put_number(pos + 1, length)
+        tx[pos] = 0x2C
+        pos += 1
+        for i in range(length):
+            byte = payload[i]
+            tx[pos] = digits[byte >> 4]
+            tx[pos + 1] = digits[byte & 0x0F]
+            pos += 2
+        tx[pos] = 0x0D   # CR
+        tx[pos + 1] = 0x0A   # LF
+        pos += 2
+
+        view = self._tx_views.get(pos)
+        if view is None:
+            view = self._tx_views[pos] = self._tx_view[:pos]
+        return view
+
+    def _put_number(self, pos, number):
+        """Write a number (0..999) as decimal ASCII into _tx; return the end."""
+        tx = self._tx
+        if number >= 100:
+            tx[pos] = 0x30 + number // 100
+            pos += 1
+        if number >= 10:
+            tx[pos] = 0x30 + number // 10 % 10
+            pos += 1
+        tx[pos] = 0x30 + number % 10
+        return pos + 1
+
+    def _fetch_downlink(self, timeout_ms=3000):
+        """Read the downlink the LA66 reported and apply it to the RemoteConfig."""
+        self._rx_pending = False
+        self._drain()
+        self._send_at("AT+RECVB=?")
+        downlink = self._parse_downlink(self._read_response(timeout_ms))
+        if downlink is not None:
+            self._received = downlink
+            if self._apply_config(*downlink):
+                self._set_data_rate(self._config.data_rate)
+
+    def _set_data_rate(self, data_rate):
+        """Fix the data rate (AT+ADR=0, AT+DR=n), or go back to ADR (None)."""
+        self._drain()
+        self._data_rate = data_rate
+        if data_rate is None:
+            self._send_at("AT+ADR=1")
+            self._read_response()
+            return
+        self._send_at("AT+ADR=0")
+        self._read_response()
+        self._send_at("AT+DR={}".format(data_rate))
+        self._read_response()
 
     def _send_at(self, command):
         """Write an AT command to the LA66, terminated with CRLF."""
-        self._uart.write(command + "\r\n")
+        self._stats.command(self._command_name(command))
+        self._uart.write(command)
+        self._uart.write(b"\r\n")
+
+    def _command_name(self, command):
+        """The stats name of an AT command ("AT+DR=?" -> "AT+DR"), cached."""
+        name = self._command_names.get(command)
+        if name is None:
+            name = self._command_names[command] = command.partition("=")[0]
+        return name
 
     def _drain(self):
-        """Discard any bytes currently buffered on the UART."""
+        """
+        Discard any output the LA66 has sent so far, before a new command -
+        after letting the radio state see it (e.g. a late "txDone").
+
+        With rx_irq only the interrupt handler reads the UART; it is held off
+        while the parser is emptied, so it cannot feed a line in between.
+        """
+        state = disable_irq() if self._rx_irq else self._receive()
+        try:
+            parser = self._parser
+            while True:
+                event = parser.next()
+                if event is None:
+                    break
+                self._track(event[0], event[1])
+            parser.reset()
+        finally:
+            if self._rx_irq:
+                enable_irq(state)
+
+    def _receive(self):
+        """Feed all bytes waiting on the UART to the parser; return the count."""
+        count = 0
         while self._uart.any():
-            self._uart.read()
-
-    def _wait_for(self, tokens, timeout_ms):
-        """
-        Read UART lines until one contains a token (case-insensitive) or the
-        timeout elapses. Returns the matched token, or None on timeout.
-        """
-        deadline = time.ticks_add(time.ticks_ms(), timeout_ms)
-        buffer = ""
-        while time.ticks_diff(deadline, time.ticks_ms()) > 0:
-            line = self._uart.readline()
-            if line:
-                try:
-                    buffer += line.decode()
-                except Exception:
-                    buffer += str(line)
-                lowered = buffer.lower()
-                for token in tokens:
-                    if token in lowered:
-                        return token
-            else:
-                time.sleep_ms(20)
-        return None
+            n = self._uart.readinto(self._rx)
+            if not n:
+                break
+            self._parser.feed(self._rx, n)
+            count += n
+        return count
+
+    def _on_rx(self, uart):
+        """UART RX interrupt handler (rx_irq=True)."""
+        self._receive()
+
+    def _next_event(self, deadline):
+        """
+        Return the next (event, text) from the parser, reading the UART as
+        needed, or None once the deadline (ticks_ms) has passed.
+        """
+        parser = self._parser
+        while True:
+            event = parser.next()
+            if event is not None:
+                self._track(event[0], event[1])
+                return event
+            if ticks_diff(deadline, ticks_ms()) <= 0:
+                return None
+            if self._rx_irq:
+                sleep_ms(self.IRQ_POLL_MS)
+            elif not self._receive():
+                sleep_ms(self.POLL_MS)
+
+    def _track(self, event, text):
+        """
+        Pass an event on to the radio state and the stats; note a received
+        downlink.
+        """
+        self._radio.event(event, text)
+        if event == ATParser.OK or event == ATParser.ERROR:
+            self._stats.reply()
+        elif event == ATParser.RX:
+            self._rx_pending = True
+
+    def _wait_for(self, events, timeout_ms):
+        """
+        Read UART lines until one of the given ATParser event types arrives
+        or the timeout elapses. Returns the event type, or None on timeout.
+        """
+        deadline = ticks_add(ticks_ms(), timeout_ms)
+        while True:
+            event = self._next_event(deadline)
+            if event is None:
+                return None
+            if event[0] in events:
+                return event[0]
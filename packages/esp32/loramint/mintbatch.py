@@ -0,0 +1,106 @@
+"""
+MintBatch - packs several MintValue records into a single LoRaWAN frame, so a
+node reporting e.g. temperature, humidity and pressure pays for one uplink
+instead of three.
+
+Wire format of a batch frame (no padding):
+
+    byte 0        0x07  batch marker
+    byte 1        number of records that follow (1..255)
+    records ...   MintValue.to_record() of each value, back to back
+
+A record is self-delimiting: its _option[1] byte gives the datatype (and so
+the length of the value, or a 0x1E-terminated string) and whether a 4-byte
+timestamp follows the four 0x1E-terminated metadata fields.
+
+Records may refer to announced metadata by id (see MintValue.to_record); the
+registrations for ids that are new are chained in front of the batch, so a
+frame reads [0x08 registration ...][0x07 count records ...].
+"""
+
+
+class MintBatch:
+    MARKER = 0x07          # first byte marking a batch of measured values
+    MAX_COUNT = 255        # the count header is a single byte
+
+    def __init__(self, max_size, max_count=MAX_COUNT):
+        """
+        Create an empty batch that holds at most `max_size` bytes on the wire
+        (header included) - the application payload limit of the current
+        data rate - and at most `max_count` records.
+        """
+        self._max_size = max_size
+        self._max_count = min(max_count, self.MAX_COUNT)
+        self._prefix = bytearray()    # metadata registrations chained in front
+        self._buffer = bytearray([self.MARKER, 0])
+        self.registered = []          # metadata ids announced by this frame
+
+    def __len__(self):
+        """Number of records in the batch."""
+        return self._buffer[1]
+
+    def add(self, value, metadata_id=None, registration=b""):
+        """
+        Append a MintValue to the batch. Returns False (leaving the batch
+        unchanged) if the record would push the frame over `max_size` or the
+        batch already holds `max_count` records.
+
+        With `metadata_id` the record refers to that metadata id; pass the
+        value's `registration` too if the id has not been announced yet.
+
+        The first record of an empty batch is always accepted, even if it is
+        larger than `max_size` on its own - it then travels alone, just as a
+        single sendValue frame would.
+        """
+        return self.add_record(value.to_record(metadata_id), metadata_id,
+                               registration)
+
+    def add_record(self, record, metadata_id=None, registration=b""):
+        """
+        Append an already encoded record (MintValue.to_record(), e.g. read
+        back from a MintQueue). Same rules and return value as add().
+        """
+        count = self._buffer[1]
+        if count:
+            if count >= self._max_count:
+                return False
+            size = len(self._prefix) + len(self._buffer)
+            if size + len(registration) + len(record) > self._max_size:
+                return False
+        if registration:
+            self._prefix += registration
+            self.registered.append(metadata_id)
+        self._buffer += record
+        self._buffer[1] = count + 1
+        return True
+
+    def to_bytes(self):
+        """
+        Return the frame payload: any chained registrations, then marker,
+        count and the packed records.
+        """
+        return bytes(self._prefix + self._buffer)
+
+    @classmethod
+    def pack(cls, values, max_size, metadata_ref=None, max_count=MAX_COUNT):
+        """
+        Split `values` into as few batches as possible, each at most
+        `max_size` bytes on the wire and `max_count` records. Returns a list
+        of MintBatch, in order.
+
+        `metadata_ref`, if given, is called once per value and returns its
+        (metadata_id, registration) - see LoRaMINT(metadata_ids=True).
+        """
+        batches = []
+        batch = cls(max_size, max_count)
+        for value in values:
+            metadata_id, registration = None, b""
+            if metadata_ref:
+                metadata_id, registration = metadata_ref(value)
+            if not batch.add(value, metadata_id, registration):
+                batches.append(batch)
+                batch = cls(max_size, max_count)
+                batch.add(value, metadata_id, registration)
+        if len(batch):
+            batches.append(batch)
+        return batches
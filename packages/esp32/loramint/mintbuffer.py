@@ -0,0 +1,56 @@
+"""
+MintBuffer - readings kept in RAM with their sample time, until
+LoRaMINT.sendBuffered() delivers them in timed batch frames (see TimedBatch).
+
+    buffer = MintBuffer(64)
+    buffer.add(MintValue(21.5, "*C", "Raum 101", "Temperatur", "BME280"))
+    ...
+    lora.sendBuffered(buffer)
+
+add() notes the ticks_ms() at which a reading was taken; the driver turns it
+into a Unix time with its NetworkClock when the frame is built - also for
+readings taken before the clock was synced - or, while the clock is not
+synced, into the reading's age at sending. Either way a reading costs one to
+three bytes of time instead of four, and the values themselves need no
+`time`.
+
+Unlike a MintQueue, the buffer does not survive a reboot or deep sleep, and
+a reading can stay in it for at most half the ticks_ms() period (about 6
+days on the ESP32).
+"""
+
+from ._compat import ticks_ms
+
+
+class MintBuffer:
+    def __init__(self, size=64):
+        """
+        Create a buffer of at most `size` readings; when it is full, the
+        oldest reading is dropped.
+        """
+        self._size = size
+        self._readings = []   # [(ticks_ms when taken, MintValue)], oldest first
+        self.dropped = 0      # readings dropped because the buffer was full
+
+    def __len__(self):
+        """Number of buffered readings."""
+        return len(self._readings)
+
+    def add(self, value, ticks=None):
+        """
+        Buffer a MintValue taken now, or at `ticks` (a ticks_ms() value, no
+        earlier than that of the reading before).
+        """
+        readings = self._readings
+        if len(readings) >= self._size:
+            del readings[0]
+            self.dropped += 1
+        readings.append((ticks_ms() if ticks is None else ticks, value))
+
+    def peek(self, count):
+        """Return up to `count` oldest (ticks, value) pairs, oldest first."""
+        return self._readings[:count]
+
+    def pop(self, count):
+        """Remove the `count` oldest readings."""
+        del self._readings[:count]
@@ -0,0 +1,49 @@
+"""
+MintFragment - splits a payload that exceeds the current data rate's limit
+into several uplinks, which the backend puts back together.
+
+EU868 allows only 51 bytes of application payload at DR0-DR2 (SF12-SF10),
+but a padded value frame is 99 bytes and a log message up to 141. Where
+compacting is not enough, LoRaMINT sends the payload as fragments:
+
+    byte 0        0x09  fragment marker
+    byte 1        message number (0..255, the same for all fragments of a
+                  payload, counting up per fragmented payload)
+    byte 2        fragment index (0 .. count - 1)
+    byte 3        fragment count (2..255)
+    bytes 4 ...   the next slice of the original payload
+
+The backend stores fragments per device and message number and decodes the
+payload once all of them have arrived; a message whose fragments do not all
+arrive is dropped after a while. Each fragment is an uplink of its own, with
+its own airtime, so fragmenting is the fallback for distant nodes, not a way
+to send large payloads.
+"""
+
+
+class MintFragment:
+    MARKER = 0x09          # first byte marking a fragment
+    HEADER_SIZE = 4
+    MAX_COUNT = 255        # the fragment count is a single byte
+
+    @classmethod
+    def split(cls, payload, max_size, message):
+        """
+        Return the fragment frames (bytes) carrying `payload`, each at most
+        `max_size` bytes on the wire, numbered with `message` (0..255).
+        Raises ValueError if `max_size` leaves no room for data or more than
+        MAX_COUNT fragments would be needed.
+        """
+        chunk = max_size - cls.HEADER_SIZE
+        if chunk <= 0:
+            raise ValueError("no room for fragment data")
+        count = (len(payload) + chunk - 1) // chunk
+        if count > cls.MAX_COUNT:
+            raise ValueError("payload needs more than {} fragments".format(
+                cls.MAX_COUNT))
+        frames = []
+        for index in range(count):
+            frame = bytearray([cls.MARKER, message & 0xFF, index, count])
+            frame += payload[index * chunk:(index + 1) * chunk]
+            frames.append(bytes(frame))
+        return frames
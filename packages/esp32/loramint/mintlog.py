@@ -0,0 +1,92 @@
+"""
+MintLog - compressed log messages: each word or fragment found in a static
+dictionary, shared with the backend, is sent as a single byte.
+
+Log messages of a node are highly repetitive ("ESP32 gestartet", sensor
+errors, the stats and config reports), and as plain ASCII a long one needs a
+slow, airtime-hungry frame or even fragments. LoRaMINT(compress_logs=True)
+sends them in this form instead:
+
+    byte 0        0x0B  compressed log marker
+    bytes 1 ...   0x00-0x7F  that ASCII character
+                  0x80-0xFF  DICTIONARY[byte - 0x80]
+
+The encoder replaces the longest dictionary entry starting at each position
+(smaz-style), so a message never gets longer than its plain form; typical
+messages shrink to less than half ("ESP32 gestartet": 16 bytes -> 2). The
+dictionary is part of the protocol and uses all 128 codes: an entry must
+never be changed or moved - the backend decoder (packages/api/lib/uplink.ts)
+holds the same table.
+"""
+
+
+class MintLog:
+    MARKER = 0x0B          # first byte marking a compressed log message
+    CODE = 0x80            # bytes from here on are dictionary codes
+
+    # DICTIONARY[i] is sent as 0x80 + i (128 entries)
+    DICTIONARY = (
+        # whole messages and status lines of the library and its examples
+        "ESP32 gestartet", "Sensor gestartet", "stats up=", " ok=", " to=", " err=",
+        " busy=", " b=", " air=", " join=", " at=", " heap=", "config interval=",
+        " deadband=", " batch=", " dr=adr", " dr=",
+        # words of sensor-node logs
+        "Sensor", "sensor", "ESP32", "LoRaMINT", "LA66", "BME280", "I2C", "UART",
+        "Gateway", "gestartet", "gesendet", "fehlgeschlagen", "Neustart", "Fehler",
+        "error", "Error", "failed", "timeout", "Timeout", "retry", "reset", "start",
+        "ready", "join", "send", "read", "not ", "found", "nicht ", "kein",
+        "Verbindung", "Batterie", "battery", "Spannung", "niedrig", "Messung",
+        "Temperatur", "Feuchte", "Druck", "Raum ", "Wert", "value", "status",
+        "OK", "low", "ung", "the ", "and ", "und ", "der ", "die ", "ist ",
+        "tion", "ing", "ein", "sch", "ich", "ter", "ten", "gen",
+        # frequent letter pairs (German and English)
+        "en", "er", "ch", "te", "in", "st", "ei", "ie", "ge", "an", "un", "de",
+        "nd", "re", "es", "on", "at", "or", "ar", "al", "ed", "ti", "it", "le",
+        "ne", "se", "ra", "ro", "ta", "to", "ou", "he", "is", "ss",
+        # separators and numbers
+        ": ", ", ", " - ", "  ", "=0", "=1", "/0", "00", "10", "20", "0.", ".0",
+        ".5", "-1", "255", " 0", " 1",
+    )
+
+    _entries = None        # first character -> [(entry, code)], longest first
+
+    @classmethod
+    def encode(cls, message):
+        """
+        Return the compressed log frame (marker included) for `message`.
+        Characters outside ASCII become "?", as in a plain log frame.
+        """
+        entries = cls._entries or cls._index()
+        out = bytearray([cls.MARKER])
+        pos = 0
+        length = len(message)
+        while pos < length:
+            char = message[pos]
+            for entry, code in entries.get(char, ()):
+                if message.startswith(entry, pos):
+                    out.append(code)
+                    pos += len(entry)
+                    break
+            else:
+                byte = ord(char)
+                out.append(byte if byte < cls.CODE else 0x3F)   # "?"
+                pos += 1
+        return bytes(out)
+
+    @classmethod
+    def decode(cls, frame):
+        """Return the message of a compressed log frame (marker included)."""
+        dictionary = cls.DICTIONARY
+        return "".join(chr(byte) if byte < cls.CODE else dictionary[byte - cls.CODE]
+                       for byte in frame[1:])
+
+    @classmethod
+    def _index(cls):
+        """Build the lookup table of encode() on first use."""
+        entries = {}
+        for index, entry in enumerate(cls.DICTIONARY):
+            entries.setdefault(entry[0], []).append((entry, cls.CODE + index))
+        for candidates in entries.values():
+            candidates.sort(key=lambda candidate: -len(candidate[0]))
+        cls._entries = entries
+        return entries
@@ -0,0 +1,164 @@
+"""
+MintQueue - persistent store-and-forward queue for measurement values that
+could not be sent (no join yet, no gateway in range, LA66 busy). The queue
+lives in a file on the board's flash, so readings survive a reboot or a
+brown-out and are delivered, with their original timestamps, once the link is
+back (see LoRaMINT.sendQueued).
+
+The file is a ring buffer of fixed-size slots:
+
+    header        4 bytes       sequence number of the oldest unsent slot
+    slot 0 .. n-1 SLOT_SIZE each:
+        4 bytes   sequence number (big-endian, 0 = never written)
+        1 byte    record length
+        98 bytes  MintValue.to_record(), zero-padded
+
+Slots are written in sequence order and a slot is only overwritten once the
+ring has wrapped, so flash writes are spread evenly over the file; the header
+is rewritten once per delivered batch, not per reading. When the queue is full
+the oldest reading is dropped. enqueue(), peek() and pop() touch only the
+slots involved - the whole file is scanned once, when it is opened.
+
+Only readings with a custom timestamp (MintValue(..., time=...)) can be
+queued: a reading stamped with the server's receive time would get the time of
+the later uplink instead of the time it was measured.
+"""
+
+import struct
+
+from .mintvalue import MintValue
+
+
+class MintQueue:
+    HEADER_SIZE = 4
+    RECORD_SIZE = MintValue.MAX_MESSAGE_SIZE - 1   # a record lacks _option[0]
+    SLOT_SIZE = 4 + 1 + RECORD_SIZE
+
+    def __init__(self, path="loramint.queue", slots=128):
+        """
+        Open (or create) the queue file at `path` holding at most `slots`
+        readings - about 13 KB of flash for the default 128. A file created
+        with a different slot count is discarded and recreated.
+        """
+        self._slots = slots
+        self._file = self._open(path)
+        self._head, self._tail = self._scan()
+
+    def __len__(self):
+        """Number of queued readings."""
+        return self._head - self._tail
+
+    # ------------------------------------------------------------------ #
+    # Queue operations
+    # ------------------------------------------------------------------ #
+
+    def enqueue(self, value):
+        """
+        Append a MintValue to the queue. If the queue is full, the oldest
+        reading is dropped to make room. Raises ValueError if the value has no
+        custom timestamp.
+        """
+        record = value.to_record()
+        if record[0] & 0x03 != MintValue.TIME_CUSTOM:
+            raise ValueError("queued values need a custom time")
+        if len(record) > self.RECORD_SIZE:
+            raise ValueError(
+                "encoded record exceeds {} bytes".format(self.RECORD_SIZE)
+            )
+
+        slot = bytearray(self.SLOT_SIZE)
+        struct.pack_into(">IB", slot, 0, self._head & 0xFFFFFFFF, len(record))
+        slot[5:5 + len(record)] = record
+        self._seek(self._head)
+        self._file.write(slot)
+        self._file.flush()
+
+        self._head += 1
+        if self._head - self._tail > self._slots:
+            self._tail = self._head - self._slots   # drop the oldest reading
+
+    def peek(self, count):
+        """
+        Yield (slots, record) for up to `count` of the oldest readings, oldest
+        first, without removing them: the record (MintValue.to_record()) and
+        the number of slots from the oldest up to and including its own - the
+        count to pop() once it was delivered. A slot left unreadable by a
+        power loss during its write is skipped, but still counted.
+        """
+        seq = self._tail
+        end = min(self._head, self._tail + count)
+        while seq < end:
+            self._seek(seq)
+            slot = self._file.read(self.SLOT_SIZE)
+            stored, length = struct.unpack_from(">IB", slot)
+            seq += 1
+            if stored == (seq - 1) & 0xFFFFFFFF and length <= self.RECORD_SIZE:
+                yield seq - self._tail, slot[5:5 + length]
+
+    def pop(self, count):
+        """
+        Remove the `count` oldest readings (after they were delivered) and
+        persist the new start of the queue.
+        """
+        self._tail = min(self._head, self._tail + count)
+        self._file.seek(0)
+        self._file.write(struct.pack(">I", self._tail))
+        self._file.flush()
+
+    def close(self):
+        """Close the queue file."""
+        self._file.close()
+
+    # ------------------------------------------------------------------ #
+    # File helpers
+    # ------------------------------------------------------------------ #
+
+    def _open(self, path):
+        """Open the queue file, (re)creating it if missing or mis-sized."""
+        size = self.HEADER_SIZE + self._slots * self.SLOT_SIZE
+        try:
+            f = open(path, "r+b")
+            if f.seek(0, 2) == size:
+                return f
+            f.close()
+        except OSError:
+            pass
+
+        f = open(path, "w+b")
+        f.write(struct.pack(">I", 1))   # sequence numbers start at 1
+        empty = bytes(self.SLOT_SIZE)
+        for _ in range(self._slots):
+            f.write(empty)
+        f.flush()
+        return f
+
+    def _scan(self):
+        """
+        Recover (head, tail) from the file: the head follows the highest
+        consistent sequence number, the tail is the stored one, moved up if
+        newer readings have since overwritten it.
+
+        A slot's sequence number counts only if the slot is the one it maps
+        to and it continues the sequence of the slot before (or is the first
+        ever written): a slot torn by a power loss or holding garbage is
+        treated as empty, so peek() skips it, instead of moving the head.
+        """
+        self._file.seek(0)
+        tail = struct.unpack(">I", self._file.read(self.HEADER_SIZE))[0]
+        slots = self._slots
+        stored = []
+        for i in range(slots):
+            self._file.seek(self.HEADER_SIZE + i * self.SLOT_SIZE)
+            stored.append(struct.unpack(">I", self._file.read(4))[0])
+        head = 1
+        for i in range(slots):
+            seq = stored[i]
+            if (seq >= head and seq % slots == i
+                    and (seq == 1 or stored[i - 1] == seq - 1)):
+                head = seq + 1
+        tail = max(tail, head - slots, 1)
+        return head, min(tail, head)
+
+    def _seek(self, seq):
+        """Position the file at the slot holding sequence number `seq`."""
+        self._file.seek(self.HEADER_SIZE + (seq % self._slots) * self.SLOT_SIZE)
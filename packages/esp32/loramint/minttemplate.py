@@ -0,0 +1,148 @@
+"""
+MintTemplate - a MintValue with everything but the value fixed, encoded once.
+
+A node sampling the same sensor over and over builds a new MintValue for
+every reading: the datatype is inferred, the four metadata fields are
+checked against their length limits and ASCII-encoded, and to_bytes()
+assembles the whole frame byte by byte. Only the value (and the timestamp)
+ever changes. A template does the rest once:
+
+    temperature = MintTemplate("*C", "Raum 101", "Temperatur", "BME280")
+    while True:
+        lora.sendValue(temperature.value(sensor.temperature))
+
+value() returns an ordinary MintValue, usable everywhere one is expected
+(sendValue, sendValues, ReportPolicy, MintQueue, ...). Encoding it patches
+the value bytes, option byte and timestamp into a frame buffer the template
+keeps, next to the pre-encoded metadata, and copies the frame out once - no
+per-field encoding and no growing of a buffer. Frames referring to a
+metadata id (LoRaMINT(metadata_ids=True)) carry no metadata fields and are
+encoded as usual.
+"""
+
+import struct
+
+from ._compat import const
+from .mintvalue import MintValue, fixed_raw, half_bits
+
+_LONG = const(3)      # wire datatypes, see MintValue.DATATYPES
+_HALF = const(7)
+_FIXED8 = const(8)
+
+# value bytes per wire datatype (0 = string, separator-terminated)
+_SIZES = (0, 1, 2, 4, 4, 4, 0, 2, 1, 1, 1, 1, 2, 2, 2, 2)
+
+
+class MintTemplate:
+    def __init__(self, unit, location, measurand, sensor, datatype=None,
+                 resolution=None, limits=None):
+        """
+        Create a template for values of one series. The arguments are those
+        of MintValue (in the same order), except that the datatype is fixed
+        up front instead of inferred from each value: `datatype`, else the
+        one MintValue.choose_datatype() picks for `resolution` and `limits`
+        (low, high), else "float". Without a datatype, giving only one of
+        `resolution` and `limits` raises ValueError.
+        """
+        if datatype is None:
+            if (resolution is None) != (limits is None):
+                raise ValueError("choosing a datatype needs resolution and limits")
+            datatype = ("float" if resolution is None
+                        else MintValue.choose_datatype(resolution, *limits))
+        prototype = MintValue("" if datatype.lower() == "string" else 0, unit,
+                              location, measurand, sensor, datatype=datatype,
+                              resolution=resolution)
+        self._prototype = prototype
+        self._datatype = prototype.datatype()
+        self._type = prototype.wire_type()
+        self._metadata = prototype.encoded_metadata()
+
+        # [0x06][option1][value][0x1E][metadata][time] ... zero padding
+        self._frame = bytearray(MintValue.MAX_MESSAGE_SIZE)
+        self._view = memoryview(self._frame)
+        self._frame[0] = MintValue.PROTOCOL_OPTION
+        size = _SIZES[self._type]
+        if size:
+            # a number has a fixed size: the metadata never moves
+            self._frame[2 + size] = MintValue.DATA_SEPARATOR
+            start = 3 + size
+            self._frame[start:start + len(self._metadata)] = self._metadata
+            self._static_end = start + len(self._metadata)
+        else:
+            self._static_end = 0
+        self._end = self._static_end   # end of the last frame written
+
+    def value(self, value, time=None):
+        """
+        Return a MintValue for one reading of this series, with `time` as
+        in MintValue (an optional Unix timestamp).
+        """
+        return MintValue._from_template(self, self._prototype, value, time)
+
+    @property
+    def datatype(self):
+        """The datatype of this series' values, one of MintValue.DATATYPES."""
+        return self._datatype
+
+    # ------------------------------------------------------------------ #
+    # Encoding (called by MintValue)
+    # ------------------------------------------------------------------ #
+
+    def to_bytes(self, value, time=None, compact=False):
+        """The frame of MintValue.to_bytes() for a value of this series."""
+        end = self._patch(value, time)
+        if compact:
+            self._frame[1] |= MintValue.COMPACT_FLAG
+            return bytes(self._view[:end])
+        return bytes(self._frame)
+
+    def to_record(self, value, time=None):
+        """The record of MintValue.to_record() for a value of this series."""
+        return bytes(self._view[1:self._patch(value, time)])
+
+    def _patch(self, value, time):
+        """
+        Write the option byte, `value` and `time` into the frame buffer and
+        return the end of the frame (before its zero padding).
+        """
+        frame = self._frame
+        wire_type = self._type
+        size = _SIZES[wire_type]
+        if size == 0:
+            # a string moves the metadata behind it
+            text = value.encode("ascii", "replace")
+            end = 2 + len(text)
+            frame[2:end] = text
+            frame[end] = MintValue.DATA_SEPARATOR
+            start = end + 1
+            end = start + len(self._metadata)
+            frame[start:end] = self._metadata
+        else:
+            if size == 4 and wire_type != _LONG:
+                # float/double: a single, as in MintValue._encode_value()
+                struct.pack_into(">f", frame, 2, float(value))
+            else:
+                if wire_type == _HALF:
+                    value = half_bits(value)
+                elif wire_type >= _FIXED8:
+                    value = fixed_raw(value, wire_type)
+                for i in range(size):
+                    frame[1 + size - i] = (value >> (8 * i)) & 0xFF
+            end = self._static_end
+
+        if time is None:
+            frame[1] = (wire_type << 2) | MintValue.TIME_SERVER
+        else:
+            frame[1] = (wire_type << 2) | MintValue.TIME_CUSTOM
+            t = time & 0xFFFFFFFF
+            frame[end] = (t >> 24) & 0xFF
+            frame[end + 1] = (t >> 16) & 0xFF
+            frame[end + 2] = (t >> 8) & 0xFF
+            frame[end + 3] = t & 0xFF
+            end += 4
+
+        # clear what a longer earlier frame left behind, so the padding holds
+        for i in range(end, self._end):
+            frame[i] = 0
+        self._end = end
+        return end
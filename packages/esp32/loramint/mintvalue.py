@@ -3,15 +3,43 @@ MintValue - describes a single measurement value and encodes it according to the
 LoRaMINT message protocol (version 1). MicroPython port of the Arduino MintValue
 class.
 
-Wire format of an encoded value (always padded to 99 bytes):
+Wire format of an encoded value (padded to 99 bytes unless compact):
 
     byte 0        _option[0] = 0x06  (protocol v1 + "measured value")
-    byte 1        _option[1] = (datatype << 2) | timeflag
-    bytes ...     value (big-endian; 1/2/4 bytes or ASCII for strings)
+    byte 1        _option[1] = [compact 0x80] | [metadata ref 0x40]
+                               | (datatype << 2) | timeflag
+    bytes ...     value (big-endian; 1-4 bytes or ASCII for strings)
     0x1E          record separator
     unit  0x1E  measurand  0x1E  location  0x1E  sensor  0x1E
     [4 bytes]     Unix time, big-endian (only if a custom time is given)
-    0x00 ...      zero padding up to 99 bytes
+    0x00 ...      zero padding up to 99 bytes (omitted in compact mode)
+
+Compact mode (to_bytes(compact=True)) sets bit 7 of _option[1] and sends only
+the meaningful bytes - typically 30-40 instead of 99, which shortens the
+time-on-air accordingly. Compact frames are decoded by the LoRaMINT backend
+from the raw uplink, not by the TTN payload formatter.
+
+Nodes whose metadata never changes can announce it once with
+to_registration(id) and afterwards send to_bytes(metadata_id=id): bit 6 of
+_option[1] is set and the four fields are replaced by the 1-byte id, so a float
+reading shrinks to 7 bytes.
+
+Two datatypes trade float precision for bytes, both decoded to a float:
+"half" is an IEEE-754 half-precision float (2 bytes, about 3 significant
+digits, up to 65504), "fixed8"/"fixed16" a signed integer counting steps of
+10**e, exact to that step. The step is part of the datatype code, so the
+value bytes are only the raw integer:
+
+    datatype      8 + 3 + e (fixed8) or 12 + 3 + e (fixed16), e = -3..0
+    value         signed raw, 1 byte (fixed8) or 2 bytes (fixed16)
+    meaning       raw * 10**e
+
+The step 10**e is the largest power of ten within the `resolution` the value
+is created with (steps of 1 for a coarser one): fixed8 spans -128..127 steps,
+fixed16 -32768..32767; values beyond saturate. A temperature at 0.1 *C thus
+takes 2 bytes instead of 4, a humidity at 1 % a single byte.
+choose_datatype() picks the smallest datatype for a declared resolution and
+range, also when MintValue(..., resolution=, limits=) is given no datatype.
 
 Note the field order on the wire is unit, measurand, location, sensor - the
 constructor takes them in the Arduino order (unit, location, measurand, sensor)
@@ -20,26 +48,96 @@ and to_bytes() reorders them to match the TTN payload formatter.
 
 import struct
 
-import ubinascii
+from ._compat import const, ubinascii
+
+# Wire constants. MicroPython folds the private const() names into the
+# bytecode as literals; the MintValue attributes below are their public names.
+_BYTE = const(1)           # datatypes, (_option[1] >> 2) & 0x0F
+_INT = const(2)
+_LONG = const(3)
+_FLOAT = const(4)
+_DOUBLE = const(5)
+_STRING = const(6)
+_HALF = const(7)
+_FIXED8 = const(8)         # 8..11: step 10**-3..10**0
+_FIXED16 = const(12)       # 12..15: step 10**-3..10**0
+
+_TIME_SERVER = const(1)
+_TIME_CUSTOM = const(2)
+_PROTOCOL_OPTION = const(0x06)
+_COMPACT_FLAG = const(0x80)
+_METADATA_REF_FLAG = const(0x40)
+_REGISTRATION_MARKER = const(0x08)
+_DATA_SEPARATOR = const(0x1E)
+_MAX_MESSAGE_SIZE = const(99)
+
+
+# Value encoders, also used by MintTemplate to patch values into its frame.
+
+def half_bits(value):
+    """
+    Return the IEEE-754 half-precision bits of `value`, rounded to
+    nearest-even from its single; beyond 65504 (MintValue.HALF_MAX) it
+    saturates.
+    """
+    bits = struct.unpack(">I", struct.pack(">f", float(value)))[0]
+    sign = (bits >> 16) & 0x8000
+    exponent = ((bits >> 23) & 0xFF) - 112     # rebias 127 -> 15
+    mantissa = bits & 0x7FFFFF
+    if exponent == 143:                        # inf/NaN
+        return sign | (0x7E00 if mantissa else 0x7BFF)
+    if exponent <= 0:                          # subnormal half (or 0)
+        if exponent < -10:
+            return sign
+        mantissa |= 0x800000
+        shift = 14 - exponent
+    else:
+        shift = 13
+    half = mantissa >> shift
+    rest = mantissa & ((1 << shift) - 1)
+    middle = 1 << (shift - 1)
+    if rest > middle or (rest == middle and half & 1):
+        half += 1
+    if exponent > 0:
+        half += exponent << 10                 # a rounding carry moves it up
+    return sign | min(half, 0x7BFF)
+
+
+def fixed_raw(value, wire_type):
+    """
+    Return the raw value of a fixed-point datatype code: `value` in steps
+    of 10**e, saturated to the signed 8 or 16 bits.
+    """
+    raw = int(round(value * 10 ** (3 - (wire_type & 3))))    # e = -3..0
+    limit = 0x80 if wire_type < _FIXED16 else 0x8000
+    return min(max(raw, -limit), limit - 1)
 
 
 class MintValue:
-    # datatype -> encoded value (matches _option[1] >> 2 in the protocol)
+    # datatype -> encoded value (matches (_option[1] >> 2) & 0x0F in the protocol);
+    # for the fixed-point types the code of step 10**MIN_EXPONENT, plus one
+    # per power of ten
     DATATYPES = {
-        "byte": 1,
-        "int": 2,
-        "long": 3,
-        "float": 4,
-        "double": 5,
-        "string": 6,
+        "byte": _BYTE,
+        "int": _INT,
+        "long": _LONG,
+        "float": _FLOAT,
+        "double": _DOUBLE,
+        "string": _STRING,
+        "half": _HALF,
+        "fixed8": _FIXED8,
+        "fixed16": _FIXED16,
     }
 
-    TIME_SERVER = 1        # 01 -> timestamp added by the server
-    TIME_CUSTOM = 2        # 10 -> custom Unix timestamp included in the payload
+    TIME_SERVER = _TIME_SERVER   # 01 -> timestamp added by the server
+    TIME_CUSTOM = _TIME_CUSTOM   # 10 -> custom Unix timestamp included in the payload
 
-    PROTOCOL_OPTION = 0x06  # _option[0]: protocol v1 (000001) + measured value (10)
-    DATA_SEPARATOR = 0x1E   # ASCII record separator
-    MAX_MESSAGE_SIZE = 99
+    PROTOCOL_OPTION = _PROTOCOL_OPTION  # _option[0]: protocol v1 (000001) + measured value (10)
+    COMPACT_FLAG = _COMPACT_FLAG        # _option[1] bit 7: no zero padding follows
+    METADATA_REF_FLAG = _METADATA_REF_FLAG  # _option[1] bit 6: metadata id instead of fields
+    REGISTRATION_MARKER = _REGISTRATION_MARKER  # first byte of a metadata registration
+    DATA_SEPARATOR = _DATA_SEPARATOR    # ASCII record separator
+    MAX_MESSAGE_SIZE = _MAX_MESSAGE_SIZE
 
     # field length limits (matching the Arduino constructors)
     MAX_UNIT = 10
@@ -48,23 +146,46 @@ class MintValue:
     MAX_SENSOR = 10
     MAX_STRING_VALUE = 20
 
+    HALF_MAX = 65504.0     # largest half-precision value
+    MIN_EXPONENT = -3      # range of the fixed-point step 10**e
+    MAX_EXPONENT = 0
+    FIXED8_MAX = 127       # largest raw value (fixed8, fixed16); the
+    FIXED16_MAX = 32767    # smallest is -(max + 1)
+
     def __init__(self, value, unit, location, measurand, sensor,
-                 datatype=None, time=None):
+                 datatype=None, time=None, resolution=None, limits=None):
         """
         Create a measurement value.
 
         `datatype` is one of DATATYPES ("byte", "int", "long", "float",
-        "double", "string"). If omitted it is inferred from `value`
-        (str -> string, float -> float, int -> long).
+        "double", "string", "half", "fixed8", "fixed16"). If omitted it is
+        inferred from `value` (str -> string, float -> float, int -> long),
+        or, given a `resolution`, chosen by choose_datatype() for the range
+        `limits` (low, high) - by default just `value`.
+
+        `resolution` is the smallest change of the value that matters (e.g.
+        0.1); the fixed-point datatypes need it for their step, and it must
+        be at least 10**MIN_EXPONENT for them.
 
         `time` is an optional Unix timestamp (int); if given, it is embedded in
         the payload and the server uses it instead of its own receive time.
         """
-        datatype = (datatype or self._infer_datatype(value)).lower()
+        if datatype is None and resolution is not None:
+            low, high = limits or (value, value)
+            datatype = self.choose_datatype(resolution, low, high)
+        datatype = (datatype or self.infer_datatype(value)).lower()
         if datatype not in self.DATATYPES:
             raise ValueError("unknown datatype: " + datatype)
 
         self._datatype = datatype
+        self._type = self.DATATYPES[datatype]   # wire code, for encoding
+        if self._type >= _FIXED8:
+            exponent = (None if resolution is None
+                        else self._step_exponent(resolution))
+            if exponent is None:
+                raise ValueError("{} needs a resolution of at least {}".format(
+                    datatype, 10.0 ** self.MIN_EXPONENT))
+            self._type += exponent - self.MIN_EXPONENT
         if datatype == "string":
             self._value = str(value)[:self.MAX_STRING_VALUE]
         else:
@@ -75,44 +196,172 @@ class MintValue:
         self._measurand = self._fit(measurand, self.MAX_MEASURAND)
         self._sensor = self._fit(sensor, self.MAX_SENSOR)
         self._time = time
+        self._metadata_bytes = None   # encoded_metadata(), once computed
+        self._template = None         # the MintTemplate that made this value
+
+    @classmethod
+    def _from_template(cls, template, prototype, value, time=None):
+        """
+        A value of `template`'s series, used by MintTemplate.value(): the
+        datatype and the encoded metadata are taken from `prototype` instead
+        of being checked and encoded again, and the template encodes it.
+        """
+        reading = cls.__new__(cls)
+        reading._datatype = prototype._datatype
+        reading._type = prototype._type
+        reading._value = (str(value)[:cls.MAX_STRING_VALUE]
+                          if prototype._type == _STRING else value)
+        reading._unit = prototype._unit
+        reading._location = prototype._location
+        reading._measurand = prototype._measurand
+        reading._sensor = prototype._sensor
+        reading._time = time
+        reading._metadata_bytes = prototype.encoded_metadata()
+        reading._template = template
+        return reading
 
     # ------------------------------------------------------------------ #
     # Encoding
     # ------------------------------------------------------------------ #
 
-    def to_bytes(self):
-        """Return the 99-byte payload for this value."""
-        time_flag = self.TIME_CUSTOM if self._time is not None else self.TIME_SERVER
-        option1 = (self.DATATYPES[self._datatype] << 2) | time_flag
+    def to_bytes(self, compact=False, metadata_id=None):
+        """
+        Return the 99-byte payload for this value, or with `compact` only the
+        meaningful bytes (flagged in _option[1], no zero padding).
+
+        With `metadata_id`, the four metadata fields are replaced by that
+        1-byte id (announced earlier with to_registration()); such frames are
+        always compact.
+        """
+        if self._template is not None and metadata_id is None:
+            return self._template.to_bytes(self._value, self._time, compact)
+        buffer = bytearray()
+        buffer.append(_PROTOCOL_OPTION)   # _option[0]
+        buffer += self.to_record(metadata_id)
+
+        if len(buffer) > _MAX_MESSAGE_SIZE:
+            raise ValueError(
+                "encoded message exceeds {} bytes".format(_MAX_MESSAGE_SIZE)
+            )
+        if compact or metadata_id is not None:
+            buffer[1] |= _COMPACT_FLAG
+        else:
+            buffer += bytes(_MAX_MESSAGE_SIZE - len(buffer))  # zero padding
+        return bytes(buffer)
+
+    def to_record(self, metadata_id=None):
+        """
+        Return the unpadded record for this value: everything after
+        _option[0], up to and including the optional timestamp. This is the
+        unit a MintBatch packs several of into one frame.
+
+        With `metadata_id`, the record carries that id instead of the four
+        metadata fields, and a numeric value is not followed by a separator.
+        """
+        if self._template is not None and metadata_id is None:
+            return self._template.to_record(self._value, self._time)
+        time_flag = _TIME_CUSTOM if self._time is not None else _TIME_SERVER
+        option1 = (self._type << 2) | time_flag
 
         buffer = bytearray()
-        buffer.append(self.PROTOCOL_OPTION)   # _option[0]
-        buffer.append(option1)                # _option[1]
-        buffer += self._encode_value()
-        buffer.append(self.DATA_SEPARATOR)
-
-        # wire order: unit, measurand, location, sensor
-        # "replace" keeps non-ASCII input from raising (it becomes "?") - the
-        # protocol only carries ASCII.
-        for field in (self._unit, self._measurand, self._location, self._sensor):
-            buffer += field.encode("ascii", "replace")
-            buffer.append(self.DATA_SEPARATOR)
+        if metadata_id is None:
+            buffer.append(option1)            # _option[1]
+            buffer += self._encode_value()
+            buffer.append(_DATA_SEPARATOR)
+            buffer += self.encoded_metadata()
+        else:
+            buffer.append(option1 | _METADATA_REF_FLAG)
+            buffer.append(metadata_id)
+            buffer += self._encode_value()
+            if self._type == _STRING:
+                buffer.append(_DATA_SEPARATOR)
 
         if self._time is not None:
             t = self._time & 0xFFFFFFFF
             buffer += bytes([(t >> 24) & 0xFF, (t >> 16) & 0xFF,
                              (t >> 8) & 0xFF, t & 0xFF])
+        return bytes(buffer)
 
-        if len(buffer) > self.MAX_MESSAGE_SIZE:
-            raise ValueError(
-                "encoded message exceeds {} bytes".format(self.MAX_MESSAGE_SIZE)
-            )
-        buffer += bytes(self.MAX_MESSAGE_SIZE - len(buffer))  # zero padding
+    def to_registration(self, metadata_id):
+        """
+        Return a metadata registration announcing this value's unit,
+        measurand, location and sensor under the 1-byte `metadata_id`:
+        [0x08][id] followed by the four 0x1E-terminated fields. A frame using
+        the id may be appended to it and sent in the same uplink.
+        """
+        buffer = bytearray([_REGISTRATION_MARKER, metadata_id])
+        buffer += self.encoded_metadata()
         return bytes(buffer)
 
-    def to_byte_string(self):
+    def value(self):
+        """Return the measured value (a string value already truncated)."""
+        return self._value
+
+    def metadata(self):
+        """Return (unit, measurand, location, sensor), in wire order."""
+        return (self._unit, self._measurand, self._location, self._sensor)
+
+    def encoded_metadata(self):
+        """
+        Return the metadata as sent: unit, measurand, location and sensor,
+        each 0x1E-terminated (computed once).
+        """
+        if self._metadata_bytes is None:
+            buffer = bytearray()
+            # "replace" keeps non-ASCII input from raising (it becomes "?") -
+            # the protocol only carries ASCII.
+            for field in self.metadata():
+                buffer += field.encode("ascii", "replace")
+                buffer.append(_DATA_SEPARATOR)
+            self._metadata_bytes = bytes(buffer)
+        return self._metadata_bytes
+
+    def datatype(self):
+        """Return the datatype name, one of DATATYPES."""
+        return self._datatype
+
+    def wire_type(self):
+        """Return the wire datatype code, (_option[1] >> 2) & 0x0F."""
+        return self._type
+
+    def to_byte_string(self, compact=False):
         """Return the payload as an uppercase hex string (99 bytes -> 198 chars)."""
-        return ubinascii.hexlify(self.to_bytes()).decode().upper()
+        return ubinascii.hexlify(self.to_bytes(compact)).decode().upper()
+
+    @staticmethod
+    def infer_datatype(value):
+        """
+        Return the datatype a value gets without an explicit one: "string"
+        for a str, "float" for a float, "long" for an int.
+        """
+        if isinstance(value, str):
+            return "string"
+        if isinstance(value, float):
+            return "float"
+        if isinstance(value, int):
+            return "long"
+        raise ValueError("cannot infer datatype for value: " + repr(value))
+
+    @classmethod
+    def choose_datatype(cls, resolution, low, high):
+        """
+        Return the datatype with the fewest value bytes that keeps every
+        value from `low` to `high` to within `resolution`: "fixed8" (1 byte),
+        "fixed16" or "half" (2 bytes), else "float" (4 bytes).
+        """
+        exponent = cls._step_exponent(resolution)
+        if exponent is not None:
+            step = 10.0 ** exponent
+            low_raw = int(round(low / step))
+            high_raw = int(round(high / step))
+            if -cls.FIXED8_MAX - 1 <= low_raw and high_raw <= cls.FIXED8_MAX:
+                return "fixed8"
+            if -cls.FIXED16_MAX - 1 <= low_raw and high_raw <= cls.FIXED16_MAX:
+                return "fixed16"
+        largest = max(abs(low), abs(high))
+        if largest <= cls.HALF_MAX and cls._half_ulp(largest) <= resolution:
+            return "half"
+        return "float"
 
     # ------------------------------------------------------------------ #
     # Helpers
@@ -120,35 +369,58 @@ class MintValue:
 
     def _encode_value(self):
         """Encode just the value bytes, big-endian, per datatype."""
-        datatype = self._datatype
+        wire_type = self._type
         value = self._value
 
-        if datatype == "byte":
-            return bytes([value & 0xFF])
-        if datatype == "int":
-            return bytes([(value >> 8) & 0xFF, value & 0xFF])
-        if datatype == "long":
-            return bytes([(value >> 24) & 0xFF, (value >> 16) & 0xFF,
-                          (value >> 8) & 0xFF, value & 0xFF])
-        if datatype in ("float", "double"):
+        if wire_type == _FLOAT or wire_type == _DOUBLE:
             # The Arduino/AVR build encodes both as a 4-byte big-endian
             # IEEE-754 single, which is what the payload formatter decodes.
             return struct.pack(">f", float(value))
-        if datatype == "string":
+        if wire_type == _STRING:
             return value.encode("ascii", "replace")
-        raise ValueError("unknown datatype: " + datatype)
+        if wire_type == _BYTE:
+            return bytes([value & 0xFF])
+        if wire_type == _INT:
+            return bytes([(value >> 8) & 0xFF, value & 0xFF])
+        if wire_type == _LONG:
+            return bytes([(value >> 24) & 0xFF, (value >> 16) & 0xFF,
+                          (value >> 8) & 0xFF, value & 0xFF])
+        if wire_type == _HALF:
+            bits = half_bits(value)
+            return bytes([bits >> 8, bits & 0xFF])
+        if wire_type >= _FIXED16:
+            raw = fixed_raw(value, wire_type)
+            return bytes([(raw >> 8) & 0xFF, raw & 0xFF])
+        if wire_type >= _FIXED8:
+            return bytes([fixed_raw(value, wire_type) & 0xFF])
+        raise ValueError("unknown datatype: " + self._datatype)
+
+    @classmethod
+    def _step_exponent(cls, resolution):
+        """
+        The e of the largest step 10**e not above `resolution`, or None if
+        even 10**MIN_EXPONENT is above it.
+        """
+        if resolution <= 0:
+            raise ValueError("resolution must be positive")
+        limit = resolution * 1.000001          # 0.1 is a little above 10**-1
+        if 10.0 ** cls.MIN_EXPONENT > limit:
+            return None
+        exponent = cls.MIN_EXPONENT
+        while exponent < cls.MAX_EXPONENT and 10.0 ** (exponent + 1) <= limit:
+            exponent += 1
+        return exponent
+
+    @staticmethod
+    def _half_ulp(value):
+        """The spacing of half-precision values around `value` (>= 0)."""
+        ulp = 2.0 ** -24                       # subnormal spacing
+        power = 2.0 ** -14                     # smallest normal
+        while power * 2 <= value:
+            power *= 2
+        return max(ulp, power / 1024) if value >= 2.0 ** -14 else ulp
 
     @staticmethod
     def _fit(text, max_len):
         """Return text, or "too long" if it exceeds max_len (Arduino behaviour)."""
         return text if len(text) <= max_len else "too long"
-
-    @staticmethod
-    def _infer_datatype(value):
-        if isinstance(value, str):
-            return "string"
-        if isinstance(value, float):
-            return "float"
-        if isinstance(value, int):
-            return "long"
-        raise ValueError("cannot infer datatype for value: " + repr(value))
@@ -0,0 +1,193 @@
+"""
+NodeRunner - runs a sensor node from a declaration of what to measure and how
+often, instead of a hand-written read/send/sleep loop.
+
+Sensors are registered with a reader function; measurands with the sensor
+they come from, their unit and their interval. A min-heap orders the
+measurands by their next deadline. Whatever is due at the same time (within
+`slack_ms`) is handled together: every sensor involved is read once, however
+many of its measurands are due, and all resulting values go out in one
+sendValues() call - one batch uplink. Then the runner sleeps until the next
+deadline.
+
+    runner = NodeRunner(lora, "Raum 101")
+    runner.add_sensor("BME280", sensor.read_compensated_data)
+    runner.add_measurand("BME280", "Temperatur", "*C", 60, index=0)
+    runner.add_measurand("BME280", "Druck", "hPa", 600, index=1,
+                         convert=lambda pa: pa / 100)
+    runner.add_measurand("BME280", "Luftfeuchte", "% rel", 300, index=2)
+    runner.run()
+
+Here the BME280 is read once a minute; every fifth minute the same reading
+also yields the humidity, every tenth the pressure as well.
+
+Deadlines advance by whole intervals from the start, so the measurands keep
+their rhythm even if a send took long; a deadline that has been missed
+entirely is skipped rather than caught up with a burst of uplinks.
+"""
+
+import heapq
+
+from ._compat import sleep_ms, ticks_diff, ticks_ms
+from .minttemplate import MintTemplate
+from .mintvalue import MintValue
+
+
+class NodeRunner:
+    SLACK_MS = 1000     # deadlines this close together are handled together
+
+    def __init__(self, lora, location, slack_ms=SLACK_MS, policy=None,
+                 sleep=sleep_ms):
+        """
+        Create a runner that sends through `lora` (a LoRaMINT). `location` is
+        the default location of all sensors.
+
+        With `policy` (a ReportPolicy), only the values it lets through are
+        sent. `sleep(ms)` is called to wait for the next deadline, e.g.
+        machine.lightsleep to save power between readings.
+        """
+        self._lora = lora
+        self._location = location
+        self._slack_ms = slack_ms
+        self._policy = policy
+        self._sleep = sleep
+        self._sensors = {}    # name -> (read, location)
+        self._tasks = []      # (sensor, measurand, unit, interval_ms, index,
+                              #  convert, datatype, resolution, limits)
+        self._heap = []       # (deadline in ms since start, task index)
+        self._templates = {}  # task index -> MintTemplate of its values
+        self._ticks = ticks_ms()
+        self._elapsed = 0     # ms since start; unlike ticks_ms, never wraps
+        self.errors = 0       # sensor reads that raised OSError
+
+    # ------------------------------------------------------------------ #
+    # Declaration
+    # ------------------------------------------------------------------ #
+
+    def add_sensor(self, name, read, location=None):
+        """
+        Register a sensor. `read()` returns one reading - a number, or a
+        tuple/list/dict holding several, picked apart by the measurands'
+        `index`. `name` is also sent as the values' sensor field.
+        """
+        self._sensors[name] = (read, location or self._location)
+
+    def add_measurand(self, sensor, measurand, unit, interval, index=None,
+                      convert=None, datatype=None, resolution=None,
+                      limits=None):
+        """
+        Send `measurand` (in `unit`) from `sensor` every `interval` seconds,
+        starting with the next step(). `index` selects the value in the
+        sensor's reading, `convert` maps it before sending (e.g. Pa to hPa)
+        and `datatype` overrides the MintValue's inferred datatype. With a
+        `resolution` and the value's `limits` (low, high), the datatype is
+        instead the smallest that fits them (see MintValue.choose_datatype),
+        e.g. 2 bytes for a temperature at 0.1 *C; without a `datatype`,
+        giving only one of the two raises ValueError (see MintTemplate).
+        An `interval` under a millisecond raises ValueError as well.
+        """
+        if sensor not in self._sensors:
+            raise ValueError("unknown sensor: " + sensor)
+        if datatype is None and (resolution is None) != (limits is None):
+            raise ValueError("choosing a datatype needs resolution and limits")
+        interval_ms = int(interval * 1000)
+        if interval_ms <= 0:
+            raise ValueError("interval must be at least 1 ms")
+        self._tasks.append((sensor, measurand, unit, interval_ms,
+                            index, convert, datatype, resolution, limits))
+        heapq.heappush(self._heap, (self._now(), len(self._tasks) - 1))
+
+    # ------------------------------------------------------------------ #
+    # Running
+    # ------------------------------------------------------------------ #
+
+    def run(self):
+        """Run forever: handle what is due, sleep until the next deadline."""
+        while True:
+            delay = self.step()
+            if delay > 0:
+                self._sleep(delay)
+
+    def step(self):
+        """
+        Read and send every measurand that is due (or due within
+        `slack_ms`) and return the milliseconds until the next deadline.
+        Called before anything is due, it only returns the remaining time.
+        """
+        heap = self._heap
+        if not heap:
+            raise ValueError("no measurands registered")
+        now = self._now()
+        horizon = now + self._slack_ms
+
+        due = []
+        while heap and heap[0][0] <= horizon:
+            deadline, task = heapq.heappop(heap)
+            due.append(task)
+            interval = self._tasks[task][3]
+            deadline += interval
+            if deadline <= now:
+                # missed entirely (e.g. a long join): resume the rhythm
+                deadline += (now - deadline) // interval * interval + interval
+            heapq.heappush(heap, (deadline, task))
+
+        if due:
+            self._send(self._collect(due))
+        return max(0, heap[0][0] - self._now())
+
+    # ------------------------------------------------------------------ #
+    # Helpers
+    # ------------------------------------------------------------------ #
+
+    def _collect(self, due):
+        """
+        Read each sensor involved once and build the due MintValues, each from
+        its measurand's MintTemplate (made at the first reading, and again if
+        an inferred datatype changes; a declared resolution fixes it).
+        """
+        readings = {}
+        values = []
+        for task in due:
+            (sensor, measurand, unit, _, index, convert, datatype, resolution,
+             limits) = self._tasks[task]
+            read, location = self._sensors[sensor]
+            if sensor not in readings:
+                try:
+                    readings[sensor] = read()
+                except OSError:         # e.g. an I2C error; try next time
+                    readings[sensor] = None
+                    self.errors += 1
+            reading = readings[sensor]
+            if reading is None:
+                continue
+            value = reading if index is None else reading[index]
+            if convert is not None:
+                value = convert(value)
+            template = self._templates.get(task)
+            if resolution is not None:
+                if template is None:
+                    template = self._templates[task] = MintTemplate(
+                        unit, location, measurand, sensor, datatype,
+                        resolution, limits)
+            else:
+                datatype = (datatype or MintValue.infer_datatype(value)).lower()
+                if template is None or template.datatype != datatype:
+                    template = self._templates[task] = MintTemplate(
+                        unit, location, measurand, sensor, datatype)
+            values.append(template.value(value))
+        return values
+
+    def _send(self, values):
+        policy = self._policy
+        if policy is not None:
+            values = policy.filter(values)
+        if values and not self._lora.sendValues(values) and policy is not None:
+            for value in values:
+                policy.failed(value)
+
+    def _now(self):
+        """Milliseconds since the runner was created."""
+        ticks = ticks_ms()
+        self._elapsed += ticks_diff(ticks, self._ticks)
+        self._ticks = ticks
+        return self._elapsed
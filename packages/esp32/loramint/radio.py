@@ -0,0 +1,108 @@
+"""
+RadioState - tracks what the LA66's radio is doing from the lines it prints,
+so the next uplink can start the moment the module is free again.
+
+An uplink passes through these states:
+
+    IDLE          free for the next AT+SENDB
+    QUEUED        AT+SENDB written, its "OK" not yet received
+    TRANSMITTING  accepted ("OK"), on air until "txDone"
+    RX1           first Class A receive window (opens 1 s after txDone),
+                  closed by "rxTimeout" - or by "rxDone" if a downlink came
+    RX2           second receive window (2 s after txDone), closed the same way
+
+Every ATParser event is passed to event(). Firmware versions differ in what
+they print, so each state also ends on a timeout: TX_TIMEOUT_MS after the OK
+without "txDone", RX_WINDOWS_MS after "txDone" without "rxTimeout"/"rxDone".
+An "AT_BUSY_ERROR" reply means an uplink the tracker did not see (e.g. from
+before a warm start) is still in its receive windows; it counts as RX1.
+"""
+
+from ._compat import const, ticks_diff, ticks_ms
+from .atparser import ATParser
+
+# States, folded into the bytecode on MicroPython (public: RadioState.IDLE ...)
+_IDLE = const(0)
+_QUEUED = const(1)
+_TRANSMITTING = const(2)
+_RX1 = const(3)
+_RX2 = const(4)
+
+
+class RadioState:
+    IDLE = _IDLE
+    QUEUED = _QUEUED
+    TRANSMITTING = _TRANSMITTING
+    RX1 = _RX1
+    RX2 = _RX2
+    NAMES = ("idle", "queued", "transmitting", "rx1", "rx2")
+
+    REPLY_TIMEOUT_MS = 5000   # QUEUED: the LA66 answers AT+SENDB within this
+    TX_TIMEOUT_MS = 4000      # TRANSMITTING: longest uplink (SF12) + margin
+    RX_WINDOWS_MS = 3000      # RX1/RX2: RX2 opens 2 s after txDone
+
+    def __init__(self):
+        self._state = _IDLE
+        self._since = ticks_ms()
+
+    def state(self):
+        """Return the current state, after applying the timeouts."""
+        state = self._state
+        if state == _IDLE:
+            return state
+        elapsed = ticks_diff(ticks_ms(), self._since)
+        if state == _QUEUED and elapsed >= self.REPLY_TIMEOUT_MS:
+            self._set(_IDLE)
+        elif state == _TRANSMITTING and elapsed >= self.TX_TIMEOUT_MS:
+            # no txDone: assume the uplink ended now
+            self._set(_RX1)
+        elif state >= _RX1 and elapsed >= self.RX_WINDOWS_MS:
+            self._set(_IDLE)
+        return self._state
+
+    def busy(self):
+        """True until the last uplink's receive windows have closed."""
+        return self.state() != _IDLE
+
+    def remaining_ms(self):
+        """Milliseconds until the current state times out (0 when idle)."""
+        state = self.state()
+        if state == _IDLE:
+            return 0
+        if state == _QUEUED:
+            limit = self.REPLY_TIMEOUT_MS
+        elif state == _TRANSMITTING:
+            limit = self.TX_TIMEOUT_MS
+        else:
+            limit = self.RX_WINDOWS_MS
+        return max(0, limit - ticks_diff(ticks_ms(), self._since))
+
+    def queued(self):
+        """Record that an AT+SENDB was just written."""
+        self._set(_QUEUED)
+
+    def event(self, event, text=""):
+        """Advance on an ATParser event (and its line)."""
+        state = self._state
+        if event == ATParser.OK:
+            if state == _QUEUED:
+                self._set(_TRANSMITTING)
+        elif event == ATParser.ERROR:
+            if "busy" in text.lower():
+                self._set(_RX1)
+            elif state == _QUEUED:
+                self._set(_IDLE)
+        elif event == ATParser.TX_DONE:
+            self._set(_RX1)
+        elif event == ATParser.RX_TIMEOUT:
+            if state == _RX1:
+                self._set(_RX2)
+            elif state == _RX2:
+                self._set(_IDLE)
+        elif event == ATParser.RX:
+            if state >= _RX1:
+                self._set(_IDLE)
+
+    def _set(self, state):
+        self._state = state
+        self._since = ticks_ms()
@@ -0,0 +1,188 @@
+"""
+RemoteConfig - node settings the backend can change over the air with a
+LoRaWAN downlink, kept in a file on flash so they survive a reboot.
+
+    interval   seconds between uplinks (used by the application's loop)
+    deadband   default absolute dead-band of a ReportPolicy (None = not set
+               remotely, the policy keeps its own rules)
+    batch      most values per batch frame (0 = as many as the data rate
+               allows)
+    data_rate  fixed data rate 0..7, or None for ADR
+
+A configuration downlink is sent on FPORT and holds one or more settings,
+each a tag byte followed by its value (big-endian):
+
+    0x01  interval    2 bytes, seconds (1..65535)
+    0x02  dead-band   2 bytes, hundredths of the unit (0 = report any change)
+    0x03  batch size  1 byte
+    0x04  data rate   1 byte, 0..7, or 0xFF for ADR
+    0x05  report      no value - report the settings again
+
+e.g. 01 01 2C 02 00 32 sets a 5-minute interval and a dead-band of 0.5. A
+downlink with an unknown tag, a truncated value or a value out of range is
+ignored as a whole.
+
+Hand the config to the driver, LoRaMINT(config=config). The driver fetches
+every downlink the LA66 reports, applies configuration downlinks (the data
+rate with AT+ADR/AT+DR, the batch size to sendValues and sendQueued) and,
+after a change, sends the settings as a log entry in front of the next
+uplink, e.g. "config interval=300 deadband=0.5 batch=0 dr=adr". The
+interval is up to the application; with `policy` the dead-band is applied
+to a ReportPolicy:
+
+    policy = ReportPolicy(heartbeat=3600)
+    config = RemoteConfig(interval=60, policy=policy)
+    lora = LoRaMINT(config=config)
+    while True:
+        ... read and send ...
+        time.sleep(config.interval)
+
+The file is only written when a downlink changed something (and once more
+when the change has been reported), not on every boot.
+"""
+
+import json
+
+
+class RemoteConfig:
+    FPORT = 10             # LoRaWAN port of configuration downlinks
+
+    # setting tags
+    INTERVAL = 0x01
+    DEADBAND = 0x02
+    BATCH = 0x03
+    DATA_RATE = 0x04
+    REPORT = 0x05
+
+    ADR = 0xFF             # data rate value: back to adaptive data rate
+    MAX_DATA_RATE = 7
+
+    # tag -> attribute
+    NAMES = {INTERVAL: "interval", DEADBAND: "deadband", BATCH: "batch",
+             DATA_RATE: "data_rate"}
+
+    def __init__(self, path="loramint.cfg", interval=60, policy=None):
+        """
+        Load the settings stored at `path`; without a file (first boot) the
+        node starts with `interval`, no remote dead-band, unlimited batches
+        and ADR. `policy` (a ReportPolicy) gets the dead-band whenever one is
+        set.
+        """
+        self._path = path
+        self._policy = policy
+        self.interval = interval
+        self.deadband = None
+        self.batch = 0
+        self.data_rate = None
+        self.unreported = False   # changed since the last report uplink
+        self._load()
+        self._apply_deadband()
+
+    # ------------------------------------------------------------------ #
+    # Downlinks
+    # ------------------------------------------------------------------ #
+
+    def apply(self, payload):
+        """
+        Apply a configuration downlink (the payload bytes). Returns False if
+        it was malformed and ignored. Changed settings are saved and marked
+        for a report.
+        """
+        settings = self._parse(payload)
+        if settings is None:
+            return False
+        changed = False
+        for tag, value in settings:
+            if tag == self.REPORT:
+                changed = True
+                continue
+            name = self.NAMES[tag]
+            if getattr(self, name) != value:
+                setattr(self, name, value)
+                changed = True
+            if tag == self.DEADBAND:
+                self._apply_deadband()
+        if changed:
+            self.unreported = True
+            self._save()
+        return True
+
+    def report(self):
+        """Return the settings as a log message for the backend."""
+        return "config interval={} deadband={} batch={} dr={}".format(
+            self.interval,
+            "-" if self.deadband is None else self.deadband,
+            self.batch,
+            "adr" if self.data_rate is None else self.data_rate,
+        )
+
+    def reported(self):
+        """Record that report() has been delivered."""
+        if self.unreported:
+            self.unreported = False
+            self._save()
+
+    # ------------------------------------------------------------------ #
+    # Helpers
+    # ------------------------------------------------------------------ #
+
+    @classmethod
+    def _parse(cls, payload):
+        """Return [(tag, value), ...] of a downlink, or None if malformed."""
+        settings = []
+        pos = 0
+        length = len(payload)
+        while pos < length:
+            tag = payload[pos]
+            pos += 1
+            if tag == cls.REPORT:
+                settings.append((tag, None))
+                continue
+            size = 2 if tag in (cls.INTERVAL, cls.DEADBAND) else 1
+            if tag not in cls.NAMES or pos + size > length:
+                return None
+            raw = payload[pos] if size == 1 else payload[pos] << 8 | payload[pos + 1]
+            pos += size
+            if tag == cls.INTERVAL:
+                if raw == 0:
+                    return None
+                value = raw
+            elif tag == cls.DEADBAND:
+                value = raw / 100
+            elif tag == cls.DATA_RATE:
+                if raw == cls.ADR:
+                    value = None
+                elif raw > cls.MAX_DATA_RATE:
+                    return None
+                else:
+                    value = raw
+            else:
+                value = raw
+            settings.append((tag, value))
+        return settings or None
+
+    def _apply_deadband(self):
+        if self._policy is not None and self.deadband is not None:
+            self._policy.deadband(self.deadband)
+
+    def _load(self):
+        try:
+            with open(self._path) as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return      # no file yet, or unreadable: keep the defaults
+        self.interval = stored.get("interval", self.interval)
+        self.deadband = stored.get("deadband")
+        self.batch = stored.get("batch", 0)
+        self.data_rate = stored.get("data_rate")
+        self.unreported = stored.get("unreported", False)
+
+    def _save(self):
+        with open(self._path, "w") as f:
+            json.dump({
+                "interval": self.interval,
+                "deadband": self.deadband,
+                "batch": self.batch,
+                "data_rate": self.data_rate,
+                "unreported": self.unreported,
+            }, f)
@@ -0,0 +1,130 @@
+"""
+ReportPolicy - report-by-exception filter in front of LoRaMINT.sendValue().
+
+A node usually samples far more often than its readings change. The policy
+decides per reading whether it is worth an uplink:
+
+    min_interval  never report a series more often than this (seconds)
+    absolute      report once the value moved at least this much ...
+    relative      ... or at least this fraction of the last reported value
+    heartbeat     report anyway after this much silence (seconds), so the
+                  backend can tell a steady sensor from a dead one
+
+    policy = ReportPolicy(absolute=0.2, heartbeat=3600)
+    policy.configure("Druck", absolute=None, relative=0.001)
+    if policy.due(value):
+        if not lora.sendValue(value):
+            policy.failed(value)
+
+A series is one unit/measurand/location/sensor tuple; the rules are set per
+measurand, with the constructor arguments as the default. String values are
+reported whenever they change. The state is kept in RAM, so after a reset the
+first reading of every series is reported again.
+"""
+
+from ._compat import ticks_diff, ticks_ms
+
+
+class ReportPolicy:
+    def __init__(self, absolute=None, relative=None, heartbeat=3600,
+                 min_interval=0):
+        """
+        Create a policy with default rules for all measurands. With neither
+        `absolute` nor `relative`, any change is reported. `heartbeat=None`
+        disables the heartbeat.
+        """
+        self._default = self._rule(absolute, relative, heartbeat, min_interval)
+        self._rules = {}      # measurand -> rule
+        self._last = {}       # series -> (value, ticks_ms) last reported
+        self._previous = {}   # series -> report before the last, for failed()
+        self._sent = 0
+        self._suppressed = 0
+
+    def configure(self, measurand, absolute=None, relative=None,
+                  heartbeat=3600, min_interval=0):
+        """Set the rules for one measurand (e.g. "Temperatur")."""
+        self._rules[measurand] = self._rule(absolute, relative, heartbeat,
+                                            min_interval)
+
+    def deadband(self, absolute):
+        """
+        Change the default absolute dead-band, keeping the other default
+        rules (e.g. from a RemoteConfig). 0 or None turns it off.
+        """
+        _, relative, heartbeat, min_interval = self._default
+        self._default = (absolute or None, relative, heartbeat, min_interval)
+
+    # ------------------------------------------------------------------ #
+    # Filtering
+    # ------------------------------------------------------------------ #
+
+    def due(self, value):
+        """
+        Return True if the MintValue should be sent now, and count it as
+        reported; return False (and count it as suppressed) otherwise.
+        """
+        now = ticks_ms()
+        series = value.metadata()
+        absolute, relative, heartbeat, min_interval = self._rules.get(
+            series[1], self._default)
+        last = self._last.get(series)
+
+        if last is not None:
+            elapsed = ticks_diff(now, last[1])
+            if elapsed < min_interval or not (
+                (heartbeat is not None and elapsed >= heartbeat)
+                or self._changed(last[0], value.value(), absolute, relative)
+            ):
+                self._suppressed += 1
+                return False
+
+        self._previous[series] = last
+        self._last[series] = (value.value(), now)
+        self._sent += 1
+        return True
+
+    def filter(self, values):
+        """Return the MintValues that are due, e.g. for sendValues()."""
+        return [value for value in values if self.due(value)]
+
+    def failed(self, value):
+        """
+        Take back a reading that due() let through but that could not be
+        sent, so the next reading of its series is compared with the last
+        one actually delivered.
+        """
+        series = value.metadata()
+        if series in self._previous:
+            previous = self._previous.pop(series)
+            if previous is None:
+                del self._last[series]
+            else:
+                self._last[series] = previous
+            self._sent -= 1
+
+    def stats(self):
+        """Return {"sent": n, "suppressed": n} since the policy was created."""
+        return {"sent": self._sent, "suppressed": self._suppressed}
+
+    # ------------------------------------------------------------------ #
+    # Helpers
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _rule(absolute, relative, heartbeat, min_interval):
+        """Return a rule tuple with the intervals converted to milliseconds."""
+        return (absolute, relative,
+                None if heartbeat is None else int(heartbeat * 1000),
+                int(min_interval * 1000))
+
+    @staticmethod
+    def _changed(last, current, absolute, relative):
+        """True if `current` left the dead-band around `last`."""
+        if isinstance(last, str) or isinstance(current, str):
+            return current != last
+        delta = abs(current - last)
+        if absolute is None and relative is None:
+            return delta != 0
+        if absolute is not None and delta >= absolute:
+            return True
+        return relative is not None and delta >= relative * abs(last) and delta != 0
@@ -0,0 +1,212 @@
+"""
+DriverStats - counters and timings kept by LoRaMINT, to diagnose a node's
+performance in the field (lora.stats()).
+
+    AT round trips   per command (AT+SENDB, AT+DR, ...): count, unanswered,
+                     mean and max latency and a latency histogram, measured
+                     from writing the command to its "OK"/"ERROR"
+    join             attempts, successes, last and longest join duration
+    uplinks          frames acknowledged, bytes sent, estimated airtime, and
+                     failures by cause: "timeout" (no reply), "error"
+                     ("ERROR") and "busy" (AT_BUSY_ERROR, still after the
+                     retry)
+    heap             highest gc.mem_alloc() and lowest gc.mem_free() seen
+                     after an uplink (None under CPython)
+
+Recording is a handful of counter updates per command; an uplink also adds
+its estimated airtime, a small bounded allocation. Hooks - callables added
+with add_hook() - are called as hook(event, detail) for every record:
+
+    "command"   (command, latency_ms, answered)
+    "join"      (joined, duration_ms)
+    "sent"      (payload bytes, airtime_ms)
+    "failed"    cause
+
+summary() condenses the figures into one log message, which LoRaMINT can
+uplink by itself every `stats_interval` seconds, e.g.
+
+    stats up=3600 ok=58 to=0 err=1 busy=0 b=2204 air=41200 join=1/6150
+    at=61/412 heap=38912/71264
+
+(uptime in s; uplinks acknowledged, failed by cause; bytes and airtime in
+ms; joins succeeded / last join in ms; AT+SENDB mean / max round trip in ms;
+lowest free / highest allocated heap in bytes.)
+
+The airtime is computed from the payload size at the last data rate the
+driver queried (AT+DR=?), assuming DR0 if it never did - an upper bound.
+"""
+
+from ._compat import mem_alloc, mem_free, ticks_diff, ticks_ms
+from .airtime import AirtimeScheduler
+
+
+class DriverStats:
+    # latency histogram: upper bucket bounds in ms, plus one open-ended bucket
+    BUCKETS_MS = (20, 50, 100, 200, 500, 1000, 2000, 5000)
+    FAILURES = ("timeout", "error", "busy")
+
+    def __init__(self):
+        self._start = ticks_ms()
+        self._commands = {}      # command -> [count, unanswered, total, max, histogram]
+        self._pending = None     # command awaiting its reply
+        self._pending_since = 0
+        self._joins = [0, 0, None, 0]   # attempts, joined, last ms, max ms
+        self._sent = 0
+        self._bytes = 0
+        self._airtime_ms = 0
+        self._failed = {cause: 0 for cause in self.FAILURES}
+        self._heap_max = None
+        self._free_min = None
+        self._hooks = []
+        self._reported = self._start
+
+    def add_hook(self, hook):
+        """Call hook(event, detail) for every record (see the module docs)."""
+        self._hooks.append(hook)
+
+    # ------------------------------------------------------------------ #
+    # Recording (called by the driver)
+    # ------------------------------------------------------------------ #
+
+    def command(self, command):
+        """
+        Note that `command` (e.g. "AT+SENDB") was just written. A command
+        still waiting for its reply is counted as unanswered.
+        """
+        if self._pending is not None:
+            self._finish(False)
+        self._pending = command
+        self._pending_since = ticks_ms()
+
+    def reply(self):
+        """Note the "OK"/"ERROR" answering the pending command, if any."""
+        if self._pending is not None:
+            self._finish(True)
+
+    def join(self, joined, duration_ms):
+        """Record a join attempt and how long it took."""
+        joins = self._joins
+        joins[0] += 1
+        if joined:
+            joins[1] += 1
+        joins[2] = duration_ms
+        joins[3] = max(joins[3], duration_ms)
+        if self._hooks:
+            self._notify("join", (joined, duration_ms))
+
+    def sent(self, size, data_rate=None):
+        """Record an acknowledged uplink of `size` payload bytes."""
+        airtime = AirtimeScheduler.time_on_air(size, data_rate)
+        self._sent += 1
+        self._bytes += size
+        self._airtime_ms += airtime
+        self._sample_heap()
+        if self._hooks:
+            self._notify("sent", (size, airtime))
+
+    def failed(self, cause):
+        """Record an uplink that failed: "timeout", "error" or "busy"."""
+        self._failed[cause] += 1
+        self._sample_heap()
+        if self._hooks:
+            self._notify("failed", cause)
+
+    # ------------------------------------------------------------------ #
+    # Reading
+    # ------------------------------------------------------------------ #
+
+    def as_dict(self):
+        """All figures as a dict of plain values (see LoRaMINT.stats)."""
+        commands = {}
+        for command, (count, unanswered, total, longest, histogram) in self._commands.items():
+            answered = count - unanswered
+            commands[command] = {
+                "count": count,
+                "unanswered": unanswered,
+                "mean_ms": total // answered if answered else None,
+                "max_ms": longest,
+                "histogram": list(histogram),
+            }
+        attempts, joined, last, longest = self._joins
+        return {
+            "uptime_s": ticks_diff(ticks_ms(), self._start) // 1000,
+            "commands": commands,
+            "buckets_ms": self.BUCKETS_MS,
+            "join": {"attempts": attempts, "joined": joined,
+                     "last_ms": last, "max_ms": longest},
+            "sent": self._sent,
+            "failed": dict(self._failed),
+            "bytes": self._bytes,
+            "airtime_ms": self._airtime_ms,
+            "heap_max": self._heap_max,
+            "free_min": self._free_min,
+        }
+
+    def summary(self):
+        """The key figures as one short log message (at most 140 characters)."""
+        failed = self._failed
+        text = "stats up={} ok={} to={} err={} busy={} b={} air={}".format(
+            ticks_diff(ticks_ms(), self._start) // 1000, self._sent,
+            failed["timeout"], failed["error"], failed["busy"], self._bytes,
+            self._airtime_ms)
+        if self._joins[0]:
+            text += " join={}/{}".format(self._joins[1], self._joins[2])
+        sendb = self._commands.get("AT+SENDB")
+        if sendb is not None and sendb[0] > sendb[1]:
+            text += " at={}/{}".format(sendb[2] // (sendb[0] - sendb[1]), sendb[3])
+        if self._heap_max is not None:
+            text += " heap={}/{}".format(self._free_min, self._heap_max)
+        return text[:140]
+
+    def report_due(self, interval_ms):
+        """True once `interval_ms` have passed since the last summary."""
+        return ticks_diff(ticks_ms(), self._reported) >= interval_ms
+
+    def reported(self):
+        """Note that a summary has been sent."""
+        self._reported = ticks_ms()
+
+    # ------------------------------------------------------------------ #
+    # Helpers
+    # ------------------------------------------------------------------ #
+
+    def _finish(self, answered):
+        """Account the pending command, answered now or never."""
+        command = self._pending
+        self._pending = None
+        entry = self._commands.get(command)
+        if entry is None:
+            entry = self._commands[command] = [0, 0, 0, 0,
+                                               [0] * (len(self.BUCKETS_MS) + 1)]
+        entry[0] += 1
+        latency = ticks_diff(ticks_ms(), self._pending_since)
+        if not answered:
+            entry[1] += 1
+        else:
+            entry[2] += latency
+            if latency > entry[3]:
+                entry[3] = latency
+            bucket = 0
+            for bound in self.BUCKETS_MS:
+                if latency <= bound:
+                    break
+                bucket += 1
+            entry[4][bucket] += 1
+        if self._hooks:
+            self._notify("command", (command, latency, answered))
+
+    def _sample_heap(self):
+        """Update the heap high-water marks (MicroPython only)."""
+        if mem_alloc is None:
+            return
+        allocated = mem_alloc()
+        free = mem_free()
+        if self._heap_max is None or allocated > self._heap_max:
+            self._heap_max = allocated
+        if self._free_min is None or free < self._free_min:
+            self._free_min = free
+
+    def _notify(self, event, detail):
+        """Pass a record on to the hooks."""
+        for hook in self._hooks:
+            hook(event, detail)
@@ -0,0 +1,67 @@
+"""
+TimedBatch - a MintBatch whose readings carry their sample time as a short
+offset from one base time, instead of a 4-byte timestamp each.
+
+Wire format of a timed batch frame (no padding):
+
+    byte 0        0x0A  timed batch marker
+    byte 1        number of records that follow (1..255)
+    byte 2        flags - bit 0: a base time follows
+    bytes 3..6    base time, Unix seconds (big-endian), if bit 0 is set
+    records ...   per reading: its offset in seconds (varint), then
+                  MintValue.to_record()
+
+With a base time (the node's clock is synced, see NetworkClock), a reading
+was taken `offset` seconds after the base - the time of the batch's oldest
+reading. Without one, the node does not know the time yet, and a reading was
+taken `offset` seconds before the uplink was received: the backend dates it
+back from its receive time.
+
+The offset is an unsigned LEB128 varint: 7 bits per byte, least significant
+first, bit 7 set on every byte but the last - one byte up to 127 s, two up
+to about 4.5 h, three up to 24 days. A record carrying its own timestamp
+(MintValue(..., time=...)) keeps it; its offset is then ignored.
+"""
+
+from .mintbatch import MintBatch
+
+
+class TimedBatch(MintBatch):
+    MARKER = 0x0A          # first byte marking a timed batch
+    BASE_FLAG = 0x01       # flags bit 0: a 4-byte base time follows
+    MAX_OFFSET = 0x0FFFFFFF   # four varint bytes (about 8.5 years)
+
+    def __init__(self, max_size, max_count=MintBatch.MAX_COUNT, base=None):
+        """
+        Create an empty timed batch (see MintBatch). `base` is the Unix time
+        the offsets count from, or None if they count back from the uplink.
+        """
+        MintBatch.__init__(self, max_size, max_count)
+        self.base = base
+        if base is None:
+            self._buffer.append(0)
+        else:
+            self._buffer.append(self.BASE_FLAG)
+            self._buffer += bytes(((base >> 24) & 0xFF, (base >> 16) & 0xFF,
+                                   (base >> 8) & 0xFF, base & 0xFF))
+
+    def add(self, value, metadata_id=None, registration=b"", offset=0):
+        """
+        Append a MintValue taken `offset` seconds after the base time (or
+        before the uplink, without one). Same rules and return value as
+        MintBatch.add().
+        """
+        return self.add_record(self.encode_offset(offset)
+                               + value.to_record(metadata_id),
+                               metadata_id, registration)
+
+    @classmethod
+    def encode_offset(cls, seconds):
+        """Encode an offset in seconds as a varint (clamped to 0..MAX_OFFSET)."""
+        seconds = min(max(seconds, 0), cls.MAX_OFFSET)
+        out = bytearray()
+        while seconds > 0x7F:
+            out.append((seconds & 0x7F) | 0x80)
+            seconds >>= 7
+        out.append(seconds)
+        return bytes(out)
@@ -0,0 +1,12 @@
+# Freezes the loramint package into a MicroPython firmware build, e.g. for the
+# ESP32 port (from micropython/ports/esp32):
+#
+#     make BOARD=ESP32_GENERIC FROZEN_MANIFEST=/path/to/packages/esp32/manifest.py
+#
+# Frozen modules run straight from flash: nothing is compiled or loaded into
+# RAM on import. Do not install the package on the filesystem as well - a
+# copy in /lib takes precedence over the frozen one.
+
+include("$(PORT_DIR)/boards/manifest.py")
+
+package("loramint")
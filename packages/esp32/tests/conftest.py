@@ -0,0 +1,12 @@
+"""
+Host tests (CPython + pytest) for the library, run against the LA66 emulator:
+
+    cd packages/esp32 && python3 -m pytest tests
+"""
+
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+sys.path.insert(0, os.path.join(HERE, "..", "dev_scripts"))
@@ -0,0 +1,62 @@
+import asyncio
+
+from decode_uplinks import decode_uplink
+from la66_emulator import LA66Emulator
+from loramint._compat import ticks_add, ticks_ms
+from loramint.atparser import ATParser
+from loramint.asyncloramint import AsyncLoRaMINT
+from loramint.mintvalue import MintValue
+
+
+def joined_lora(**kwargs):
+    emulator = LA66Emulator(latency_ms=0, join_ms=0, tx_busy_ms=50)
+    lora = AsyncLoRaMINT(uart=emulator, **kwargs)
+    return emulator, lora
+
+
+def test_join_and_send_against_the_emulator():
+    async def run():
+        emulator, lora = joined_lora(compact=True)
+        assert await lora.join()
+        value = MintValue(21.5, "*C", "Raum 101", "Temperatur", "BME280")
+        assert await lora.send_value(value)
+        assert await lora.send_values([value, value])
+        assert await lora.wait_tx_done()
+        return emulator
+
+    emulator = asyncio.run(run())
+    decoded = [payload for _, frame in emulator.uplinks
+               for payload in decode_uplink(frame)]
+    assert [payload["value"] for payload in decoded] == [21.5, 21.5, 21.5]
+
+
+def test_line_split_across_a_timeout_is_not_lost():
+    async def run():
+        emulator, lora = joined_lora()
+        emulator._rx += b"tx"
+        deadline = ticks_add(ticks_ms(), 30)
+        assert await lora._next_event(deadline) is None
+        emulator._rx += b"Done\r\n"
+        deadline = ticks_add(ticks_ms(), 30)
+        return await lora._next_event(deadline)
+
+    assert asyncio.run(run()) == (ATParser.TX_DONE, "txDone")
+
+
+def test_concurrent_sends_take_turns():
+    async def run():
+        emulator, lora = joined_lora()
+        assert await lora.join()
+        values = [MintValue(float(i), "*C", "Raum 101", "Temperatur", "BME280")
+                  for i in range(3)]
+        results = await asyncio.gather(
+            *(lora.send_value(value) for value in values),
+            lora.wait_tx_done())
+        return emulator, results
+
+    emulator, results = asyncio.run(run())
+    assert results == [True, True, True, True]
+    sendb = [c for c in emulator.commands if c.startswith("AT+SENDB")]
+    assert len(sendb) == 3
+    assert sorted(decode_uplink(frame)[0]["value"]
+                  for _, frame in emulator.uplinks) == [0.0, 1.0, 2.0]
@@ -0,0 +1,47 @@
+"""
+The driver queries the data rate (AT+DR=?) once and then works with the last
+known one, until a join, ADR or a rejected uplink may have changed it.
+"""
+
+from decode_uplinks import decode_uplink
+from la66_emulator import LA66Emulator
+from loramint.loramint import LoRaMINT
+from loramint.mintvalue import MintValue
+
+
+def joined_lora(data_rate):
+    emulator = LA66Emulator(latency_ms=0, join_ms=0, tx_busy_ms=0,
+                            data_rate=data_rate)
+    lora = LoRaMINT(uart=emulator)
+    assert lora.join()
+    return emulator, lora
+
+
+def queries(emulator):
+    return emulator.commands.count("AT+DR=?")
+
+
+def test_data_rate_is_queried_once():
+    emulator, lora = joined_lora(5)
+    value = MintValue(21.5, "*C", "Raum 101", "Temperatur", "BME280")
+    for _ in range(3):
+        assert lora.sendValue(value)
+    assert lora.sendValues([value, value])
+    assert queries(emulator) == 1
+    assert all(len(frame) == 99 for _, frame in emulator.uplinks[:3])
+
+
+def test_join_and_rejected_send_query_again():
+    emulator, lora = joined_lora(5)
+    value = MintValue(21.5, "*C", "Raum 101", "Temperatur", "BME280")
+    assert lora.sendValue(value)
+    assert lora.join()
+    assert lora.sendValue(value)
+    assert queries(emulator) == 2
+
+    emulator.data_rate = 0      # lowered by ADR, unknown to the driver
+    assert not lora.sendValue(value)
+    assert lora.sendValue(value)
+    assert queries(emulator) == 3
+    assert len(emulator.uplinks) == 3
+    assert decode_uplink(emulator.uplinks[-1][1])[0]["value"] == 21.5
@@ -0,0 +1,28 @@
+"""
+`import loramint` loads only the driver and MintValue; the optional classes
+are imported from their own modules.
+"""
+
+import os
+import subprocess
+import sys
+
+PACKAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+CORE = ["loramint", "loramint._compat", "loramint.airtime", "loramint.atparser",
+        "loramint.clock", "loramint.loramint", "loramint.mintvalue",
+        "loramint.radio", "loramint.stats"]
+
+
+def loaded_by(statement):
+    """The loramint modules a fresh interpreter has after `statement`."""
+    script = ("import sys\n{}\n"
+              "print(' '.join(sorted(m for m in sys.modules"
+              " if m.split('.')[0] == 'loramint')))").format(statement)
+    output = subprocess.check_output([sys.executable, "-c", script], cwd=PACKAGE)
+    return output.decode().split()
+
+
+def test_package_import_loads_only_the_driver():
+    assert loaded_by("import loramint") == CORE
+
@@ -0,0 +1,112 @@
+import pytest
+
+from decode_uplinks import assemble_fragments, decode_uplink, parse_fragment
+from la66_emulator import LA66Emulator
+from loramint.loramint import LoRaMINT
+from loramint.mintqueue import MintQueue
+from loramint.mintvalue import MintValue
+
+
+@pytest.fixture
+def lora():
+    emulator = LA66Emulator(latency_ms=0, join_ms=0, tx_busy_ms=0)
+    lora = LoRaMINT(uart=emulator)
+    assert lora.join()
+    return lora
+
+
+def fill(path, count, slots=16):
+    queue = MintQueue(str(path), slots)
+    for i in range(count):
+        queue.enqueue(MintValue(i, "%", "Raum 101", "Feuchte", "BME280",
+                                datatype="int", time=1700000000 + i))
+    return queue
+
+
+def corrupt(queue, seq):
+    """Overwrite the sequence number of slot `seq`, like a torn write."""
+    queue._seek(seq)
+    queue._file.write(b"\xff\xff\xff\xff")
+    queue._file.flush()
+
+
+def delivered(lora):
+    return [payload["value"] for _, frame in lora._uart.uplinks
+            for payload in decode_uplink(frame)]
+
+
+def test_peek_counts_skipped_slots(tmp_path):
+    queue = fill(tmp_path / "q", 4)
+    corrupt(queue, queue._tail + 1)
+    assert [slots for slots, _ in queue.peek(4)] == [1, 3, 4]
+
+
+def test_corrupt_slot_is_dropped_and_nothing_sent_twice(tmp_path, lora):
+    queue = fill(tmp_path / "q", 4)
+    corrupt(queue, queue._tail + 1)
+    assert lora.sendQueued(queue) == 3
+    assert len(queue) == 0
+    assert delivered(lora) == [0, 2, 3]
+
+
+def test_corrupt_slot_behind_a_full_batch(tmp_path, lora):
+    # 5 records of 30 bytes fill a 222-byte batch (with room for no more)
+    queue = fill(tmp_path / "q", 12)
+    corrupt(queue, queue._tail + 7)
+    assert lora.sendQueued(queue) == 11
+    assert len(queue) == 0
+    assert sorted(delivered(lora)) == [i for i in range(12) if i != 7]
+
+
+def test_reopen_ignores_a_corrupt_slot(tmp_path):
+    queue = fill(tmp_path / "q", 4)
+    corrupt(queue, queue._tail + 1)     # 0xFFFFFFFF in the wrong slot
+    corrupt(queue, 15)                  # 0xFFFFFFFF in its own slot
+    queue.close()
+
+    queue = MintQueue(str(tmp_path / "q"), 16)
+    assert len(queue) == 4
+    assert [slots for slots, _ in queue.peek(16)] == [1, 3, 4]
+    queue.enqueue(MintValue(4, "%", "Raum 101", "Feuchte", "BME280",
+                            datatype="int", time=1700000004))
+    assert len(queue) == 5
+    assert [slots for slots, _ in queue.peek(16)] == [1, 3, 4, 5]
+
+
+def test_reopen_keeps_a_wrapped_ring(tmp_path):
+    queue = fill(tmp_path / "q", 20)    # the oldest four were dropped
+    queue.close()
+    queue = MintQueue(str(tmp_path / "q"), 16)
+    assert (queue._tail, queue._head, len(queue)) == (5, 21, 16)
+    assert len(list(queue.peek(16))) == 16
+
+
+def test_only_corrupt_slots_send_nothing(tmp_path, lora):
+    queue = fill(tmp_path / "q", 3)
+    for seq in range(queue._tail, queue._head):
+        corrupt(queue, seq)
+    assert lora.sendQueued(queue) == 0
+    assert len(queue) == 0
+    assert lora._uart.uplinks == []
+
+
+def test_oversized_record_is_sent_in_fragments(tmp_path):
+    emulator = LA66Emulator(latency_ms=0, join_ms=0, tx_busy_ms=0, data_rate=0)
+    lora = LoRaMINT(uart=emulator)
+    assert lora.join()
+    queue = MintQueue(str(tmp_path / "q"), 16)
+    message = "Fenster Raum 101 auf"
+    queue.enqueue(MintValue(message, "", "Raum 101", "Status", "Kontakt",
+                            time=1700000000))
+    queue.enqueue(MintValue(7, "%", "Raum 101", "Feuchte", "BME280",
+                            datatype="int", time=1700000001))
+    assert lora.sendQueued(queue) == 2
+    assert len(queue) == 0
+
+    frames = [frame for _, frame in emulator.uplinks]
+    assert all(len(frame) <= 51 for frame in frames)
+    fragments = [parse_fragment(frame) for frame in frames if frame[0] == 0x09]
+    assert len(fragments) > 1
+    record = decode_uplink(assemble_fragments(fragments))
+    assert [payload["value"] for payload in record] == [message]
+    assert [payload["value"] for payload in decode_uplink(frames[-1])] == [7]
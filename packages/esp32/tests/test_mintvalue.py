@@ -0,0 +1,79 @@
+"""
+Fixed-point values carry their step in the datatype code: the value bytes
+are only the raw integer, and the decoder turns them back into the value.
+"""
+
+import pytest
+
+from decode_uplinks import decode_uplink
+from loramint.minttemplate import MintTemplate
+from loramint.mintvalue import MintValue
+
+
+def value_bytes(value):
+    """Bytes of the value alone: the record with a metadata id, minus two."""
+    return len(value.to_record(metadata_id=1)) - 2
+
+
+@pytest.mark.parametrize("reading, resolution, limits, datatype, size", [
+    (55, 1, (0, 100), "fixed8", 1),
+    (-1.5, 0.1, (-12, 12), "fixed8", 1),
+    (21.5, 0.1, (-40, 85), "fixed16", 2),
+    (3.3, 0.001, (0, 5), "fixed16", 2),
+    (1013.25, 0.01, (300, 1100), "float", 4),
+])
+def test_smallest_datatype_and_its_size(reading, resolution, limits, datatype,
+                                        size):
+    value = MintValue(reading, "*C", "Raum 101", "Temperatur", "BME280",
+                      resolution=resolution, limits=limits)
+    assert MintValue.choose_datatype(resolution, *limits) == datatype
+    assert value_bytes(value) == size
+    assert decode_uplink(value.to_bytes())[0]["value"] == reading
+
+
+def test_fixed_point_saturates():
+    high = MintValue(300, "%", "Raum 101", "Feuchte", "BME280", "fixed8",
+                     resolution=1)
+    low = MintValue(-4000, "*C", "Raum 101", "Temperatur", "BME280",
+                    "fixed16", resolution=0.1)
+    assert decode_uplink(high.to_bytes())[0]["value"] == 127
+    assert decode_uplink(low.to_bytes())[0]["value"] == -3276.8
+
+
+def test_fixed_point_needs_a_resolution_of_at_least_a_thousandth():
+    with pytest.raises(ValueError):
+        MintValue(1.0, "V", "Raum 101", "Spannung", "ADC", "fixed16",
+                  resolution=0.0001)
+    assert MintValue.choose_datatype(0.0001, 0, 1) == "float"
+
+
+def test_template_encodes_like_a_value():
+    template = MintTemplate("*C", "Raum 101", "Temperatur", "BME280",
+                            resolution=0.1, limits=(-40, 85))
+    for reading in (21.5, -40.0, 85.0, 1000.0):
+        value = MintValue(reading, "*C", "Raum 101", "Temperatur", "BME280",
+                          "fixed16", resolution=0.1)
+        assert template.value(reading).to_bytes() == value.to_bytes()
+        assert template.value(reading).to_bytes(compact=True) == \
+            value.to_bytes(compact=True)
+
+
+def test_public_datatypes():
+    assert [MintValue.infer_datatype(v) for v in (1, 1.5, "on")] == \
+        ["long", "float", "string"]
+    template = MintTemplate("*C", "Raum 101", "Temperatur", "BME280",
+                            resolution=0.1, limits=(-40, 85))
+    assert template.datatype == "fixed16"
+    assert template.value(21.5).datatype() == "fixed16"
+
+
+def test_template_needs_resolution_and_limits_together():
+    with pytest.raises(ValueError):
+        MintTemplate("*C", "Raum 101", "Temperatur", "BME280", resolution=0.1)
+    with pytest.raises(ValueError):
+        MintTemplate("*C", "Raum 101", "Temperatur", "BME280", limits=(-40, 85))
+    template = MintTemplate("*C", "Raum 101", "Temperatur", "BME280",
+                            "fixed16", resolution=0.1)
+    assert template.datatype == "fixed16"
+    assert MintTemplate("*C", "Raum 101", "Temperatur", "BME280").datatype == \
+        "float"
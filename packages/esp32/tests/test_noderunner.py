@@ -0,0 +1,40 @@
+import pytest
+
+from loramint.noderunner import NodeRunner
+
+
+class FakeLoRa:
+    def __init__(self):
+        self.sent = []
+
+    def sendValues(self, values):
+        self.sent.append(values)
+        return True
+
+
+def runner():
+    runner = NodeRunner(FakeLoRa(), "Raum 101", sleep=lambda ms: None)
+    runner.add_sensor("BME280", lambda: (21.53, 101325.0, 45.2))
+    return runner
+
+
+@pytest.mark.parametrize("interval", [0, 0.0004, -60])
+def test_interval_under_a_millisecond_is_rejected(interval):
+    node = runner()
+    with pytest.raises(ValueError):
+        node.add_measurand("BME280", "Temperatur", "*C", interval, index=0)
+    with pytest.raises(ValueError):
+        node.step()         # nothing was registered
+
+
+def test_resolution_needs_limits():
+    node = runner()
+    with pytest.raises(ValueError):
+        node.add_measurand("BME280", "Temperatur", "*C", 60, index=0,
+                           resolution=0.1)
+    node.add_measurand("BME280", "Temperatur", "*C", 60, index=0,
+                       resolution=0.1, limits=(-40, 85))
+    node.add_measurand("BME280", "Feuchte", "%", 60, index=2)
+    assert node.step() >= 0
+    values = node._lora.sent[0]
+    assert [value.datatype() for value in values] == ["fixed16", "float"]
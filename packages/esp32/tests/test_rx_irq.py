@@ -0,0 +1,42 @@
+"""
+With rx_irq=True only the UART interrupt handler reads the UART and feeds the
+parser; the main thread never does, so the two cannot interleave.
+"""
+
+from decode_uplinks import decode_uplink
+from la66_emulator import LA66Emulator
+from loramint.loramint import LoRaMINT
+from loramint.mintvalue import MintValue
+
+
+def test_only_the_handler_reads_the_uart():
+    emulator = LA66Emulator(latency_ms=0, join_ms=0, tx_busy_ms=0)
+    lora = LoRaMINT(uart=emulator, rx_irq=True)
+
+    in_handler = []
+    handler, readinto = emulator._handler, emulator.readinto
+
+    def interrupt(uart):
+        in_handler.append(True)
+        try:
+            handler(uart)
+        finally:
+            in_handler.pop()
+
+    def checked_readinto(buffer, *args):
+        assert in_handler, "UART read outside the interrupt handler"
+        return readinto(buffer, *args)
+
+    emulator.irq(handler=interrupt)
+    emulator.readinto = checked_readinto
+
+    assert lora.join()
+    value = MintValue(21.5, "*C", "Raum 101", "Temperatur", "BME280")
+    assert lora.sendValue(value)
+    assert lora.sendValue(value)
+    assert [decode_uplink(frame)[0]["value"]
+            for _, frame in emulator.uplinks] == [21.5, 21.5]
+
+    # bytes waiting when a command starts are the handler's, not _drain()'s
+    emulator._rx += b"txDone\r\n"
+    lora._drain()
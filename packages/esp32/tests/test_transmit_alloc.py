@@ -0,0 +1,95 @@
+"""
+Steady-state allocations of the transmit path, measured with tracemalloc.
+
+CPython allocates where MicroPython does not (range objects, bound methods,
+ints above 2**30 from the host's ticks_ms), and a send is bounded rather
+than allocation-free on the board as well (the payload, the due reports, the
+airtime figure). What these tests show: building the
+AT+SENDB command allocates nothing per payload byte, the reply parser keeps
+its buffers, and repeated sends leave nothing behind in the library.
+"""
+
+import tracemalloc
+
+import pytest
+
+from la66_emulator import LA66Emulator
+from loramint.atparser import ATParser
+from loramint.loramint import LoRaMINT
+from loramint.mintvalue import MintValue
+
+LIBRARY = tracemalloc.Filter(True, "*loramint*")
+
+
+@pytest.fixture
+def lora():
+    emulator = LA66Emulator(latency_ms=0, join_ms=0, tx_busy_ms=0)
+    lora = LoRaMINT(uart=emulator)
+    assert lora.join()
+    return lora
+
+
+def peak(call, *args):
+    """Peak bytes allocated (and freed again or not) during call(*args)."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        call(*args)
+        return tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+
+
+def test_parser_keeps_its_buffers():
+    parser = ATParser()
+    line, events = parser._line, parser._events
+    parser.feed(b"AT+VER=?\r\nv1.2\r\nOK\r\npart")
+    assert parser.next()[1] == "AT+VER=?"
+    parser.reset()
+    assert parser._line is line and parser._events is events
+    assert len(parser) == 0 and not line
+
+
+def test_common_replies_are_shared_events():
+    parser = ATParser()
+    parser.feed(b"OK\r\ntxDone\r\nrxTimeout\r\nOK\r\n")
+    first = [parser.next() for _ in range(3)]
+    assert [event for event, _ in first] == [
+        ATParser.OK, ATParser.TX_DONE, ATParser.RX_TIMEOUT]
+    assert parser.next() is first[0]
+
+
+def test_sendb_command_allocates_nothing_per_payload_byte(lora):
+    small, large = bytes(10), bytes(range(222))
+    lora._sendb_command(small)      # creates the cached view per length
+    lora._sendb_command(large)
+    assert lora._sendb_command(large).obj is lora._tx
+    # a hex string of the payload alone would take over 450 bytes; what is
+    # left is CPython's (a range object, ints above 256), the same for both
+    assert peak(lora._sendb_command, small) < 160
+    assert peak(lora._sendb_command, large) < 160
+
+
+def test_repeated_sends_leave_nothing_behind(lora):
+    payload = MintValue(21.5, "*C", "Raum 101", "Temperatur", "BME280").to_bytes()
+    uplinks = lora._uart.uplinks
+
+    def send(count):
+        for _ in range(count):
+            assert lora._send_payload(payload)
+            lora.wait_tx_done()
+            lora._drain()
+            del uplinks[:]
+    send(5)                         # warm up caches and counters
+
+    tracemalloc.start()
+    try:
+        send(1)
+        before = tracemalloc.take_snapshot().filter_traces([LIBRARY])
+        send(50)
+        after = tracemalloc.take_snapshot().filter_traces([LIBRARY])
+    finally:
+        tracemalloc.stop()
+    grown = sum(stat.size_diff for stat in after.compare_to(before, "lineno"))
+    assert grown <= 0